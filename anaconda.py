@@ -253,6 +253,14 @@ if __name__ == "__main__":
     setup_python_updates()
     setup_python_path()
 
+    # Profile the start-up if requested.
+    from pyanaconda.core.startup.profiler import profiler
+
+    if profiler.is_requested():
+        profiler.start()
+
+    profiler.start_phase("Import the base modules")
+
     # init threading before Gtk can do anything and before we start using threads
     from pyanaconda.threading import AnacondaThread, threadMgr
     from pyanaconda.core.i18n import _
@@ -264,6 +272,7 @@ if __name__ == "__main__":
     from pyanaconda.core.kernel import kernel_arguments
     (opts, depr) = parse_arguments(boot_cmdline=kernel_arguments)
 
+    profiler.start_phase("Set up the configuration and logging")
     from pyanaconda.core.configuration.anaconda import conf
     conf.set_from_opts(opts)
 
@@ -323,6 +332,7 @@ if __name__ == "__main__":
         util.ipmi_report(constants.IPMI_ABORTED)
         sys.exit(1)
 
+    profiler.start_phase("Import the user interface modules")
     from pyanaconda import vnc
     from pyanaconda import kickstart
     from pyanaconda import keyboard
@@ -330,14 +340,16 @@ if __name__ == "__main__":
     # startup_utils, which import Blivet, without slowing down anything critical
     from pyanaconda import display
     from pyanaconda import startup_utils
-    from pyanaconda import rescue
     from pyanaconda import geoloc
+    # the rescue mode is rarely used, so load it only if it is needed
+    rescue = util.lazy_import("pyanaconda.rescue")
 
     # Print the usual "startup note" that contains Anaconda version
     # and short usage & bug reporting instructions.
     # The note should in most cases end on TTY1.
     startup_utils.print_startup_note(options=opts)
 
+    profiler.start_phase("Set up the environment")
     from pyanaconda.ui.context import context
     anaconda = context.anaconda
     util.setup_translations()
@@ -430,6 +442,7 @@ if __name__ == "__main__":
     log.info("Default encoding = %s ", sys.getdefaultencoding())
 
     # start dbus session (if not already running) and run boss in it
+    profiler.start_phase("Start the DBus modules")
     try:
         anaconda.dbus_launcher.start()
     except Exception as e:    # pylint: disable=broad-except
@@ -440,6 +453,7 @@ if __name__ == "__main__":
         sys.exit(1)
 
     # Find a kickstart file.
+    profiler.start_phase("Process the kickstart file")
     kspath = startup_utils.find_kickstart(opts)
     log.info("Found a kickstart file: %s", kspath)
 
@@ -510,6 +524,7 @@ if __name__ == "__main__":
     if not flags.automatedInstall:
         security_proxy.SetFingerprintAuthEnabled(True)
 
+    profiler.start_phase("Set up the localization")
     from pyanaconda import localization
     # Set the language before loading an interface, when it may be too late.
 
@@ -532,6 +547,7 @@ if __name__ == "__main__":
     localization.setup_locale(os.environ["LANG"], localization_proxy, text_mode=anaconda.tui_mode)
 
     # Initialize the network now, in case the display needs it
+    profiler.start_phase("Initialize the network")
     from pyanaconda.network import initialize_network, wait_for_connecting_NM_thread, wait_for_connected_NM
 
     initialize_network()
@@ -545,6 +561,7 @@ if __name__ == "__main__":
                                  target=wait_for_connecting_NM_thread))
 
     # now start the interface
+    profiler.start_phase("Set up the display")
     display.setup_display(anaconda, opts)
     if anaconda.gui_startup_failed:
         # we need to reinitialize the locale if GUI startup failed,
@@ -577,6 +594,7 @@ if __name__ == "__main__":
         services_proxy.SetDefaultTarget(TEXT_ONLY_TARGET)
 
     # Set flag to prompt for missing ks data
+    profiler.start_phase("Configure the installation")
     if not anaconda.interactive_mode:
         flags.ksprompt = False
 
@@ -718,7 +736,15 @@ if __name__ == "__main__":
         with check_kickstart_error():
             sync_run_task(snapshot_task_proxy)
 
+    profiler.start_phase("Set up the user interface")
     anaconda.intf.setup(ksdata)
+
+    # Write the report of the start-up profiler.
+    if profiler.enabled:
+        profiler.stop()
+        profiler.write_report()
+        profiler.log_report(log)
+
     anaconda.intf.run()
 
 # vim:tw=78:ts=4:et:sw=4
@@ -19,11 +19,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import atexit
+import copy
 import logging
+import queue
 from logging.handlers import SysLogHandler, SocketHandler
 from systemd.journal import JournalHandler
 import os
 import sys
+import threading
 import warnings
 
 from pyanaconda.core import constants
@@ -45,6 +49,13 @@ SENSITIVE_INFO_LOG_FILE = "/tmp/sensitive-info.log"
 ANACONDA_SYSLOG_FACILITY = SysLogHandler.LOG_LOCAL1
 ANACONDA_SYSLOG_IDENTIFIER = "anaconda"
 
+# The maximal number of log records waiting for the log writer.
+LOG_QUEUE_SIZE = 10000
+# The maximal number of log records written at once.
+LOG_BATCH_SIZE = 500
+# How long to wait for the log writer to flush the records in seconds.
+LOG_FLUSH_TIMEOUT = 10
+
 from threading import Lock
 program_log_lock = Lock()
 
@@ -63,6 +74,16 @@ class _AnacondaLogFixer(object):
 
     # filter, emit, lock, and acquire need to be implemented in a subclass
 
+    # Flush the stream only at the end of a batch of records.
+    batched = False
+
+    def flush(self):
+        if not self.batched:
+            self.flush_batch()
+
+    def flush_batch(self):
+        super().flush()  # pylint: disable=no-member
+
     def handle(self, record):
         # copied from logging.Handler, minus the lock acquisition
         rv = self.filter(record)    # pylint: disable=no-member
@@ -134,6 +155,262 @@ class AnacondaStreamHandler(_AnacondaLogFixer, logging.StreamHandler):
     pass
 
 
+class AnacondaLogWriter(object):
+    """Writer of log records running in a dedicated thread.
+
+    The loggers only enqueue the records and the writer passes them
+    to the target handlers in batches. The streams of the handlers
+    are flushed once per batch instead of once per record.
+
+    The queue of the records is bounded. If it is full, debug records
+    are dropped and other records wait for a free space, so important
+    messages are never lost.
+    """
+
+    def __init__(self, max_size=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE):
+        """Create a new log writer.
+
+        :param int max_size: a maximal number of waiting records
+        :param int batch_size: a maximal number of records written at once
+        """
+        self._queue = queue.Queue(maxsize=max_size)
+        self._batch_size = batch_size
+        self._thread = None
+        self._dropped = 0
+        self._dropped_lock = Lock()
+
+    @property
+    def is_running(self):
+        """Is the writer running?"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def dropped(self):
+        """The number of dropped debug records."""
+        return self._dropped
+
+    def start(self):
+        """Start the writer thread."""
+        if self.is_running:
+            return
+
+        self._thread = threading.Thread(
+            name=constants.THREAD_LOG_WRITER,
+            target=self._run,
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=LOG_FLUSH_TIMEOUT):
+        """Write the waiting records and stop the writer thread.
+
+        :param timeout: a number of seconds to wait
+        """
+        if not self._can_wait():
+            return
+
+        try:
+            self._queue.put((None, None), timeout=timeout)
+        except queue.Full:
+            return
+
+        self._thread.join(timeout)
+
+    def flush(self, timeout=LOG_FLUSH_TIMEOUT):
+        """Wait until the waiting records are written.
+
+        This can be called from a crash handler. It never
+        blocks for longer than the given timeout.
+
+        :param timeout: a number of seconds to wait
+        :return: True if the records were written, otherwise False
+        """
+        if not self._can_wait():
+            return True
+
+        event = threading.Event()
+
+        try:
+            self._queue.put((None, event), timeout=timeout)
+        except queue.Full:
+            return False
+
+        return event.wait(timeout)
+
+    def enqueue(self, handler, record):
+        """Enqueue the record for the handler.
+
+        The record is handled immediately if the writer is not
+        running or if it is called from the writer thread.
+
+        :param handler: a target handler
+        :param record: a log record
+        """
+        if not self._can_wait():
+            self._handle(handler, record)
+            self._flush_handler(handler)
+            return
+
+        if record.levelno > logging.DEBUG:
+            self._queue.put((handler, record))
+            return
+
+        try:
+            self._queue.put_nowait((handler, record))
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+
+    def _can_wait(self):
+        """Can the current thread wait for the writer?"""
+        return self.is_running and threading.current_thread() is not self._thread
+
+    def _run(self):
+        """Write the records in batches."""
+        while True:
+            items = [self._queue.get()]
+
+            while len(items) < self._batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            running = self._write(items)
+
+            for _item in items:
+                self._queue.task_done()
+
+            if not running:
+                return
+
+    def _write(self, items):
+        """Write a batch of records.
+
+        :param items: a list of handlers and records
+        :return: False if the writer should stop, otherwise True
+        """
+        handlers = []
+        events = []
+        running = True
+
+        for handler, record in items:
+            if handler is None:
+                if record is None:
+                    running = False
+                else:
+                    events.append(record)
+                continue
+
+            self._handle(handler, record)
+
+            if handler not in handlers:
+                handlers.append(handler)
+
+        for handler in handlers:
+            self._flush_handler(handler)
+
+        self._report_dropped()
+
+        for event in events:
+            event.set()
+
+        return running
+
+    def _handle(self, handler, record):
+        """Pass the record to the target handler."""
+        try:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        except Exception:  # pylint: disable=broad-except
+            handler.handleError(record)
+
+    def _flush_handler(self, handler):
+        """Flush the stream of the target handler."""
+        try:
+            if isinstance(handler, _AnacondaLogFixer):
+                handler.flush_batch()
+            else:
+                handler.flush()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def _report_dropped(self):
+        """Report the number of dropped debug records."""
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+
+        if dropped:
+            logging.getLogger(constants.LOGGER_MAIN).warning(
+                "%d debug messages were dropped, the log is too busy.", dropped
+            )
+
+
+class AnacondaQueueHandler(logging.Handler):
+    """Handler that passes records to the log writer.
+
+    The handler does no I/O. The message of the record is formatted
+    on the calling thread, because the arguments of the message can
+    change before the record is written.
+    """
+
+    def __init__(self, handler, writer):
+        """Create a new queue handler.
+
+        :param handler: a target handler
+        :param writer: an instance of AnacondaLogWriter
+        """
+        super().__init__(level=handler.level)
+        self._handler = handler
+        self._writer = writer
+
+        if isinstance(handler, _AnacondaLogFixer):
+            handler.batched = True
+
+    @property
+    def handler(self):
+        """The target handler."""
+        return self._handler
+
+    def setLevel(self, level):
+        super().setLevel(level)
+        self._handler.setLevel(level)
+
+    def setFormatter(self, fmt):
+        self._handler.setFormatter(fmt)
+
+    def prepare(self, record):
+        """Prepare the record for the writer thread."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _formatter.formatException(record.exc_info)
+
+            record.exc_info = None
+
+        return record
+
+    def emit(self, record):
+        try:
+            self._writer.enqueue(self._handler, self.prepare(record))
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._handler.close()
+        super().close()
+
+
+# The formatter of exceptions.
+_formatter = logging.Formatter()
+
+
 class AnacondaPrefixFilter(logging.Filter):
     """Add a log_prefix field, which is based on the name property,
     but without the "anaconda." prefix.
@@ -157,9 +434,10 @@ class AnacondaPrefixFilter(logging.Filter):
 class AnacondaLog(object):
     SYSLOG_CFGFILE = "/etc/rsyslog.conf"
 
-    def __init__(self, write_to_journal=False):
+    def __init__(self, write_to_journal=False, writer=None):
         self.remote_syslog = None
         self.write_to_journal = write_to_journal
+        self.writer = writer
         # Rename the loglevels so they are the same as in syslog.
         logging.addLevelName(logging.CRITICAL, "CRT")
         logging.addLevelName(logging.ERROR, "ERR")
@@ -252,6 +530,12 @@ class AnacondaLog(object):
                 logfile_handler.addFilter(log_filter)
             logfile_handler.setLevel(minLevel)
             logfile_handler.setFormatter(logging.Formatter(fmtStr, DATE_FORMAT))
+
+            # Keep the streams synchronous, so they are not reordered
+            # with the other output of the installer.
+            if isinstance(dest, str):
+                logfile_handler = self._get_handler(logfile_handler)
+
             addToLogger.addHandler(logfile_handler)
         except IOError:
             pass
@@ -274,7 +558,14 @@ class AnacondaLog(object):
             journal_handler.addFilter(log_filter)
         if log_formatter:
             journal_handler.setFormatter(log_formatter)
-        logr.addHandler(journal_handler)
+        logr.addHandler(self._get_handler(journal_handler))
+
+    def _get_handler(self, handler):
+        """Get a handler that writes with the log writer if any."""
+        if not self.writer:
+            return handler
+
+        return AnacondaQueueHandler(handler, self.writer)
 
     # pylint: disable=redefined-builtin
     def showwarning(self, message, category, filename, lineno,
@@ -291,7 +582,7 @@ class AnacondaLog(object):
         remotelog = AnacondaSocketHandler(host, port)
         remotelog.setFormatter(logging.Formatter(ENTRY_FORMAT, DATE_FORMAT))
         remotelog.setLevel(logging.DEBUG)
-        logging.getLogger().addHandler(remotelog)
+        logging.getLogger().addHandler(self._get_handler(remotelog))
 
     def restartSyslog(self):
         # Import here instead of at the module level to avoid an import loop
@@ -325,9 +616,34 @@ class AnacondaLog(object):
         self.restartSyslog()
 
 
-def init(write_to_journal=False):
+def init(write_to_journal=False, asynchronous=True):
+    """Initialize the logging.
+
+    :param write_to_journal: should the logs be forwarded to the journal?
+    :param asynchronous: should the logs be written by the log writer?
+    """
     global logger
-    logger = AnacondaLog(write_to_journal=write_to_journal)
+    global writer
+
+    if asynchronous:
+        writer = AnacondaLogWriter()
+        writer.start()
+        atexit.register(writer.stop)
+
+    logger = AnacondaLog(write_to_journal=write_to_journal, writer=writer)
+
+
+def flush(timeout=LOG_FLUSH_TIMEOUT):
+    """Wait until the enqueued log records are written.
+
+    Call this before the installer crashes or exits,
+    so the logs are complete.
+
+    :param timeout: a number of seconds to wait
+    """
+    if writer:
+        writer.flush(timeout)
 
 
 logger = None
+writer = None
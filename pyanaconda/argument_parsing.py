@@ -496,6 +496,8 @@ def getArgumentParser(version_string, boot_cmdline=None):
     ap.add_argument("--remotelog", metavar="HOST:PORT", help=help_parser.help_text("remotelog"))
     ap.add_argument("--virtiolog", metavar="/dev/virtio-ports/NAME", default=VIRTIO_PORT,
                     help=help_parser.help_text("virtiolog"))
+    ap.add_argument("--startupprofile", action="store_true", default=False,
+                    help=help_parser.help_text("startupprofile"))
 
     from pykickstart.constants import SELINUX_DISABLED, SELINUX_ENFORCING
     from pyanaconda.core.constants import SELINUX_DEFAULT
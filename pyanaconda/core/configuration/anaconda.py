@@ -56,6 +56,11 @@ class AnacondaSection(Section):
         """List of enabled kickstart modules."""
         return self._get_option("kickstart_modules").split()
 
+    @property
+    def fork_server_enabled(self):
+        """Start the DBus modules with the fork server."""
+        return self._get_option("fork_server_enabled", bool)
+
 
 class AnacondaConfiguration(Configuration):
     """Representation of the Anaconda configuration."""
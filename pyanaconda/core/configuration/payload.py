@@ -113,6 +113,29 @@ class PayloadSection(Section):
         """
         return self._get_option("verify_ssl", bool)
 
+    @property
+    def parallel_copy_workers(self):
+        """Number of threads used to copy the files of a live image.
+
+        If set to 0, the files are copied with rsync.
+        """
+        return self._get_option("parallel_copy_workers", int)
+
+    @property
+    def package_cache_directory(self):
+        """Directory of a persistent cache of downloaded packages.
+
+        If not set, the package cache is disabled.
+
+        :return: a path or an empty string
+        """
+        return self._get_option("package_cache_directory", str)
+
+    @property
+    def package_cache_size(self):
+        """Maximal size of the package cache in MiB."""
+        return self._get_option("package_cache_size", int)
+
     @property
     def default_rpm_gpg_keys(self):
         """List of GPG keys to import into RPM database at end of installation."""
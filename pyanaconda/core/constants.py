@@ -65,6 +65,10 @@ DBUS_ANACONDA_SESSION_ADDRESS = "DBUS_ANACONDA_SESSION_BUS_ADDRESS"
 
 ANACONDA_BUS_CONF_FILE = "/usr/share/anaconda/dbus/anaconda-bus.conf"
 ANACONDA_BUS_ADDR_FILE = "/run/anaconda/bus.address"
+ANACONDA_FORK_SERVER_SOCKET = "/run/anaconda/fork-server.socket"
+
+# Wait for a module started by the fork server for this number of seconds
+FORK_SERVER_START_TIMEOUT = 60
 
 ANACONDA_DATA_DIR = "/usr/share/anaconda"
 ANACONDA_CONFIG_DIR = "/etc/anaconda/"
@@ -102,9 +106,16 @@ GRAPHICAL_TARGET = 'graphical.target'
 NETWORK_CONNECTION_TIMEOUT = 46  # in seconds
 NETWORK_CONNECTED_CHECK_INTERVAL = 0.1  # in seconds
 
+# How many times an interrupted image download is resumed before giving up.
+IMAGE_DOWNLOAD_RETRIES = 3
+
 # DBus
 DEFAULT_DBUS_TIMEOUT = -1       # use default
 
+# How often is the state of a synchronously running DBus task checked
+# in seconds if its Stopped signal is not delivered to the waiting thread.
+TASK_STATE_CHECK_INTERVAL = 1
+
 # Thread names
 THREAD_EXECUTE_STORAGE = "AnaExecuteStorageThread"
 THREAD_STORAGE = "AnaStorageThread"
@@ -128,6 +139,7 @@ THREAD_NTP_SERVER_CHECK = "AnaNTPserver"
 THREAD_DBUS_TASK = "AnaTaskThread"
 THREAD_SUBSCRIPTION = "AnaSubscriptionThread"
 THREAD_SUBSCRIPTION_SPOKE_INIT = "AnaSubscriptionSpokeInitThread"
+THREAD_LOG_WRITER = "AnaLogWriterThread"
 
 # Geolocation constants
 
@@ -282,6 +294,9 @@ SIZE_UNITS_DEFAULT = "MiB"
 # An estimated ratio for metadata size to total disk space.
 STORAGE_METADATA_RATIO = 0.1
 
+# How many devices are probed for existing installations at once.
+EXISTING_SYSTEMS_PROBE_WORKERS = 8
+
 # Constants for reporting status to IPMI.  These are from the IPMI spec v2 rev1.1, page 512.
 IPMI_STARTED = 0x7          # installation started
 IPMI_FINISHED = 0x8         # installation finished successfully
@@ -355,6 +370,12 @@ LOGGER_SENSITIVE_INFO = "sensitive_info"
 # Timeout for starting X
 X_TIMEOUT = 60
 
+# Log a running program that hasn't produced any output for this number of seconds
+PROGRAM_SILENCE_TIMEOUT = 60
+
+# The report of the start-up profiler
+STARTUP_PROFILE_FILE = "/tmp/startup-profile.json"
+
 # Setup on boot actions.
 SETUP_ON_BOOT_DEFAULT = -1
 SETUP_ON_BOOT_DISABLED = 0
@@ -470,6 +491,15 @@ DNF_DEFAULT_REPO_COST = 1000
 DNF_DEFAULT_TIMEOUT = -1
 DNF_DEFAULT_RETRIES = -1
 
+# How many repositories can load their metadata at the same time.
+DNF_METADATA_LOADING_THREADS = 4
+
+# How many packages can be downloaded at the same time.
+DNF_MAX_PARALLEL_DOWNLOADS = 10
+
+# How often is the progress of the DNF transaction sent in seconds.
+DNF_TRANSACTION_PROGRESS_INTERVAL = 0.25
+
 # Group package types.
 GROUP_PACKAGE_TYPE_MANDATORY = "mandatory"
 GROUP_PACKAGE_TYPE_CONDITIONAL = "conditional"
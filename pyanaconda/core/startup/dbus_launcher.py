@@ -24,12 +24,13 @@
 # Author(s):  Jiri Konecny <jkonecny@redhat.com>
 #
 import os
+import subprocess
 from subprocess import TimeoutExpired
 
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.util import startProgram
 from pyanaconda.core.constants import ANACONDA_BUS_ADDR_FILE, ANACONDA_CONFIG_TMP, \
-    ANACONDA_BUS_CONF_FILE, DBUS_ANACONDA_SESSION_ADDRESS
+    ANACONDA_BUS_CONF_FILE, DBUS_ANACONDA_SESSION_ADDRESS, ANACONDA_FORK_SERVER_SOCKET
 from pyanaconda.core.dbus import DBus
 from dasbus.constants import DBUS_FLAG_NONE
 from pyanaconda.modules.common.constants.services import BOSS
@@ -46,9 +47,11 @@ class AnacondaDBusLauncher(object):
     """Class for launching the Anaconda DBus modules."""
 
     DBUS_LAUNCH_BIN = "dbus-daemon"
+    START_MODULE_BIN = "/usr/libexec/anaconda/start-module"
 
     def __init__(self):
         self._dbus_daemon_process = None
+        self._fork_server_process = None
         self._log_file = None
         self._bus_address = None
 
@@ -68,6 +71,7 @@ class AnacondaDBusLauncher(object):
         self._set_environment()
         self._write_bus_address()
 
+        self._start_fork_server()
         self._start_boss()
         self._start_modules()
 
@@ -79,6 +83,7 @@ class AnacondaDBusLauncher(object):
         :param timeout: seconds to the launcher timeout
         """
         self._stop_boss_and_modules()
+        self._stop_fork_server(timeout)
 
         self._stop_dbus_session(timeout)
         self._remove_bus_address_file()
@@ -145,6 +150,42 @@ class AnacondaDBusLauncher(object):
         elif ret_code != 0:
             log.error("DBus daemon exited with error %s", ret_code)
 
+    def _start_fork_server(self):
+        """Start the fork server of the modules.
+
+        The start-module script uses the fork server
+        to start the modules if the server is running.
+        """
+        if not conf.anaconda.fork_server_enabled:
+            log.debug("The fork server is disabled.")
+            return
+
+        command = [self.START_MODULE_BIN, "--fork-server"]
+
+        self._fork_server_process = startProgram(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=self._log_file,
+            stderr=self._log_file,
+            reset_lang=False
+        )
+
+    def _stop_fork_server(self, timeout):
+        """Stop the fork server of the modules."""
+        if not self._fork_server_process:
+            return
+
+        self._fork_server_process.terminate()
+
+        try:
+            self._fork_server_process.wait(timeout)
+        except TimeoutExpired:
+            log.error("The fork server wasn't terminated, kill it now.")
+            self._fork_server_process.kill()
+
+        if os.path.exists(ANACONDA_FORK_SERVER_SOCKET):
+            os.unlink(ANACONDA_FORK_SERVER_SOCKET)
+
     def _set_environment(self):
         """Set the environment variables."""
         # pylint: disable=environment-modify
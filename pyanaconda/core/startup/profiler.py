@@ -0,0 +1,273 @@
+#
+# Profiler of the start-up of Anaconda.
+#
+# This module is imported before most of the other modules,
+# so it shouldn't import anything expensive at the top level.
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+import sys
+import threading
+import time
+
+from pyanaconda.core.constants import STARTUP_PROFILE_FILE
+from pyanaconda.core.kernel import kernel_arguments
+
+__all__ = ["StartupProfiler", "profiler"]
+
+
+class _ImportTimer(object):
+    """The finder that measures the time of imports.
+
+    The finder doesn't find any modules itself. It asks the other
+    finders for the spec of a module and wraps the execution of the
+    module, so the time of the execution can be measured.
+    """
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        """Find a spec of the module."""
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+
+            if spec is None:
+                continue
+
+            self._wrap_loader(spec)
+            return spec
+
+        return None
+
+    def _wrap_loader(self, spec):
+        """Measure the execution of the module."""
+        loader = spec.loader
+
+        # Don't change the loaders that are shared by all modules.
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return
+
+        exec_module = loader.exec_module
+
+        def _exec_module(module):
+            with self._profiler.timed_import(spec.name):
+                exec_module(module)
+
+        loader.exec_module = _exec_module
+
+
+class _TimedImport(object):
+    """The context manager that measures one import."""
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = None
+        self.children_time = 0
+
+    def __enter__(self):
+        self._profiler._get_stack().append(self)
+        self._start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.monotonic() - self._start
+        stack = self._profiler._get_stack()
+        stack.pop()
+
+        if stack:
+            stack[-1].children_time += duration
+
+        self._profiler._add_import(
+            name=self._name,
+            start=self._start,
+            duration=duration,
+            self_duration=duration - self.children_time,
+            nested=bool(stack)
+        )
+        return False
+
+
+class StartupProfiler(object):
+    """Profiler of the start-up of Anaconda.
+
+    The profiler records the wall time of every start-up phase and
+    the time spent by importing every module. The results are written
+    into a report in the JSON format.
+
+    The profiler is enabled by the inst.startupprofile boot option.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._finder = None
+        self._start = None
+        self._phases = []
+        self._imports = []
+
+    @property
+    def enabled(self):
+        """Is the profiler running?"""
+        return self._finder is not None
+
+    @staticmethod
+    def is_requested(argv=None):
+        """Is the profiling of the start-up requested?
+
+        :param argv: a list of command line arguments or None for sys.argv
+        :return: True or False
+        """
+        if argv is None:
+            argv = sys.argv
+
+        return "--startupprofile" in argv or kernel_arguments.is_enabled("inst.startupprofile")
+
+    def start(self):
+        """Start to profile."""
+        if self.enabled:
+            return
+
+        self._start = time.monotonic()
+        self._finder = _ImportTimer(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def stop(self):
+        """Stop to profile."""
+        if not self.enabled:
+            return
+
+        self._finish_phase()
+        sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def start_phase(self, name):
+        """Start a new phase of the start-up.
+
+        The current phase is finished.
+
+        :param str name: a name of the phase
+        """
+        if not self.enabled:
+            return
+
+        self._finish_phase()
+
+        with self._lock:
+            self._phases.append({
+                "name": name,
+                "start": self._get_time(time.monotonic()),
+                "duration": None,
+                "imports": 0,
+                "import_time": 0.0,
+            })
+
+    def _finish_phase(self):
+        """Finish the current phase."""
+        with self._lock:
+            if self._phases and self._phases[-1]["duration"] is None:
+                phase = self._phases[-1]
+                phase["duration"] = self._get_time(time.monotonic()) - phase["start"]
+
+    def timed_import(self, name):
+        """Measure an import of a module.
+
+        :param str name: a name of the module
+        :return: a context manager
+        """
+        return _TimedImport(self, name)
+
+    def _get_stack(self):
+        """Get the stack of the running imports of the current thread."""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+
+        return self._local.stack
+
+    def _get_time(self, timestamp):
+        """Get the time since the start of the profiler."""
+        return timestamp - self._start
+
+    def _add_import(self, name, start, duration, self_duration, nested):
+        """Add a measured import."""
+        with self._lock:
+            phase = self._phases[-1] if self._phases else None
+
+            self._imports.append({
+                "name": name,
+                "start": self._get_time(start),
+                "duration": duration,
+                "self_duration": self_duration,
+                "phase": phase["name"] if phase else None,
+                "thread": threading.current_thread().name,
+            })
+
+            if phase and not nested:
+                phase["imports"] += 1
+                phase["import_time"] += duration
+
+    def get_report(self):
+        """Get the report of the profiler.
+
+        :return: a dictionary with the report
+        """
+        with self._lock:
+            return {
+                "total_time": self._get_time(time.monotonic()) if self._start else 0.0,
+                "phases": [dict(p) for p in self._phases],
+                "imports": sorted(
+                    (dict(i) for i in self._imports),
+                    key=lambda i: i["self_duration"],
+                    reverse=True
+                ),
+            }
+
+    def write_report(self, path=STARTUP_PROFILE_FILE):
+        """Write the report of the profiler to a file.
+
+        :param str path: a path to the file
+        """
+        with open(path, "w") as f:
+            json.dump(self.get_report(), f, indent=4)
+
+    def log_report(self, log, limit=20):
+        """Log a summary of the report.
+
+        :param log: a logger
+        :param int limit: a number of the slowest imports to log
+        """
+        report = self.get_report()
+
+        log.debug("The start-up has taken %.3f seconds.", report["total_time"])
+
+        for phase in report["phases"]:
+            log.debug("The phase '%s' has taken %.3f seconds, %d imports have taken %.3f "
+                      "seconds.", phase["name"], phase["duration"] or 0.0, phase["imports"],
+                      phase["import_time"])
+
+        for item in report["imports"][:limit]:
+            log.debug("The import of %s has taken %.3f seconds.", item["name"],
+                      item["self_duration"])
+
+
+# The profiler of the start-up.
+profiler = StartupProfiler()
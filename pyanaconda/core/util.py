@@ -18,9 +18,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import codecs
 import glob
 import os
 import os.path
+import selectors
 import subprocess
 import unicodedata
 # Used for ascii_lowercase, ascii_uppercase constants
@@ -33,6 +35,8 @@ import sys
 import types
 import inspect
 import functools
+import importlib.util
+import time
 import blivet.arch
 
 import requests
@@ -44,7 +48,7 @@ from pyanaconda.flags import flags
 from pyanaconda.core.process_watchers import WatchProcesses
 from pyanaconda.core.constants import DRACUT_SHUTDOWN_EJECT, TRANSLATIONS_UPDATE_DIR, \
     IPMI_ABORTED, X_TIMEOUT, TAINT_HARDWARE_UNSUPPORTED, TAINT_SUPPORT_REMOVED, \
-    WARNING_HARDWARE_UNSUPPORTED, WARNING_SUPPORT_REMOVED
+    WARNING_HARDWARE_UNSUPPORTED, WARNING_SUPPORT_REMOVED, PROGRAM_SILENCE_TIMEOUT
 from pyanaconda.errors import RemovedModuleError, ExitError
 
 from pyanaconda.anaconda_logging import program_log_lock
@@ -258,10 +262,174 @@ def startX(argv, output_redirect=None, timeout=X_TIMEOUT):
         signal.signal(signal.SIGALRM, old_sigalrm_handler)
 
 
+# The maximal size of a chunk of data read from the output of a program.
+_OUTPUT_CHUNK_SIZE = 64 * 1024
+
+# The progress line of rsync --info=progress2, for example:
+#       1,238,099  13%  111.03MB/s    0:00:01 (xfr#1, to-chk=99/101)
+_RSYNC_PROGRESS_PATTERN = re.compile(r"^\s*([\d,]+)\s+(\d+)%\s")
+
+
+class _ProgramOutput(object):
+    """The output of a running program.
+
+    The data are decoded incrementally and split into lines as they
+    arrive, so every line can be logged and passed to a callback right
+    away. A line that is rewritten with carriage returns, for example
+    a progress bar, is passed to the callback after every update, but
+    only its final version is logged.
+    """
+
+    def __init__(self, pipe, log_output=True, binary_output=False, capture_output=False,
+                 output_file=None, line_callback=None, errors="strict"):
+        """Create a new output.
+
+        :param pipe: the pipe to read the output from
+        :param log_output: whether to log the output
+        :param binary_output: whether to treat the output as binary data
+        :param capture_output: whether to keep the output in memory
+        :param output_file: an optional file object to write the output to
+        :param line_callback: an optional callable taking every line of the output
+        :param errors: how to handle the data that can't be decoded as UTF-8
+        """
+        self.pipe = pipe
+        self._log_output = log_output
+        self._binary_output = binary_output
+        self._capture_output = capture_output
+        self._output_file = output_file
+        self._line_callback = line_callback
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors)
+        self._chunks = []
+        self._buffer = ""
+        self._last_char = "\n"
+
+    def feed(self, data):
+        """Process a chunk of the output.
+
+        :param bytes data: the data or an empty string at the end of the output
+        """
+        text = self._decoder.decode(data, final=not data)
+
+        if self._binary_output:
+            self._write(data)
+        elif text:
+            self._write(text)
+            self._last_char = text[-1]
+        elif not data and self._last_char != "\n":
+            # Make sure that the text output ends with a new line.
+            self._write("\n")
+            self._last_char = "\n"
+
+        self._process_text(text, final=not data)
+
+    def get_output(self):
+        """Get the captured output.
+
+        :return: a string or bytes with the output
+        """
+        if self._binary_output:
+            return b"".join(self._chunks)
+
+        return "".join(self._chunks)
+
+    def _write(self, data):
+        """Forward the data."""
+        if self._capture_output:
+            self._chunks.append(data)
+
+        if self._output_file:
+            self._output_file.write(data)
+
+    def _process_text(self, text, final):
+        """Split the text into lines."""
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+
+        for line in lines:
+            self._process_line(line)
+
+        if "\r" in self._buffer:
+            *updates, self._buffer = self._buffer.split("\r")
+
+            for update in updates:
+                self._process_update(update)
+
+        if final and self._buffer:
+            self._process_line(self._buffer)
+            self._buffer = ""
+
+    def _process_update(self, update):
+        """Process an intermediate version of a line."""
+        update = update.strip()
+
+        if update and self._line_callback:
+            self._line_callback(update)
+
+    def _process_line(self, line):
+        """Process a complete line."""
+        *updates, line = line.split("\r")
+
+        for update in updates:
+            self._process_update(update)
+
+        line = line.strip()
+
+        if self._log_output:
+            with program_log_lock:
+                program_log.info(line)
+
+        if line and self._line_callback:
+            self._line_callback(line)
+
+
+def _read_program_output(argv, outputs):
+    """Read the outputs of a running program until they are closed.
+
+    The pipes are read with non-blocking I/O as the data arrive. If
+    the program doesn't produce any output for a while, it is logged.
+
+    :param argv: the command that is running
+    :param outputs: a list of instances of _ProgramOutput
+    """
+    with selectors.DefaultSelector() as selector:
+        for output in outputs:
+            os.set_blocking(output.pipe.fileno(), False)
+            selector.register(output.pipe, selectors.EVENT_READ, output)
+
+        last_output = time.monotonic()
+
+        while selector.get_map():
+            events = selector.select(timeout=PROGRAM_SILENCE_TIMEOUT)
+
+            if not events:
+                with program_log_lock:
+                    program_log.debug("%s is still running, no output for %d seconds.",
+                                      argv[0], time.monotonic() - last_output)
+                continue
+
+            last_output = time.monotonic()
+
+            for key, _mask in events:
+                try:
+                    data = os.read(key.fd, _OUTPUT_CHUNK_SIZE)
+                except BlockingIOError:
+                    continue
+
+                if not data:
+                    selector.unregister(key.fileobj)
+
+                key.data.feed(data)
+
+
 def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_output=True,
-                 binary_output=False, filter_stderr=False):
+                 binary_output=False, filter_stderr=False, capture_output=True,
+                 line_callback=None):
     """ Run an external program, log the output and return it to the caller
 
+        The output is streamed: every line is logged, written to stdout and passed
+        to the line callback as soon as the program prints it. The output is kept
+        in memory only if it should be returned.
+
         NOTE/WARNING: UnicodeDecodeError will be raised if the output of the of the
                       external command can't be decoded as UTF-8.
 
@@ -273,6 +441,8 @@ def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_ou
         :param log_output: whether to log the output of command
         :param binary_output: whether to treat the output of command as binary data
         :param filter_stderr: whether to exclude the contents of stderr from the returned output
+        :param capture_output: whether to return the output of command
+        :param line_callback: Optional callable taking every line of the output.
         :return: The return code of the command and the output
     """
     try:
@@ -284,38 +454,32 @@ def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_ou
         proc = startProgram(argv, root=root, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr,
                             env_prune=env_prune)
 
-        (output_string, err_string) = proc.communicate()
-        if not binary_output:
-            output_string = output_string.decode("utf-8")
-            if output_string and output_string[-1] != "\n":
-                output_string = output_string + "\n"
+        output = _ProgramOutput(
+            proc.stdout,
+            log_output=log_output,
+            binary_output=binary_output,
+            capture_output=capture_output,
+            output_file=stdout,
+            line_callback=line_callback,
+            errors="replace" if binary_output else "strict"
+        )
+        outputs = [output]
+
+        # If stderr is filtered, log it separately.
+        if filter_stderr:
+            outputs.append(_ProgramOutput(proc.stderr, log_output=log_output, errors="replace"))
 
-        if log_output:
-            with program_log_lock:
-                if binary_output:
-                    # try to decode as utf-8 and replace all undecodable data by
-                    # "safe" printable representations when logging binary output
-                    decoded_output_lines = output_string.decode("utf-8", "replace")
-                else:
-                    # output_string should already be a Unicode string
-                    decoded_output_lines = output_string.splitlines(True)
-
-                for line in decoded_output_lines:
-                    program_log.info(line.strip())
-
-        if stdout:
-            stdout.write(output_string)
-
-        # If stderr was filtered, log it separately
-        if filter_stderr and err_string and log_output:
-            # try to decode as utf-8 and replace all undecodable data by
-            # "safe" printable representations when logging binary output
-            decoded_err_string = err_string.decode("utf-8", "replace")
-            err_lines = decoded_err_string.splitlines(True)
+        try:
+            _read_program_output(argv, outputs)
+        except BaseException:
+            # Don't leave the program running if the output can't be processed.
+            proc.kill()
+            raise
+        finally:
+            for o in outputs:
+                o.pipe.close()
 
-            with program_log_lock:
-                for line in err_lines:
-                    program_log.info(line.strip())
+            proc.wait()
 
     except OSError as e:
         with program_log_lock:
@@ -325,7 +489,23 @@ def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_ou
     with program_log_lock:
         program_log.debug("Return code: %d", proc.returncode)
 
-    return (proc.returncode, output_string)
+    return (proc.returncode, output.get_output())
+
+
+def parse_rsync_progress(line):
+    """Parse a progress line of rsync.
+
+    The line is expected to be printed by rsync --info=progress2.
+
+    :param str line: a line of the output
+    :return: a tuple with the number of transferred bytes and the percentage or None
+    """
+    match = _RSYNC_PROGRESS_PATTERN.match(line)
+
+    if not match:
+        return None
+
+    return int(match.group(1).replace(",", "")), int(match.group(2))
 
 
 def execInSysroot(command, argv, stdin=None, root=None):
@@ -343,7 +523,8 @@ def execInSysroot(command, argv, stdin=None, root=None):
 
 
 def execWithRedirect(command, argv, stdin=None, stdout=None,
-                     root='/', env_prune=None, log_output=True, binary_output=False):
+                     root='/', env_prune=None, log_output=True, binary_output=False,
+                     line_callback=None):
     """ Run an external program and redirect the output to a file.
 
         :param command: The command to run
@@ -354,11 +535,13 @@ def execWithRedirect(command, argv, stdin=None, stdout=None,
         :param env_prune: environment variable to remove before execution
         :param log_output: whether to log the output of command
         :param binary_output: whether to treat the output of command as binary data
+        :param line_callback: Optional callable taking every line of the output.
         :return: The return code of the command
     """
     argv = [command] + argv
     return _run_program(argv, stdin=stdin, stdout=stdout, root=root, env_prune=env_prune,
-                        log_output=log_output, binary_output=binary_output)[0]
+                        log_output=log_output, binary_output=binary_output,
+                        capture_output=False, line_callback=line_callback)[0]
 
 
 def execWithCapture(command, argv, stdin=None, root='/', log_output=True, filter_stderr=False):
@@ -1477,6 +1660,40 @@ class LazyObject(object):
         return setattr(self._object, name, value)
 
 
+def lazy_import(name):
+    """Import a module lazily.
+
+    The module is loaded when one of its attributes is accessed
+    for the first time. Use it for expensive modules that might
+    not be needed at all, so they don't slow down the start-up.
+
+    :param str name: a full name of the module
+    :return: the module
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+
+    if spec is None:
+        raise ModuleNotFoundError("No module named '{}'".format(name), name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # Make the module available as an attribute of its parent.
+    parent, _dot, child = name.rpartition(".")
+
+    if parent:
+        setattr(sys.modules[parent], child, module)
+
+    return module
+
+
 def get_os_release_value(name, sysroot="/"):
     """Read os-release files and return a value of the specified parameter.
 
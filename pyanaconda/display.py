@@ -33,7 +33,6 @@ from pyanaconda import vnc
 from pyanaconda.core.i18n import _
 from pyanaconda.flags import flags
 from pyanaconda.modules.common.constants.services import NETWORK
-from pyanaconda.ui.tui.spokes.askvnc import AskVNCSpoke
 from pyanaconda.ui.tui import tui_quit_callback
 # needed for checking if the pyanaconda.ui.gui modules are available
 import pyanaconda.ui
@@ -49,6 +48,9 @@ from pyanaconda.anaconda_loggers import get_module_logger, get_stdout_logger
 log = get_module_logger(__name__)
 stdout_log = get_stdout_logger()
 
+# The spoke is needed only if we ask for VNC.
+askvnc = util.lazy_import("pyanaconda.ui.tui.spokes.askvnc")
+
 
 def start_user_systemd():
     """Start the user instance of systemd.
@@ -97,7 +99,7 @@ def ask_vnc_question(anaconda, vnc_server, message):
     App.initialize()
     loop = App.get_event_loop()
     loop.set_quit_callback(tui_quit_callback)
-    spoke = AskVNCSpoke(anaconda.ksdata, message)
+    spoke = askvnc.AskVNCSpoke(anaconda.ksdata, message)
     ScreenHandler.schedule_screen(spoke)
     App.run()
 
@@ -73,7 +73,9 @@ def _writeKS(ksdata):
 def _prepare_configuration(payload, ksdata):
     """Configure the installed system."""
 
-    configuration_queue = TaskQueue("Configuration queue")
+    # Queues that declare their requirements can run at the same time as other
+    # such queues. Queues without requirements are processed in order.
+    configuration_queue = TaskQueue("Configuration queue", parallel=True)
     # connect progress reporting
     configuration_queue.queue_started.connect(lambda x: progress_message(x.status_message))
     configuration_queue.task_completed.connect(lambda x: progress_step(x.name))
@@ -124,21 +126,25 @@ def _prepare_configuration(payload, ksdata):
     # schedule network configuration (if required)
     if conf.target.can_configure_network and conf.system.provides_network_config:
         overwrite = payload.type in PAYLOAD_LIVE_TYPES
-        network_config = TaskQueue("Network configuration", N_("Writing network configuration"))
+        network_config = TaskQueue("Network configuration", N_("Writing network configuration"),
+                                   requires=(), provides=("network",))
         network_config.append(Task("Network configuration",
                                    network.write_configuration, (overwrite, )))
         configuration_queue.append(network_config)
 
     # add installation tasks for the Users DBus module
     if is_module_available(USERS):
-        user_config = TaskQueue("User creation", N_("Creating users"))
+        user_config = TaskQueue("User creation", N_("Creating users"),
+                                requires=(), provides=("users",))
         users_proxy = USERS.get_proxy()
         users_dbus_tasks = users_proxy.InstallWithTasks()
         user_config.append_dbus_tasks(USERS, users_dbus_tasks)
         configuration_queue.append(user_config)
 
     # Anaconda addon configuration
-    addon_config = TaskQueue("Anaconda addon configuration", N_("Configuring addons"))
+    # addons might modify the created users and the network configuration
+    addon_config = TaskQueue("Anaconda addon configuration", N_("Configuring addons"),
+                             requires=("users", "network"), provides=("addons",))
 
     # there is no longer a User class & addons should no longer need it
     # FIXME: drop user class parameter from the API & all known addons
@@ -182,12 +188,13 @@ def _prepare_configuration(payload, ksdata):
 
     # setup kexec reboot if requested
     if flags.flags.kexec:
-        kexec_setup = TaskQueue("Kexec setup", N_("Setting up kexec"))
+        kexec_setup = TaskQueue("Kexec setup", N_("Setting up kexec"), requires=())
         kexec_setup.append(Task("Setup kexec", setup_kexec))
         configuration_queue.append(kexec_setup)
 
     # write anaconda related configs & kickstarts
-    write_configs = TaskQueue("Write configs and kickstarts", N_("Storing configuration files and kickstarts"))
+    write_configs = TaskQueue("Write configs and kickstarts", N_("Storing configuration files and kickstarts"),
+                              requires=())
 
     # Write the kickstart file to the installed system (or, copy the input
     # kickstart file over if one exists).
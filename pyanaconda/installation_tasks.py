@@ -17,6 +17,7 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from threading import RLock
 
 from dasbus.error import DBusError
@@ -32,14 +33,34 @@ from pyanaconda.progress import progress_message
 log = get_module_logger(__name__)
 
 
+class SynchronizedSignal(Signal):
+    """A signal that can be emitted only by one thread at a time."""
+
+    def __init__(self, lock):
+        super().__init__()
+        self._lock = lock
+
+    def emit(self, *args, **kargs):
+        with self._lock:
+            super().emit(*args, **kargs)
+
+
 class BaseTask(object):
     """A base class for Task and TaskQueue.
 
     It holds shared methods, properties and signals.
+
+    The requirements are used only by parallel task queues. A task
+    requires the given names to be provided by all preceding tasks
+    of the queue before it can start. If the requirements are not
+    specified, the task waits for all preceding tasks and all
+    following tasks wait for this one.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, requires=None, provides=()):
         self._name = name
+        self._requires = None if requires is None else frozenset(requires)
+        self._provides = frozenset(provides)
         self._done = False
         self._running = False
         self._lock = RLock()
@@ -58,6 +79,24 @@ class BaseTask(object):
         """
         return self._name
 
+    @property
+    def requires(self):
+        """Names required by the task.
+
+        :returns: a set of names or None if the task requires all preceding tasks
+        :rtype: frozenset or None
+        """
+        return self._requires
+
+    @property
+    def provides(self):
+        """Names provided by the task.
+
+        :returns: a set of names
+        :rtype: frozenset
+        """
+        return self._provides
+
     @property
     @synchronized
     def running(self):
@@ -104,21 +143,28 @@ class TaskQueue(BaseTask):
     """TaskQueue represents a queue of TaskQueues or Tasks.
 
     TaskQueues and Tasks can be mixed in a single TaskQueue.
+
+    The items of a parallel TaskQueue are started in worker threads
+    as soon as their requirements are met. Items without requirements
+    are still processed in order with respect to all other items.
     """
 
-    def __init__(self, name, status_message=None):
-        super().__init__(name=name)
+    def __init__(self, name, status_message=None, parallel=False, requires=None, provides=()):
+        super().__init__(name=name, requires=requires, provides=provides)
         self._status_message = status_message
+        self._parallel = parallel
         self._current_task_number = None
         self._current_queue_number = None
         # the list backing this TaskQueue instance
         self._list = []
+        # nested items can emit the signals from different threads
+        self._signal_lock = RLock()
         # triggered if a TaskQueue contained in this one was started/completed
-        self.queue_started = Signal()
-        self.queue_completed = Signal()
+        self.queue_started = SynchronizedSignal(self._signal_lock)
+        self.queue_completed = SynchronizedSignal(self._signal_lock)
         # triggered when a task is started
-        self.task_started = Signal()
-        self.task_completed = Signal()
+        self.task_started = SynchronizedSignal(self._signal_lock)
+        self.task_completed = SynchronizedSignal(self._signal_lock)
 
         # connect to the task & queue started signals for
         # progress reporting purposes
@@ -306,9 +352,12 @@ class TaskQueue(BaseTask):
             self.started.emit(self)
             if len(self) == 0:
                 log.warning("The task group %s is empty.", self.name)
-            for item in self:
-                # start the item (TaskQueue/Task)
-                item.start()
+            if self._parallel:
+                self._start_in_parallel()
+            else:
+                for item in self:
+                    # start the item (TaskQueue/Task)
+                    item.start()
 
             # we are done, set the task queue state accordingly
             with self._lock:
@@ -321,6 +370,66 @@ class TaskQueue(BaseTask):
             # trigger the "completed" signals
             self.completed.emit(self)
 
+    @staticmethod
+    def _is_ready(items, index, finished):
+        """Can the item with the given index be started?
+
+        :param items: a list of items of the queue
+        :param index: an index of the item
+        :param finished: a set of indexes of the finished items
+        :returns: True if the item can be started, otherwise False
+        """
+        item = items[index]
+
+        for previous_index in range(index):
+            if previous_index in finished:
+                continue
+
+            previous = items[previous_index]
+
+            if item.requires is None or previous.requires is None:
+                return False
+
+            if item.requires & previous.provides:
+                return False
+
+        return True
+
+    def _start_in_parallel(self):
+        """Start the items of the queue in worker threads.
+
+        If an item fails, no other items are started. The queue waits
+        for the running items and raises the error of the failed one.
+        """
+        items = list(self)
+        finished = set()
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=len(items) or 1,
+                                thread_name_prefix="AnaTaskQueueThread") as executor:
+            while True:
+                for index, item in enumerate(items):
+                    if error or index in finished or index in running.values():
+                        continue
+
+                    if self._is_ready(items, index, finished):
+                        running[executor.submit(item.start)] = index
+
+                if not running:
+                    break
+
+                done, _not_done = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    finished.add(running.pop(future))
+
+                    if future.exception() and not error:
+                        error = future.exception()
+
+        if error:
+            raise error
+
     # implement the Python list "interface" and make sure parent is always
     # set to a correct value
     @synchronized
@@ -402,8 +511,9 @@ class Task(BaseTask):
     Task instances to run.
     """
 
-    def __init__(self, name, task=None, task_args=None, task_kwargs=None):
-        super().__init__(name=name)
+    def __init__(self, name, task=None, task_args=None, task_kwargs=None,
+                 requires=None, provides=()):
+        super().__init__(name=name, requires=requires, provides=provides)
         self._task = task
         if task_args is None:
             task_args = []
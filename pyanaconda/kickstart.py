@@ -38,6 +38,8 @@ from pyanaconda.core.constants import IPMI_ABORTED
 from pyanaconda.errors import ScriptError, errorHandler
 from pyanaconda.flags import flags
 from pyanaconda.core.i18n import _
+from pyanaconda.modules.boss.kickstart_manager.parser import SplitKickstartParser, \
+    VALID_SECTIONS_ANACONDA
 from pyanaconda.modules.common.constants.services import BOSS
 from pyanaconda.modules.common.structures.kickstart import KickstartReport
 from pyanaconda.pwpolicy import F22_PwPolicy, F22_PwPolicyData
@@ -50,7 +52,7 @@ from pykickstart.parser import KickstartParser
 from pykickstart.parser import Script as KSScript
 from pykickstart.sections import NullSection, PostScriptSection, PreScriptSection, \
     PreInstallScriptSection, OnErrorScriptSection, TracebackScriptSection, Section
-from pykickstart.version import returnClassForVersion
+from pykickstart.version import returnClassForVersion, makeVersion
 
 log = get_module_logger(__name__)
 stdoutLog = get_stdout_logger()
@@ -454,19 +456,169 @@ class AnacondaKSParser(KickstartParser):
         self.registerSection(AnacondaSection(self.handler.anaconda))
 
 
+class SplitKickstartCache(object):
+    """The cache of split kickstart files.
+
+    A kickstart file is split into elements only once and the elements
+    are shared by all passes of the kickstart processing. The elements
+    are split again if any of the split files has changed, for example
+    by a %pre script.
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def get_elements(self, path):
+        """Get the elements of the kickstart file.
+
+        :param path: a path to the kickstart file
+        :return: an instance of KickstartElements
+        :raise: KickstartError if the file cannot be split
+        """
+        if path in self._cache:
+            elements, stamps = self._cache[path]
+
+            if stamps == self._get_stamps(path, elements):
+                return elements
+
+        log.debug("Splitting the kickstart file %s.", path)
+        elements = self._split(path)
+        self._cache[path] = (elements, self._get_stamps(path, elements))
+        return elements
+
+    def clear(self):
+        """Drop all cached elements."""
+        self._cache.clear()
+
+    def _split(self, path):
+        """Split the kickstart file into elements."""
+        handler = makeVersion(VERSION)
+        parser = SplitKickstartParser(handler, valid_sections=VALID_SECTIONS_ANACONDA)
+        return parser.split(path)
+
+    def _get_stamps(self, path, elements):
+        """Get stamps of the kickstart file and its included files."""
+        stamps = {}
+        file_names = {path} | {element.filename for element in elements.all_elements}
+
+        for file_name in file_names:
+            try:
+                stat = os.stat(file_name)
+            except OSError:
+                stamps[file_name] = None
+            else:
+                stamps[file_name] = (stat.st_mtime_ns, stat.st_size)
+
+        return stamps
+
+
+# The kickstart files split into elements.
+split_kickstart_cache = SplitKickstartCache()
+
+
+def get_kickstart_from_elements(elements, filename):
+    """Generate a kickstart from the elements.
+
+    The elements of the given file are placed on their original
+    lines if possible, so the messages of the parser refer to the
+    right lines of the file.
+
+    :param elements: a list of kickstart elements
+    :param filename: a name of the main kickstart file
+    :return: a kickstart and a list of (lineno, file name) references
+             indexed by lines of the generated kickstart
+    """
+    lines = []
+    references = [(0, "")]
+
+    for element in elements:
+        if element.filename == filename:
+            padding = element.lineno - len(lines) - 1
+            lines.extend(["\n"] * padding)
+            references.extend([(0, "")] * padding)
+
+        content = element.content.splitlines(True)
+        lines.extend(content)
+        references.extend((element.lineno + i, element.filename) for i in range(len(content)))
+
+    return "".join(lines), references
+
+
+def read_kickstart_elements(ksparser, elements, filename):
+    """Read the kickstart elements with the given parser.
+
+    Line numbers of the kickstart errors are translated to
+    the line numbers of the kickstart files.
+
+    :param ksparser: a kickstart parser
+    :param elements: a list of kickstart elements
+    :param filename: a name of the main kickstart file
+    :raise: KickstartError if the elements are not valid
+    """
+    kickstart, references = get_kickstart_from_elements(elements, filename)
+
+    try:
+        ksparser.readKickstartFromString(kickstart)
+    except KickstartError as e:
+        if not e.lineno or e.lineno >= len(references):
+            raise
+
+        lineno, reference = references[e.lineno]
+
+        if lineno == e.lineno and reference == filename:
+            raise
+
+        raise KickstartError(e.message, lineno=lineno) from e
+
+
 def preScriptPass(f):
     # The first pass through kickstart file processing - look for %pre scripts
     # and run them.  This must come in a separate pass in case a script
     # generates an included file that has commands for later.
     ksparser = AnacondaPreParser(AnacondaKSHandler())
 
-    with check_kickstart_error():
-        ksparser.readKickstart(f)
+    try:
+        elements = split_kickstart_cache.get_elements(f)
+    except KickstartError as e:
+        # An included file might be generated by a %pre script,
+        # so read the kickstart file without the missing files.
+        log.debug("Failed to split the kickstart file: %s", e)
+
+        with check_kickstart_error():
+            ksparser.readKickstart(f)
+    else:
+        with check_kickstart_error():
+            scripts = elements.get_elements(sections=["pre"])
+            read_kickstart_elements(ksparser, scripts, f)
 
     # run %pre scripts
     runPreScripts(ksparser.handler.scripts)
 
 
+def get_handled_elements(handler, elements):
+    """Get the kickstart elements handled by the given handler.
+
+    The commands and sections that are handled only by
+    the DBus modules are skipped.
+
+    :param handler: a kickstart handler
+    :param elements: an instance of KickstartElements
+    :return: a list of kickstart elements
+    """
+    skipped_commands = {
+        name for name, command in handler.commands.items()
+        if isinstance(command, UselessCommand)
+    }
+
+    skipped_sections = {"packages"}
+
+    return [
+        element for element in elements.all_elements
+        if not (element.is_command() and element.name in skipped_commands)
+        and not (element.is_section() and element.name in skipped_sections)
+    ]
+
+
 def parseKickstart(handler, f, strict_mode=False, pass_to_boss=False):
     # preprocessing the kickstart file has already been handled in initramfs.
 
@@ -501,8 +653,10 @@ def parseKickstart(handler, f, strict_mode=False, pass_to_boss=False):
                     message = "\n\n".join(map(str, report.error_messages))
                     raise KickstartError(message)
 
-            # Parse the kickstart file in anaconda.
-            ksparser.readKickstart(f)
+            # Parse the kickstart file in anaconda. Skip the elements
+            # that are handled only by the DBus modules.
+            elements = split_kickstart_cache.get_elements(f)
+            read_kickstart_elements(ksparser, get_handled_elements(handler, elements), f)
 
             # Print kickstart warnings and error out if in strict mode
             if kswarnings:
@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+from concurrent.futures import ThreadPoolExecutor
+
 from pykickstart.errors import KickstartError
 from pykickstart.version import makeVersion
 
@@ -35,6 +37,7 @@ class KickstartManager(object):
 
     def __init__(self):
         self._module_observers = []
+        self._specifications = {}
 
     @property
     def module_observers(self):
@@ -44,6 +47,7 @@ class KickstartManager(object):
     def on_module_observers_changed(self, observers):
         """Set module observers for kickstart distribution."""
         self._module_observers = list(observers)
+        self._specifications = {}
 
     def read_kickstart_file(self, path):
         """Read the specified kickstart file.
@@ -73,25 +77,21 @@ class KickstartManager(object):
         return parser.split(path)
 
     def _distribute_to_modules(self, elements):
-        """Distribute split kickstart to modules synchronously.
+        """Distribute split kickstart to modules.
+
+        The kickstart is split in the order of the modules, but
+        the modules read their parts of the kickstart concurrently.
 
         :returns: list of (Line number, Message) errors reported by modules when
                   distributing kickstart
         :rtype: list of kickstart reports
         """
-        reports = []
-
-        for observer in self._module_observers:
-            if not observer.is_service_available:
-                log.warning("Module %s not available!", observer.service_name)
-                continue
-
-            commands = observer.proxy.KickstartCommands
-            sections = observer.proxy.KickstartSections
-            addons = observer.proxy.KickstartAddons
+        observers = self._get_available_observers()
+        specifications = self._get_specifications(observers)
+        requests = []
 
-            log.info("%s handles commands %s sections %s addons %s.",
-                     observer.service_name, commands, sections, addons)
+        for observer in observers:
+            commands, sections, addons = specifications[observer.service_name]
 
             module_elements = elements.get_and_process_elements(
                 commands=commands,
@@ -107,9 +107,17 @@ class KickstartManager(object):
                 log.info("There are no kickstart data for %s.", observer.service_name)
                 continue
 
-            module_report = KickstartReport.from_structure(
-                observer.proxy.ReadKickstart(module_kickstart)
-            )
+            requests.append((observer, module_elements, module_kickstart))
+
+        results = self._call_modules(
+            lambda request: request[0].proxy.ReadKickstart(request[2]),
+            requests
+        )
+
+        reports = []
+
+        for (observer, module_elements, _kickstart), result in zip(requests, results):
+            module_report = KickstartReport.from_structure(result)
 
             line_references = elements.get_references_from_elements(
                 module_elements
@@ -125,6 +133,70 @@ class KickstartManager(object):
 
         return reports
 
+    def _get_available_observers(self):
+        """Get observers of the available modules.
+
+        :return: a list of module observers
+        """
+        observers = []
+
+        for observer in self._module_observers:
+            if not observer.is_service_available:
+                log.warning("Module %s not available!", observer.service_name)
+                continue
+
+            observers.append(observer)
+
+        return observers
+
+    def _get_specifications(self, observers):
+        """Get the kickstart specifications of the modules.
+
+        The specifications don't change, so they are read from
+        the modules only once and then cached.
+
+        :param observers: a list of module observers
+        :return: a map of module names and tuples of commands, sections and addons
+        """
+        missing = [o for o in observers if o.service_name not in self._specifications]
+        results = self._call_modules(self._read_specification, missing)
+
+        for observer, specification in zip(missing, results):
+            self._specifications[observer.service_name] = specification
+
+        return self._specifications
+
+    def _read_specification(self, observer):
+        """Read the kickstart specification of the module.
+
+        :param observer: a module observer
+        :return: a tuple of commands, sections and addons
+        """
+        commands = observer.proxy.KickstartCommands
+        sections = observer.proxy.KickstartSections
+        addons = observer.proxy.KickstartAddons
+
+        log.info("%s handles commands %s sections %s addons %s.",
+                 observer.service_name, commands, sections, addons)
+
+        return commands, sections, addons
+
+    def _call_modules(self, function, items):
+        """Call the modules concurrently.
+
+        Every module runs in its own process, so the DBus calls
+        are sent from a pool of threads and handled in parallel.
+
+        :param function: a function that calls a module with the given item
+        :param items: a list of items
+        :return: a list of results in the order of the items
+        """
+        if not items:
+            return []
+
+        with ThreadPoolExecutor(max_workers=len(items)) as executor:
+            return list(executor.map(function, items))
+
     def _merge_module_reports(self, report, module_reports):
         """Merge the module reports into the final report."""
         for module_report in module_reports:
@@ -144,18 +216,14 @@ class KickstartManager(object):
 
         :return: a map of module names and kickstart strings
         """
-        result = {}
-
-        for observer in self._module_observers:
-            if not observer.is_service_available:
-                log.warning("Module %s not available!", observer.service_name)
-                continue
+        observers = self._get_available_observers()
 
-            module_name = observer.service_name
-            module_kickstart = observer.proxy.GenerateKickstart()
-            result[module_name] = module_kickstart
+        kickstarts = self._call_modules(
+            lambda observer: observer.proxy.GenerateKickstart(),
+            observers
+        )
 
-        return result
+        return {o.service_name: k for o, k in zip(observers, kickstarts)}
 
     def _merge_module_kickstarts(self, module_kickstarts):
         """Merge kickstart from modules
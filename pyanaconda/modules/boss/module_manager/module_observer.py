@@ -34,6 +34,7 @@ class ModuleObserver(DBusObserver):
         super().__init__(message_bus, service_name)
         self._proxy = None
         self._is_addon = is_addon
+        self._startup_time = None
         self._namespace = get_namespace_from_name(service_name)
         self._object_path = get_dbus_path(*self._namespace)
 
@@ -45,6 +46,18 @@ class ModuleObserver(DBusObserver):
         """
         return self._is_addon
 
+    @property
+    def startup_time(self):
+        """Time it took to start the observed module.
+
+        :return: a number of seconds or None if unknown
+        """
+        return self._startup_time
+
+    @startup_time.setter
+    def startup_time(self, value):
+        self._startup_time = value
+
     @property
     def proxy(self):
         """Returns a proxy of the remote object."""
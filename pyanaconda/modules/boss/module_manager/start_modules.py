@@ -16,6 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+import time
 from functools import partial
 from queue import SimpleQueue
 
@@ -53,6 +54,7 @@ class StartModulesTask(Task):
         self._addons_enabled = addons_enabled
         self._module_observers = []
         self._callbacks = SimpleQueue()
+        self._start_times = {}
 
     @property
     def name(self):
@@ -73,6 +75,9 @@ class StartModulesTask(Task):
         # Process the callbacks of the asynchronous calls.
         self._process_callbacks(self._module_observers)
 
+        # Report the start-up times of the modules.
+        self._report_startup_times(self._module_observers)
+
         return self._module_observers
 
     def _find_modules(self):
@@ -118,6 +123,7 @@ class StartModulesTask(Task):
 
         for observer in module_observers:
             log.debug("Starting %s.", observer)
+            self._start_times[observer] = time.monotonic()
 
             dbus.StartServiceByName(
                 observer.service_name,
@@ -155,10 +161,24 @@ class StartModulesTask(Task):
 
     def _service_available_handler(self, observer):
         """Handler for the service_available signal."""
-        log.debug("%s is available.", observer)
         observer.proxy.Ping()
+
+        start_time = self._start_times.get(observer)
+
+        if start_time is not None:
+            observer.startup_time = time.monotonic() - start_time
+
+        log.debug("%s is available.", observer)
         return True
 
+    def _report_startup_times(self, module_observers):
+        """Report the start-up times of the modules."""
+        timed = [o for o in module_observers if o.startup_time is not None]
+
+        for observer in sorted(timed, key=lambda o: o.startup_time, reverse=True):
+            log.debug("%s has started in %.2f seconds.", observer.service_name,
+                      observer.startup_time)
+
     def _process_callbacks(self, module_observers):
         """Process callbacks of the asynchronous calls.
 
@@ -32,7 +32,9 @@ def init(log_filename=None, log_stream=sys.stderr):
     import faulthandler
     faulthandler.enable()
 
+    import atexit
     import logging
+    from pyanaconda.anaconda_logging import AnacondaLogWriter, AnacondaQueueHandler
     handlers = []
 
     if log_stream:
@@ -45,9 +47,17 @@ def init(log_filename=None, log_stream=sys.stderr):
             logging.FileHandler(log_filename)
         )
 
+    # Write the logs in a dedicated thread.
+    writer = AnacondaLogWriter()
+    writer.start()
+    atexit.register(writer.stop)
+
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
     logging.basicConfig(
         level=logging.DEBUG,
-        handlers=handlers
+        handlers=[AnacondaQueueHandler(h, writer) for h in handlers]
     )
 
     import locale
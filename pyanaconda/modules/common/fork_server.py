@@ -0,0 +1,462 @@
+#
+# The fork server of the Anaconda DBus modules.
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+# This module is also used by the start-module script to start a module,
+# so it shouldn't import anything expensive at the top level.
+#
+import argparse
+import importlib
+import json
+import os
+import runpy
+import selectors
+import signal
+import socket
+import sys
+import time
+from multiprocessing.reduction import sendfds, recvfds
+
+from pyanaconda.core.constants import ANACONDA_FORK_SERVER_SOCKET, FORK_SERVER_START_TIMEOUT
+from pyanaconda.anaconda_loggers import get_module_logger
+log = get_module_logger(__name__)
+
+__all__ = ["ForkServer", "start_module", "FORK_SERVER_UNAVAILABLE"]
+
+# The exit status of the client if the module can't be started by the fork server.
+FORK_SERVER_UNAVAILABLE = 75
+
+# The modules shared by all Anaconda DBus modules. They are imported
+# by the fork server once, so the forked modules don't have to. Modules
+# that are used only by one DBus module are not preloaded, because it
+# wouldn't make the start-up faster.
+PRELOADED_MODULES = [
+    "gi.repository.GLib",
+    "gi.repository.Gio",
+    "dasbus.connection",
+    "dasbus.server.interface",
+    "dasbus.server.template",
+    "dasbus.typing",
+    "pykickstart.parser",
+    "pyanaconda.core.configuration.anaconda",
+    "pyanaconda.core.dbus",
+    "pyanaconda.core.kickstart",
+    "pyanaconda.core.util",
+    "pyanaconda.modules.common.base",
+    "pyanaconda.modules.common.containers",
+    "pyanaconda.modules.common.task",
+    "pyanaconda.modules.common.structures.requirement",
+]
+
+# The variables of the environment that can't be changed after the start of
+# a process. A module that requires different values can't be forked.
+_FIXED_ENVIRONMENT_PREFIXES = ("LD_", "PYTHON")
+_FIXED_ENVIRONMENT_EXCEPTIONS = ("PYTHONPATH", )
+
+# The file descriptors of the standard input and outputs.
+_STANDARD_FDS = [0, 1, 2]
+
+
+class _ModuleRequest(object):
+    """A request to start a module."""
+
+    def __init__(self, connection, fds, data):
+        """Create a new request.
+
+        :param connection: a connection to the client
+        :param fds: a list of file descriptors of the client
+        :param data: a dictionary with the data of the request
+        """
+        self.connection = connection
+        self.fds = fds
+        self.module = data["module"]
+        self.environment = data["environment"]
+        self.cwd = data["cwd"]
+        self.start_time = time.monotonic()
+
+
+class ForkServer(object):
+    """The fork server of the Anaconda DBus modules.
+
+    The server imports the modules shared by the Anaconda DBus modules
+    and waits for the requests of the start-module script. For every
+    request, it forks a new process that runs the requested module with
+    the standard input and outputs, the environment and the working
+    directory of the client. So every module still runs in its own
+    process and logs to its own files, but it doesn't have to start
+    a new interpreter and import the shared modules from scratch.
+
+    The server doesn't run any threads, so it is safe to fork it.
+    """
+
+    def __init__(self, socket_path=ANACONDA_FORK_SERVER_SOCKET,
+                 preloaded_modules=PRELOADED_MODULES):
+        """Create a new fork server.
+
+        :param str socket_path: a path to the socket of the server
+        :param preloaded_modules: a list of modules to import
+        """
+        self._socket_path = socket_path
+        self._preloaded_modules = preloaded_modules
+        self._environment = dict(os.environ)
+        self._server = None
+        self._selector = None
+        self._wakeup_fds = None
+        self._children = {}
+
+    def run(self):
+        """Run the server.
+
+        The method returns only in a forked process.
+
+        :return: a request to start a module
+        """
+        self._listen()
+        self._preload_modules()
+        self._watch_children()
+
+        while True:
+            for key, _mask in self._selector.select():
+                if key.fileobj is self._server:
+                    request = self._accept_request()
+                elif key.fileobj == self._wakeup_fds[0]:
+                    request = None
+                    self._reap_children()
+                else:
+                    request = None
+
+                if request and self._fork(request) == 0:
+                    return request
+
+    def _listen(self):
+        """Start to listen on the socket.
+
+        The clients can connect right away. Their requests
+        are processed once the modules are preloaded.
+        """
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self._socket_path)
+        self._server.listen(64)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+
+    def _preload_modules(self):
+        """Import the shared modules."""
+        start = time.monotonic()
+
+        for name in self._preloaded_modules:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                log.warning("Failed to preload %s: %s", name, e)
+
+        log.debug("Preloaded %d modules in %.2f seconds.",
+                  len(self._preloaded_modules), time.monotonic() - start)
+
+    def _watch_children(self):
+        """Wake up the server when a child terminates."""
+        self._wakeup_fds = os.pipe()
+        os.set_blocking(self._wakeup_fds[0], False)
+        os.set_blocking(self._wakeup_fds[1], False)
+
+        signal.set_wakeup_fd(self._wakeup_fds[1])
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        self._selector.register(self._wakeup_fds[0], selectors.EVENT_READ)
+
+    def _accept_request(self):
+        """Accept a request of a client.
+
+        :return: a request or None
+        """
+        connection, _address = self._server.accept()
+        fds = []
+
+        try:
+            # The client sends the file descriptors first, then
+            # the data of the request and it closes its end.
+            fds = recvfds(connection, len(_STANDARD_FDS))
+            data = b""
+
+            while True:
+                chunk = connection.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+
+            request = _ModuleRequest(connection, fds, json.loads(data.decode("utf-8")))
+        except (OSError, RuntimeError, ValueError, KeyError) as e:
+            log.warning("Failed to accept a request: %s", e)
+            connection.close()
+
+            for fd in fds:
+                os.close(fd)
+
+            return None
+
+        if not self._is_compatible(request.environment):
+            log.debug("Refusing to fork %s with a different environment.", request.module)
+            self._reply(request, {"error": "incompatible environment"})
+            self._close_request(request)
+            return None
+
+        return request
+
+    def _is_compatible(self, environment):
+        """Can we fork a module with the given environment?"""
+        names = set(self._environment) | set(environment)
+
+        for name in names:
+            if not name.startswith(_FIXED_ENVIRONMENT_PREFIXES):
+                continue
+
+            if name in _FIXED_ENVIRONMENT_EXCEPTIONS:
+                continue
+
+            if self._environment.get(name) != environment.get(name):
+                return False
+
+        return True
+
+    def _fork(self, request):
+        """Fork a process for the request.
+
+        :return: 0 in the child, a pid of the child in the parent
+        """
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        pid = os.fork()
+
+        if pid == 0:
+            self._set_up_child(request)
+            return pid
+
+        for fd in request.fds:
+            os.close(fd)
+
+        log.debug("Forked %s as %d in %.3f seconds.", request.module, pid,
+                  time.monotonic() - request.start_time)
+
+        self._children[pid] = request
+        self._reply(request, {"pid": pid})
+        return pid
+
+    def _set_up_child(self, request):
+        """Set up the forked process."""
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        # Close everything that belongs to the server.
+        self._selector.close()
+        self._server.close()
+
+        for fd in self._wakeup_fds:
+            os.close(fd)
+
+        for other in self._children.values():
+            other.connection.close()
+
+        self._children = {}
+        request.connection.close()
+
+        # Use the standard input and outputs of the client.
+        for target, fd in zip(_STANDARD_FDS, request.fds):
+            os.dup2(fd, target)
+            os.close(fd)
+
+        # Use the environment and the working directory of the client.
+        os.environ.clear()
+        os.environ.update(request.environment)
+        os.chdir(request.cwd)
+
+        paths = request.environment.get("PYTHONPATH", "").split(os.pathsep)
+
+        for path in reversed(paths):
+            if path and path not in sys.path:
+                sys.path.insert(0, path)
+
+    def _reap_children(self):
+        """Report the exit status of terminated children."""
+        try:
+            while os.read(self._wakeup_fds[0], 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+
+            if pid == 0:
+                break
+
+            request = self._children.pop(pid, None)
+
+            if not request:
+                continue
+
+            status = _get_exit_status(status)
+            log.debug("%s has exited with status %d.", request.module, status)
+
+            self._reply(request, {"status": status})
+            self._close_request(request)
+
+    def _reply(self, request, data):
+        """Send a reply to the client.
+
+        The client doesn't have to wait for the reply.
+        """
+        try:
+            request.connection.sendall(json.dumps(data).encode("utf-8") + b"\n")
+        except OSError:
+            pass
+
+    def _close_request(self, request):
+        """Close the request."""
+        request.connection.close()
+
+        for fd in request.fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+        request.fds = []
+
+
+def _get_exit_status(status):
+    """Convert a wait status to an exit status like a shell."""
+    if os.WIFSIGNALED(status):
+        return 128 + os.WTERMSIG(status)
+
+    return os.WEXITSTATUS(status)
+
+
+def start_module(module, socket_path=ANACONDA_FORK_SERVER_SOCKET,
+                 timeout=FORK_SERVER_START_TIMEOUT, fds=None, environment=None):
+    """Start a module with the fork server.
+
+    Wait until the module terminates or until the timeout.
+
+    :param str module: a name of the Python module
+    :param str socket_path: a path to the socket of the fork server
+    :param int timeout: a number of seconds to wait for the module
+    :param fds: a list of the standard file descriptors for the module
+    :param environment: a dictionary with the environment for the module
+    :return: an exit status of the module, 0 on timeout or None if the
+             fork server can't start the module
+    """
+    if fds is None:
+        fds = _STANDARD_FDS
+
+    if environment is None:
+        environment = dict(os.environ)
+
+    data = {
+        "module": module,
+        "environment": environment,
+        "cwd": os.getcwd(),
+    }
+
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(socket_path)
+    except OSError:
+        return None
+
+    with client:
+        try:
+            sendfds(client, fds)
+            client.sendall(json.dumps(data).encode("utf-8"))
+            client.shutdown(socket.SHUT_WR)
+        except OSError:
+            return None
+
+        client.settimeout(timeout)
+        reader = client.makefile("rb")
+        forked = False
+
+        try:
+            for line in reader:
+                reply = json.loads(line.decode("utf-8"))
+
+                if "error" in reply:
+                    return None
+
+                if "pid" in reply:
+                    forked = True
+
+                if "status" in reply:
+                    return reply["status"]
+
+        except socket.timeout:
+            # The module is still running.
+            return 0
+
+        finally:
+            reader.close()
+
+    # The server has terminated. If the module has been
+    # forked, it is still running, otherwise start it again.
+    return 0 if forked else None
+
+
+def run_module(module):
+    """Run a module as the main module of the process.
+
+    :param str module: a name of the Python module
+    """
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def main(argv=None):
+    """Run the fork server or start a module with the fork server.
+
+    :return: an exit status
+    """
+    parser = argparse.ArgumentParser(description="The fork server of the Anaconda modules.")
+    parser.add_argument("--socket", default=ANACONDA_FORK_SERVER_SOCKET,
+                        help="a path to the socket of the fork server")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the fork server")
+    parser.add_argument("module", nargs="?",
+                        help="a name of the Python module to start")
+    args = parser.parse_args(argv)
+
+    if not args.serve and not args.module:
+        parser.error("the name of the module is required")
+
+    if not args.serve:
+        status = start_module(args.module, socket_path=args.socket)
+        return FORK_SERVER_UNAVAILABLE if status is None else status
+
+    # This returns only in the forked processes.
+    request = ForkServer(args.socket).run()
+    run_module(request.module)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,7 +19,8 @@
 from dasbus.structure import DBusData
 from dasbus.typing import *  # pylint: disable=wildcard-import
 
-__all__ = ["DeviceData", "DeviceFormatData", "DeviceActionData", "OSData"]
+__all__ = ["DeviceData", "DeviceFormatData", "DeviceInfoData", "DeviceTreeData",
+           "DeviceActionData", "OSData"]
 
 
 class DeviceData(DBusData):
@@ -268,6 +269,103 @@ class DeviceFormatData(DBusData):
         self._description = text
 
 
+class DeviceInfoData(DBusData):
+    """All data of a device collected at once."""
+
+    def __init__(self):
+        self._device = DeviceData()
+        self._format = DeviceFormatData()
+        self._free_space = 0
+
+    @property
+    def device(self) -> DeviceData:
+        """Data of the device.
+
+        :return: an instance of DeviceData
+        """
+        return self._device
+
+    @device.setter
+    def device(self, data: DeviceData):
+        self._device = data
+
+    @property
+    def format(self) -> DeviceFormatData:
+        """Data of the device format.
+
+        :return: an instance of DeviceFormatData
+        """
+        return self._format
+
+    @format.setter
+    def format(self, data: DeviceFormatData):
+        self._format = data
+
+    @property
+    def free_space(self) -> UInt64:
+        """Free space available for use.
+
+        It is the free space on a disk with
+        a supported disk label, otherwise 0.
+
+        :return: a size in bytes
+        """
+        return self._free_space
+
+    @free_space.setter
+    def free_space(self, size: UInt64):
+        self._free_space = size
+
+
+class DeviceTreeData(DBusData):
+    """Data of devices in the device tree."""
+
+    def __init__(self):
+        self._generation = 0
+        self._devices = []
+        self._removed_devices = []
+
+    @property
+    def generation(self) -> UInt64:
+        """A generation of the device tree.
+
+        The generation is increased every time a change
+        of the device tree is detected. Use it to request
+        only the devices that changed since then.
+
+        :return: a number of the generation
+        """
+        return self._generation
+
+    @generation.setter
+    def generation(self, value: UInt64):
+        self._generation = value
+
+    @property
+    def devices(self) -> List[DeviceInfoData]:
+        """Data of the devices.
+
+        :return: a list of DeviceInfoData
+        """
+        return self._devices
+
+    @devices.setter
+    def devices(self, devices: List[DeviceInfoData]):
+        self._devices = devices
+
+    @property
+    def removed_devices(self) -> List[Str]:
+        """Names of the removed devices.
+
+        :return: a list of device names
+        """
+        return self._removed_devices
+
+    @removed_devices.setter
+    def removed_devices(self, names: List[Str]):
+        self._removed_devices = names
+
+
 class DeviceActionData(DBusData):
     """Device action data."""
 
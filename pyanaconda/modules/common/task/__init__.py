@@ -15,8 +15,10 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
-from time import sleep
+from queue import Queue, Empty
+from time import monotonic
 
+from pyanaconda.core.constants import TASK_STATE_CHECK_INTERVAL
 from pyanaconda.modules.common.task.task_interface import TaskInterface
 from pyanaconda.modules.common.task.task import Task, AbstractTask
 from pyanaconda.modules.common.task.meta import DBusMetaTask
@@ -24,28 +26,98 @@ from pyanaconda.modules.common.task.meta import DBusMetaTask
 __all__ = ["sync_run_task", "async_run_task", "AbstractTask", "Task", "TaskInterface",
            "DBusMetaTask"]
 
+# Events of a synchronously running task.
+_TASK_PROGRESS_CHANGED = "progress-changed"
+_TASK_STOPPED = "stopped"
 
-def sync_run_task(task_proxy, callback=None):
+
+def sync_run_task(task_proxy, callback=None, timeout=None):
     """Run a remote task synchronously.
 
-    The given callback will be called every iteration.
+    Wait for the Stopped signal of the task. The signal is delivered
+    only if the main loop of the default context is running and it is
+    not blocked by the caller, so check the state of the task also
+    periodically. The default context is never acquired here, because
+    it belongs to the main loop of the user interface.
+
+    The given callback will be called in the calling thread every time
+    the progress of the task changes and every time the state of the
+    task is checked.
 
     :param task_proxy: a proxy of the remote task
-    :param callback: a callback
+    :param callback: a callback with a task_proxy argument
+    :param timeout: a timeout in seconds or None to wait forever
     :raise: a remote error
+    :raise TimeoutError: if the task was canceled after the timeout
     """
-    task_proxy.Start()
+    events = Queue()
 
-    while task_proxy.IsRunning:
+    def _progress_changed(step, msg):
+        events.put(_TASK_PROGRESS_CHANGED)
 
-        if callback:
-            callback(task_proxy)
+    def _stopped():
+        events.put(_TASK_STOPPED)
 
-        sleep(1)
+    task_proxy.ProgressChanged.connect(_progress_changed)
+    task_proxy.Stopped.connect(_stopped)
+
+    try:
+        task_proxy.Start()
+        _wait_for_task(task_proxy, events, callback, timeout)
+    finally:
+        task_proxy.ProgressChanged.disconnect(_progress_changed)
+        task_proxy.Stopped.disconnect(_stopped)
 
     task_proxy.Finish()
 
 
+def _wait_for_task(task_proxy, events, callback, timeout):
+    """Wait for the remote task to stop.
+
+    :param task_proxy: a proxy of the remote task
+    :param events: a queue of task events
+    :param callback: a callback with a task_proxy argument or None
+    :param timeout: a timeout in seconds or None
+    :raise TimeoutError: if the task was canceled after the timeout
+    """
+    start_time = monotonic()
+    check_time = start_time + TASK_STATE_CHECK_INTERVAL
+
+    while True:
+        wait_time = max(check_time - monotonic(), 0)
+
+        if timeout is not None:
+            wait_time = min(wait_time, max(start_time + timeout - monotonic(), 0))
+
+        try:
+            event = events.get(timeout=wait_time)
+        except Empty:
+            event = None
+
+        if event == _TASK_STOPPED:
+            return
+
+        now = monotonic()
+
+        if timeout is not None and now - start_time >= timeout:
+            task_proxy.Cancel()
+            raise TimeoutError("The task {} has timed out after {} seconds.".format(
+                task_proxy.Name, timeout
+            ))
+
+        if now >= check_time:
+            check_time = now + TASK_STATE_CHECK_INTERVAL
+
+            if not task_proxy.IsRunning:
+                return
+
+        elif event != _TASK_PROGRESS_CHANGED:
+            continue
+
+        if callback:
+            callback(task_proxy)
+
+
 def async_run_task(task_proxy, callback):
     """Run a remote task asynchronously.
 
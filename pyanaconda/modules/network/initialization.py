@@ -23,7 +23,8 @@ from pyanaconda.modules.network.network_interface import NetworkInitializationTa
 from pyanaconda.modules.network.nm_client import get_device_name_from_network_data, \
     update_connection_from_ksdata, add_connection_from_ksdata, bound_hwaddr_of_device, \
     update_connection_values, commit_changes_with_autoconnection_blocked, \
-    get_config_file_connection_of_device, clone_connection_sync
+    get_config_file_connection_of_device, clone_connection_sync, ConnectionBatch, \
+    add_connection_from_ksdata_to_batch
 from pyanaconda.modules.network.device_configuration import supported_wired_device_types, \
     virtual_device_types
 from pyanaconda.modules.network.utils import guard_by_system_configuration
@@ -84,6 +85,8 @@ class ApplyKickstartTask(Task):
             log.debug("%s: No NetworkManager available.", self.name)
             return applied_devices
 
+        batch = ConnectionBatch(self._nm_client)
+
         for network_data in self._network_data:
             # Wireless is not supported
             if network_data.essid:
@@ -98,6 +101,11 @@ class ApplyKickstartTask(Task):
                 log.warning("%s: --device %s not found", self.name, network_data.device)
                 continue
 
+            # Bridges and repeated devices use the connections of the previous
+            # configurations, so add them first.
+            if network_data.bridgeslaves or device_name in applied_devices:
+                self._run_batch(batch)
+
             applied_devices.append(device_name)
 
             connection = self._find_initramfs_connection_of_iface(device_name)
@@ -111,25 +119,36 @@ class ApplyKickstartTask(Task):
                     connection,
                     network_data,
                     device_name,
-                    ifname_option_values=self._ifname_option_values
+                    ifname_option_values=self._ifname_option_values,
+                    commit=False
+                )
+                batch.update_connection(
+                    connection,
+                    device_name,
+                    activate=network_data.activate
                 )
-                if network_data.activate:
-                    device = self._nm_client.get_device_by_iface(device_name)
-                    self._nm_client.activate_connection_async(connection, device, None, None)
-                    log.debug("%s: activating updated connection %s with device %s",
-                              self.name, connection.get_uuid(), device_name)
             else:
                 log.debug("%s: adding connection for %s", self.name, device_name)
-                add_connection_from_ksdata(
-                    self._nm_client,
+                add_connection_from_ksdata_to_batch(
+                    batch,
                     network_data,
                     device_name,
                     activate=network_data.activate,
                     ifname_option_values=self._ifname_option_values
                 )
 
+        self._run_batch(batch)
         return applied_devices
 
+    def _run_batch(self, batch):
+        """Add, update and activate the connections of the batch at once."""
+        for operation in batch.run():
+            log.debug("%s: %s of connection %s for %s %s in %s seconds",
+                      self.name, operation.kind, operation.connection.get_uuid(),
+                      operation.device_name,
+                      "succeeded" if operation.succeeded else "failed",
+                      "-" if operation.duration is None else "{:.3f}".format(operation.duration))
+
     def _find_initramfs_connection_of_iface(self, iface):
         device = self._nm_client.get_device_by_iface(iface)
         if device:
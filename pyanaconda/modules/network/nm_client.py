@@ -23,6 +23,7 @@ gi.require_version("NM", "1.0")
 from gi.repository import NM
 
 import socket
+import time
 from queue import Queue, Empty
 from pykickstart.constants import BIND_TO_MAC
 from pyanaconda.modules.network.constants import NM_CONNECTION_UUID_LENGTH, \
@@ -513,8 +514,39 @@ def add_connection_from_ksdata(nm_client, network_data, device_name, activate=Fa
     :param ifname_option_values: list of ifname boot option values
     :type ifname_option_values: list(str)
     """
+    batch = ConnectionBatch(nm_client)
+    connections = add_connection_from_ksdata_to_batch(
+        batch,
+        network_data,
+        device_name,
+        activate=activate,
+        ifname_option_values=ifname_option_values
+    )
+    batch.run()
+    return connections
+
+
+def add_connection_from_ksdata_to_batch(batch, network_data, device_name, activate=False,
+                                        ifname_option_values=None):
+    """Add NM connections created from kickstart configuration to a batch.
+
+    The connections are added when the batch is run.
+
+    :param batch: batch of connection operations
+    :type batch: ConnectionBatch
+    :param network_data: kickstart configuration
+    :type network_data: pykickstart NetworkData
+    :param device_name: name of the device to be configured by kickstart
+    :type device_name: str
+    :param activate: activate the added connection
+    :type activate: bool
+    :param ifname_option_values: list of ifname boot option values
+    :type ifname_option_values: list(str)
+    :return: list of tuples (CONNECTION, NAME_OF_DEVICE_TO_BE_ACTIVATED)
+    :rtype: list((NM.SimpleConnection, str))
+    """
     connections = create_connections_from_ksdata(
-        nm_client,
+        batch.nm_client,
         network_data,
         device_name,
         ifname_option_values
@@ -524,64 +556,238 @@ def add_connection_from_ksdata(nm_client, network_data, device_name, activate=Fa
         log.debug("add connection (activate=%s): %s for %s\n%s",
                   activate, connection.get_uuid(), device_name,
                   connection.to_dbus(NM.ConnectionSerializationFlags.NO_SECRETS))
-        added_connection = add_connection_sync(
-            nm_client,
-            connection,
-        )
-
-        if not added_connection:
-            continue
-
-        if activate:
-            if device_name:
-                device = nm_client.get_device_by_iface(device_name)
-                if device:
-                    log.debug("activating with device %s", device.get_iface())
-                else:
-                    log.debug("activating without device specified - device %s not found",
-                              device_name)
-            else:
-                device = None
-                log.debug("activating without device specified")
-            nm_client.activate_connection_async(added_connection, device, None, None)
+        batch.add_connection(connection, device_name, activate=activate)
 
     return connections
 
 
-def add_connection_sync(nm_client, connection):
-    """Add a connection synchronously and optionally activate asynchronously.
-
-    :param connection: connection to be added
-    :type connection: NM.SimpleConnection
-    :return: added connection or None on timeout
-    :rtype: NM.RemoteConnection
+class ConnectionOperation(object):
+    """Operation with a NetworkManager connection in a batch."""
+
+    ADD = "add"
+    UPDATE = "update"
+
+    def __init__(self, kind, connection, device_name=None, activate=False):
+        """Create a new operation.
+
+        :param kind: kind of the operation (ADD or UPDATE)
+        :type kind: str
+        :param connection: connection to be added or updated
+        :type connection: NM.SimpleConnection or NM.RemoteConnection
+        :param device_name: name of the device to be used for the activation
+        :type device_name: str
+        :param activate: activate the connection when the operation is done
+        :type activate: bool
+        """
+        self.kind = kind
+        self.connection = connection
+        self.device_name = device_name
+        self.activate = activate
+        # the added or updated connection
+        self.result = None
+        # the error message if the operation has failed
+        self.error = None
+        # the time of the operation in seconds
+        self.duration = None
+        self.activated = False
+
+    @property
+    def succeeded(self):
+        """Has the operation succeeded?"""
+        return self.result is not None and self.error is None
+
+    def __repr__(self):
+        return "ConnectionOperation(kind={}, uuid={}, device_name={})".format(
+            self.kind, self.connection.get_uuid(), self.device_name)
+
+
+class ConnectionBatch(object):
+    """Batch of NetworkManager connection operations.
+
+    All additions and updates of connections are submitted to NetworkManager
+    at once and the batch waits for their completion together. The requested
+    activations are started when all operations are done, in the order of
+    the submission, so master connections are activated before their slaves.
     """
-    sync_queue = Queue()
 
-    def finish_callback(nm_client, result, sync_queue):
-        con, result = nm_client.add_connection2_finish(result)
-        log.debug("connection %s added:\n%s", con.get_uuid(),
-                  con.to_dbus(NM.ConnectionSerializationFlags.NO_SECRETS))
-        sync_queue.put(con)
+    def __init__(self, nm_client, timeout=CONNECTION_ADDING_TIMEOUT):
+        """Create a new batch.
+
+        :param nm_client: instance of NetworkManager client
+        :type nm_client: NM.Client
+        :param timeout: time in seconds to wait for all operations
+        :type timeout: int
+        """
+        self._nm_client = nm_client
+        self._timeout = timeout
+        self._operations = []
+
+    @property
+    def nm_client(self):
+        """The NetworkManager client."""
+        return self._nm_client
+
+    @property
+    def operations(self):
+        """List of pending operations in the batch."""
+        return list(self._operations)
+
+    def add_connection(self, connection, device_name=None, activate=False):
+        """Add a new connection to NetworkManager.
+
+        :param connection: connection to be added
+        :type connection: NM.SimpleConnection
+        :param device_name: name of the device to be used for the activation
+        :type device_name: str
+        :param activate: activate the added connection
+        :type activate: bool
+        """
+        self._operations.append(ConnectionOperation(
+            ConnectionOperation.ADD, connection, device_name, activate
+        ))
+
+    def update_connection(self, connection, device_name=None, activate=False):
+        """Commit changes of an existing connection with blocked autoconnection.
+
+        :param connection: connection to be updated
+        :type connection: NM.RemoteConnection
+        :param device_name: name of the device to be used for the activation
+        :type device_name: str
+        :param activate: activate the updated connection
+        :type activate: bool
+        """
+        self._operations.append(ConnectionOperation(
+            ConnectionOperation.UPDATE, connection, device_name, activate
+        ))
+
+    def run(self):
+        """Run all pending operations of the batch.
+
+        The batch is empty when the operations are done.
+
+        :return: list of finished operations
+        :rtype: list(ConnectionOperation)
+        """
+        operations, self._operations = self._operations, []
+
+        if not operations:
+            return []
+
+        start = time.monotonic()
+        sync_queue = Queue()
+
+        for operation in operations:
+            self._submit_operation(operation, sync_queue)
+
+        self._wait_for_operations(operations, sync_queue, start + self._timeout)
+
+        for operation in operations:
+            if operation.activate and operation.succeeded:
+                self._activate_connection(operation)
+
+        log.debug("%d connection operations have taken %.3f seconds.",
+                  len(operations), time.monotonic() - start)
+
+        return operations
+
+    def _submit_operation(self, operation, sync_queue):
+        """Submit the operation to NetworkManager."""
+        start = time.monotonic()
+
+        def finish_callback(source, result, finish):
+            try:
+                ret = finish(source, result)
+            except Exception as e:  # pylint: disable=broad-except
+                sync_queue.put((operation, None, str(e), time.monotonic() - start))
+            else:
+                sync_queue.put((operation, ret, None, time.monotonic() - start))
+
+        if operation.kind == ConnectionOperation.ADD:
+            self._nm_client.add_connection2(
+                operation.connection.to_dbus(NM.ConnectionSerializationFlags.ALL),
+                (NM.SettingsAddConnection2Flags.TO_DISK |
+                 NM.SettingsAddConnection2Flags.BLOCK_AUTOCONNECT),
+                None,
+                False,
+                None,
+                finish_callback,
+                self._finish_adding
+            )
+        else:
+            con2 = NM.SimpleConnection.new_clone(operation.connection)
+            operation.connection.update2(
+                con2.to_dbus(NM.ConnectionSerializationFlags.ALL),
+                (NM.SettingsUpdate2Flags.TO_DISK |
+                 NM.SettingsUpdate2Flags.BLOCK_AUTOCONNECT),
+                None,
+                None,
+                finish_callback,
+                self._finish_updating
+            )
+
+    @staticmethod
+    def _finish_adding(nm_client, result):
+        """Finish the addition of a connection."""
+        con, _result = nm_client.add_connection2_finish(result)
+        return con
+
+    @staticmethod
+    def _finish_updating(connection, result):
+        """Finish the update of a connection."""
+        connection.update2_finish(result)
+        return connection
+
+    def _wait_for_operations(self, operations, sync_queue, deadline):
+        """Wait for the results of the submitted operations."""
+        pending = set(operations)
+
+        while pending:
+            try:
+                operation, result, error, duration = sync_queue.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except Empty:
+                break
+
+            operation.result = result
+            operation.error = error
+            operation.duration = duration
+            pending.discard(operation)
+
+            if operation.succeeded:
+                log.debug("connection %s %s in %.3f seconds:\n%s",
+                          result.get_uuid(),
+                          "added" if operation.kind == ConnectionOperation.ADD else "updated",
+                          duration,
+                          result.to_dbus(NM.ConnectionSerializationFlags.NO_SECRETS))
+            else:
+                log.error("Operation %s of connection %s has failed: %s", operation.kind,
+                          operation.connection.get_uuid(), error)
 
-    nm_client.add_connection2(
-        connection.to_dbus(NM.ConnectionSerializationFlags.ALL),
-        (NM.SettingsAddConnection2Flags.TO_DISK |
-         NM.SettingsAddConnection2Flags.BLOCK_AUTOCONNECT),
-        None,
-        False,
-        None,
-        finish_callback,
-        sync_queue
-    )
+        # The late results are ignored.
+        for operation in pending:
+            operation.error = "timed out"
+            log.error("Operation %s of connection %s timed out.", operation.kind,
+                      operation.connection.get_uuid())
 
-    try:
-        ret = sync_queue.get(timeout=CONNECTION_ADDING_TIMEOUT)
-    except Empty:
-        log.error("Adding of connection %s timed out.", connection.get_uuid())
-        ret = None
+    def _activate_connection(self, operation):
+        """Activate the connection of the operation asynchronously."""
+        device = None
 
-    return ret
+        if operation.device_name:
+            device = self._nm_client.get_device_by_iface(operation.device_name)
+
+            if device:
+                log.debug("activating %s with device %s", operation.result.get_uuid(),
+                          device.get_iface())
+            else:
+                log.debug("activating %s without device specified - device %s not found",
+                          operation.result.get_uuid(), operation.device_name)
+        else:
+            log.debug("activating %s without device specified", operation.result.get_uuid())
+
+        self._nm_client.activate_connection_async(operation.result, device, None, None)
+        operation.activated = True
 
 
 def create_slave_connection(slave_type, slave_idx, slave, master, autoconnect, settings=None):
@@ -673,7 +879,7 @@ def bound_hwaddr_of_device(nm_client, device_name, ifname_option_values):
 
 
 def update_connection_from_ksdata(nm_client, connection, network_data, device_name,
-                                  ifname_option_values=None):
+                                  ifname_option_values=None, commit=True):
     """Update NM connection specified by uuid from kickstart configuration.
 
     :param connection: existing NetworkManager connection to be updated
@@ -684,6 +890,8 @@ def update_connection_from_ksdata(nm_client, connection, network_data, device_na
     :type device_name: str
     :param ifname_option_values: list of ifname boot option values
     :type ifname_option_values: list(str)
+    :param commit: commit the changes of the connection
+    :type commit: bool
     """
     log.debug("updating connection %s:\n%s", connection.get_uuid(),
               connection.to_dbus(NM.ConnectionSerializationFlags.NO_SECRETS))
@@ -710,6 +918,9 @@ def update_connection_from_ksdata(nm_client, connection, network_data, device_na
         else:
             bind_connection(nm_client, connection, network_data.bindto, device_name)
 
+    if not commit:
+        return
+
     commit_changes_with_autoconnection_blocked(connection)
 
     log.debug("updated connection %s:\n%s", connection.get_uuid(),
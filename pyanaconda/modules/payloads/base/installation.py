@@ -17,25 +17,37 @@
 #
 from pyanaconda.modules.common.task import Task
 from pyanaconda.modules.common.errors.payload import InstallError
+from pyanaconda.modules.payloads.base.parallel_copy import ParallelCopy
 from pyanaconda.core.constants import INSTALL_TREE
-from pyanaconda.core.util import execWithRedirect
+from pyanaconda.core.util import execWithRedirect, parse_rsync_progress
 
 from pyanaconda.anaconda_loggers import get_module_logger
 log = get_module_logger(__name__)
 
 
+# The files excluded from the installation image.
+IMAGE_EXCLUDES = [
+    "/dev/", "/proc/", "/tmp/*", "/sys/", "/run/", "/boot/*rescue*",
+    "/boot/loader/", "/boot/efi/loader/", "/etc/machine-id"
+]
+
+
 class InstallFromImageTask(Task):
     """Task to install the payload from image."""
 
-    def __init__(self, dest_path, source=None):
+    def __init__(self, dest_path, source=None, workers=0):
         """Create a new task.
 
         :param dest_path: installation destination root path
         :type dest_path: str
+        :param workers: a number of threads copying the files or 0 to use rsync
+        :type workers: int
         """
         super().__init__()
         self._source = source
         self._dest_path = dest_path
+        self._workers = workers
+        self._pct = -1
 
     @property
     def name(self):
@@ -48,18 +60,71 @@ class InstallFromImageTask(Task):
         if self._source is not None and not self._source.get_state():
             raise InstallError("Source is not set up!")
 
+        if self._workers:
+            self._copy_with_threads()
+        else:
+            self._copy_with_rsync()
+
+    def _copy_with_threads(self):
+        """Copy the image with the parallel copy."""
+        # TODO: source will provide us source path instead of using constant here
+        copy = ParallelCopy(
+            INSTALL_TREE,
+            self._dest_path,
+            excludes=IMAGE_EXCLUDES,
+            workers=self._workers,
+            progress_callback=self._report_copy_progress
+        )
+
+        try:
+            copy.run()
+        except OSError as e:
+            log.error(str(e))
+            raise InstallError(str(e)) from e
+
+    def _report_copy_progress(self, bytes_copied, bytes_total):
+        """Report the progress of the parallel copy."""
+        if not bytes_total:
+            return
+
+        self._report_percentage(int(100 * bytes_copied / bytes_total))
+
+    def _report_rsync_progress(self, line):
+        """Report the progress of rsync."""
+        progress = parse_rsync_progress(line)
+
+        if not progress:
+            return
+
+        self._report_percentage(progress[1])
+
+    def _report_percentage(self, pct):
+        """Report the percentage of the installed image."""
+        pct = min(100, pct)
+
+        if pct == self._pct:
+            return
+
+        self._pct = pct
+        self.report_progress("Installing the image (%(pct)d%%)" % {"pct": pct})
+
+    def _copy_with_rsync(self):
+        """Copy the image with rsync."""
         cmd = "rsync"
         # preserve: permissions, owners, groups, ACL's, xattrs, times,
         #           symlinks, hardlinks
         # go recursively, include devices and special files, don't cross
-        # file system boundaries
+        # file system boundaries, report the overall progress
         # TODO: source will provide us source path instead of using constant here
-        args = ["-pogAXtlHrDx", "--exclude", "/dev/", "--exclude", "/proc/", "--exclude", "/tmp/*",
-                "--exclude", "/sys/", "--exclude", "/run/", "--exclude", "/boot/*rescue*",
-                "--exclude", "/boot/loader/", "--exclude", "/boot/efi/loader/",
-                "--exclude", "/etc/machine-id", INSTALL_TREE + "/", self._dest_path]
+        args = ["-pogAXtlHrDx", "--info=progress2"]
+
+        for pattern in IMAGE_EXCLUDES:
+            args.extend(["--exclude", pattern])
+
+        args.extend([INSTALL_TREE + "/", self._dest_path])
+
         try:
-            rc = execWithRedirect(cmd, args)
+            rc = execWithRedirect(cmd, args, line_callback=self._report_rsync_progress)
         except (OSError, RuntimeError) as e:
             msg = None
             err = str(e)
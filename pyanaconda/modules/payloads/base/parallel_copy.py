@@ -0,0 +1,266 @@
+#
+# Parallel copy of a directory tree.
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import errno
+import os
+import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fnmatch import fnmatchcase
+from threading import Lock
+
+from pyanaconda.anaconda_loggers import get_module_logger
+log = get_module_logger(__name__)
+
+__all__ = ["ParallelCopy", "ParallelCopyError"]
+
+
+class ParallelCopyError(OSError):
+    """The data of a file couldn't be copied."""
+    pass
+
+
+class ParallelCopy(object):
+    """Copy a directory tree with a pool of worker threads.
+
+    The copy preserves the same attributes as rsync -pogAXtlHrDx:
+    permissions, owners, groups, ACLs and other extended attributes
+    including the SELinux labels, times, symlinks, hardlinks, devices
+    and special files. The copy doesn't cross file system boundaries.
+
+    The source tree is scanned first. Directories, links and special
+    files are created by the calling thread, the data of regular files
+    are copied by the workers. Hardlinks are created once all files are
+    copied and the attributes of directories are set at the very end,
+    so the times of directories are not changed by the copy itself.
+
+    The exclude patterns follow the rsync syntax for the anchored patterns:
+    a pattern starts with a slash, a trailing slash matches only directories
+    and a wildcard doesn't match a slash.
+    """
+
+    def __init__(self, source, destination, excludes=(), workers=None,
+                 progress_callback=None):
+        """Create a new copy.
+
+        :param str source: a path to the source directory
+        :param str destination: a path to the destination directory
+        :param excludes: a list of the anchored rsync exclude patterns
+        :param int workers: a number of worker threads or None for the CPU count
+        :param progress_callback: a callable taking the number of copied bytes
+                                  and the total number of bytes
+        """
+        self._source = os.path.normpath(source)
+        self._destination = os.path.normpath(destination)
+        self._excludes = list(excludes)
+        self._workers = workers or os.cpu_count() or 1
+        self._progress_callback = progress_callback
+
+        self._progress_lock = Lock()
+        self._bytes_copied = 0
+        self._bytes_total = 0
+
+    def run(self):
+        """Run the copy.
+
+        :raise ParallelCopyError: if the data of a file couldn't be copied
+        """
+        directories = []
+        files = []
+        hardlinks = []
+
+        self._scan(directories, files, hardlinks)
+        log.debug("Copying %d directories, %d files and %d hardlinks of %d bytes "
+                  "with %d workers.", len(directories), len(files), len(hardlinks),
+                  self._bytes_total, self._workers)
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            futures = [executor.submit(self._copy_file, path, st) for path, st in files]
+
+            for future in as_completed(futures):
+                error = future.exception()
+
+                if error:
+                    for f in futures:
+                        f.cancel()
+
+                    raise error
+
+        for path, target in hardlinks:
+            self._create_hardlink(path, target)
+
+        # Set the attributes of directories bottom-up.
+        for path, st in reversed(directories):
+            self._copy_attributes(path, st)
+
+    def _is_excluded(self, path, is_dir):
+        """Is the path relative to the source excluded?"""
+        depth = path.count("/")
+
+        for pattern in self._excludes:
+            if pattern.endswith("/"):
+                if not is_dir:
+                    continue
+
+                pattern = pattern[:-1]
+
+            if pattern.count("/") == depth and fnmatchcase(path, pattern):
+                return True
+
+        return False
+
+    def _scan(self, directories, files, hardlinks):
+        """Scan the source tree.
+
+        Create the directories and the files that have no data.
+        """
+        root_st = os.lstat(self._source)
+        inodes = {}
+
+        os.makedirs(self._destination, exist_ok=True)
+        directories.append(("/", root_st))
+
+        stack = ["/"]
+        while stack:
+            path = stack.pop()
+
+            with os.scandir(self._source + path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+
+            for entry in entries:
+                entry_path = os.path.join(path, entry.name)
+                st = entry.stat(follow_symlinks=False)
+                is_dir = stat.S_ISDIR(st.st_mode)
+
+                if self._is_excluded(entry_path, is_dir):
+                    continue
+
+                if is_dir:
+                    self._create_directory(entry_path)
+                    directories.append((entry_path, st))
+
+                    # Don't cross file system boundaries.
+                    if st.st_dev == root_st.st_dev:
+                        stack.append(entry_path)
+
+                    continue
+
+                if st.st_nlink > 1:
+                    key = (st.st_dev, st.st_ino)
+
+                    if key in inodes:
+                        hardlinks.append((entry_path, inodes[key]))
+                        continue
+
+                    inodes[key] = entry_path
+
+                if stat.S_ISREG(st.st_mode):
+                    files.append((entry_path, st))
+                    self._bytes_total += st.st_size
+                elif stat.S_ISLNK(st.st_mode):
+                    self._create_symlink(entry_path, st)
+                else:
+                    self._create_special_file(entry_path, st)
+
+    def _create_directory(self, path):
+        """Create a directory."""
+        try:
+            os.mkdir(self._destination + path)
+        except FileExistsError:
+            pass
+
+    def _create_symlink(self, path, st):
+        """Create a symbolic link."""
+        dest = self._destination + path
+        self._remove_existing(dest)
+        os.symlink(os.readlink(self._source + path), dest)
+        self._copy_attributes(path, st)
+
+    def _create_special_file(self, path, st):
+        """Create a device or a special file."""
+        dest = self._destination + path
+        self._remove_existing(dest)
+        os.mknod(dest, st.st_mode, st.st_rdev)
+        self._copy_attributes(path, st)
+
+    def _create_hardlink(self, path, target):
+        """Create a hard link to the already copied target."""
+        dest = self._destination + path
+        self._remove_existing(dest)
+        os.link(self._destination + target, dest, follow_symlinks=False)
+
+    def _copy_file(self, path, st):
+        """Copy a regular file. This is called in a worker thread."""
+        dest = self._destination + path
+
+        try:
+            self._remove_existing(dest)
+            shutil.copyfile(self._source + path, dest, follow_symlinks=False)
+        except OSError as e:
+            raise ParallelCopyError(e.errno, "Failed to copy {}: {}".format(
+                path, e.strerror or e)) from e
+
+        self._copy_attributes(path, st)
+        self._report_progress(st.st_size)
+
+    def _copy_attributes(self, path, st):
+        """Copy owners, permissions, extended attributes and times."""
+        src = self._source + path
+        dest = self._destination + path
+        is_link = stat.S_ISLNK(st.st_mode)
+
+        try:
+            # Change the owner first, it clears the setuid and setgid bits.
+            os.chown(dest, st.st_uid, st.st_gid, follow_symlinks=False)
+
+            if not is_link:
+                os.chmod(dest, stat.S_IMODE(st.st_mode))
+
+            self._copy_xattrs(src, dest)
+            os.utime(dest, ns=(st.st_atime_ns, st.st_mtime_ns), follow_symlinks=False)
+        except OSError as e:
+            log.warning("Failed to copy attributes of %s: %s", path, e)
+
+    def _copy_xattrs(self, src, dest):
+        """Copy extended attributes including ACLs and SELinux labels."""
+        try:
+            names = os.listxattr(src, follow_symlinks=False)
+        except OSError as e:
+            if e.errno in (errno.ENOTSUP, errno.ENODATA):
+                return
+            raise
+
+        for name in names:
+            value = os.getxattr(src, name, follow_symlinks=False)
+            os.setxattr(dest, name, value, follow_symlinks=False)
+
+    def _remove_existing(self, dest):
+        """Remove an existing non-directory file at the destination."""
+        try:
+            os.unlink(dest)
+        except FileNotFoundError:
+            pass
+
+    def _report_progress(self, size):
+        """Report the number of copied bytes."""
+        with self._progress_lock:
+            self._bytes_copied += size
+
+            if self._progress_callback:
+                self._progress_callback(self._bytes_copied, self._bytes_total)
@@ -25,7 +25,8 @@ from blivet.size import Size
 
 from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.configuration.anaconda import conf
-from pyanaconda.core.constants import DNF_DEFAULT_TIMEOUT, DNF_DEFAULT_RETRIES
+from pyanaconda.core.constants import DNF_DEFAULT_TIMEOUT, DNF_DEFAULT_RETRIES, \
+    DNF_MAX_PARALLEL_DOWNLOADS
 from pyanaconda.core.payload import ProxyString, ProxyStringError
 from pyanaconda.core.util import get_os_release_value
 from pyanaconda.modules.common.structures.payload import PackagesConfigurationData
@@ -56,6 +57,7 @@ class DNFManager(object):
         self.__base = None
         self._ignore_missing_packages = False
         self._ignore_broken_packages = False
+        self._transaction_sizes = None
 
     @property
     def _base(self):
@@ -76,6 +78,14 @@ class DNFManager(object):
         base.conf.installroot = conf.target.system_root
         base.conf.prepend_installroot('persistdir')
 
+        # The cached metadata are always expired, so DNF checks the repomd.xml
+        # of the repository and downloads the rest only if it has changed.
+        base.conf.metadata_expire = 0
+
+        # Download more packages at once. Slow mirrors are usually limited
+        # per connection, so this shortens the download phase of the install.
+        base.conf.max_parallel_downloads = DNF_MAX_PARALLEL_DOWNLOADS
+
         # Set the platform id based on the /os/release present
         # in the installation environment.
         platform_id = get_os_release_value("PLATFORM_ID")
@@ -98,6 +108,7 @@ class DNFManager(object):
         self.__base = None
         self._ignore_missing_packages = False
         self._ignore_broken_packages = False
+        self._transaction_sizes = None
         log.debug("The DNF base has been reset.")
 
     def configure_base(self, data: PackagesConfigurationData):
@@ -171,24 +182,49 @@ class DNFManager(object):
         """Log the state of the DNF configuration."""
         log.debug("DNF configuration:\n%s", self._base.conf.dump())
 
+    def _get_transaction_sizes(self):
+        """Get the sizes of the current transaction.
+
+        The sizes are calculated in one pass over the transaction
+        and cached until the transaction changes. A new transaction
+        object is created every time the selection is resolved.
+
+        :return: a tuple with the packages size, the number of files
+                 and the download size
+        """
+        transaction = self._base.transaction
+
+        if self._transaction_sizes and self._transaction_sizes[0] is transaction:
+            return self._transaction_sizes[1:]
+
+        packages_size = 0
+        files_number = 0
+        download_size = 0
+
+        for tsi in transaction:
+            pkg = tsi.pkg
+            # Space taken by all files installed by the packages.
+            packages_size += pkg.installsize
+            # Number of files installed on the system.
+            files_number += len(pkg.files)
+            # Space taken by the downloaded packages.
+            download_size += pkg.downloadsize
+
+        self._transaction_sizes = (
+            transaction, Size(packages_size), files_number, Size(download_size)
+        )
+        return self._transaction_sizes[1:]
+
     def get_installation_size(self):
         """Calculate the installation size.
 
         :return: a space required by packages
         :rtype: an instance of Size
         """
-        packages_size = Size(0)
-        files_number = 0
-
         if self._base.transaction is None:
             return Size("3000 MiB")
 
-        for tsi in self._base.transaction:
-            # Space taken by all files installed by the packages.
-            packages_size += tsi.pkg.installsize
-            # Number of files installed on the system.
-            files_number += len(tsi.pkg.files)
-
+        packages_size, files_number, _ = self._get_transaction_sizes()
         log.debug("Space required for packages: %s", packages_size)
 
         # Calculate the files size depending on number of files.
@@ -210,11 +246,7 @@ class DNFManager(object):
         if self._base.transaction is None:
             return Size(0)
 
-        download_size = Size(0)
-
-        # Calculate the download size.
-        for tsi in self._base.transaction:
-            download_size += tsi.pkg.downloadsize
+        _, _, download_size = self._get_transaction_sizes()
 
         # Get the total size. Reserve extra space.
         total_space = download_size + Size("150 MiB")
@@ -222,9 +254,18 @@ class DNFManager(object):
 
         return total_space
 
-    def clear_cache(self):
-        """Clear the DNF cache."""
-        shutil.rmtree(DNF_CACHE_DIR, ignore_errors=True)
+    def clear_cache(self, keep_metadata=False):
+        """Clear the DNF cache.
+
+        The cached metadata are validated by the checksums from the
+        repomd.xml of the repository, so they can be kept and reused
+        if the same repository is loaded again.
+
+        :param keep_metadata: should we keep the downloaded metadata?
+        """
+        if not keep_metadata:
+            shutil.rmtree(DNF_CACHE_DIR, ignore_errors=True)
+
         shutil.rmtree(DNF_PLUGINCONF_DIR, ignore_errors=True)
         self._base.reset(sack=True, repos=True)
         log.debug("The DNF cache has been cleared.")
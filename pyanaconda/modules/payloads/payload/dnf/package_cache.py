@@ -0,0 +1,178 @@
+#
+# Content-addressed cache of downloaded packages.
+#
+# Copyright (C) 2020 Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import shutil
+
+from pyanaconda.anaconda_loggers import get_module_logger
+log = get_module_logger(__name__)
+
+__all__ = ["PackageCache"]
+
+
+class PackageCache(object):
+    """Content-addressed cache of downloaded packages.
+
+    The packages are stored under their checksums, so the same package
+    downloaded from different repositories is stored only once and a
+    package with the same name but different content is never reused.
+
+    The cache is bounded by its size. The least recently used packages
+    are removed first. The modification time of a cached file is updated
+    every time the file is used, so it can be used as the time of the
+    last use even if the file system is mounted with noatime.
+    """
+
+    SUFFIX = ".rpm"
+
+    def __init__(self, path, max_size):
+        """Create a new cache.
+
+        :param str path: a path to the cache directory
+        :param int max_size: a maximal size of the cache in bytes
+        """
+        self._path = path
+        self._max_size = max_size
+
+    @property
+    def path(self):
+        """The path to the cache directory."""
+        return self._path
+
+    def get_path(self, checksum_type, checksum):
+        """Get a path to the cached file of a package.
+
+        :param str checksum_type: a type of the checksum, for example sha256
+        :param str checksum: a hex digest of the package
+        :return: a path to the cached file
+        """
+        return os.path.join(self._path, checksum_type, checksum[:2], checksum + self.SUFFIX)
+
+    def restore(self, checksum_type, checksum, dest_path):
+        """Restore a cached package.
+
+        The cached file is hard linked to the destination if possible,
+        otherwise it is copied. DNF verifies the checksum of the restored
+        file, so a damaged cache entry is just downloaded again.
+
+        :param str checksum_type: a type of the checksum
+        :param str checksum: a hex digest of the package
+        :param str dest_path: a path to the destination file
+        :return: True if the package was restored, otherwise False
+        """
+        cached_path = self.get_path(checksum_type, checksum)
+
+        if not os.path.exists(cached_path):
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            self._link_or_copy(cached_path, dest_path)
+            os.utime(cached_path)
+        except OSError as e:
+            log.warning("Failed to restore %s from the package cache: %s", dest_path, e)
+            return False
+
+        return True
+
+    def store(self, src_path, checksum_type, checksum):
+        """Store a downloaded package.
+
+        :param str src_path: a path to the downloaded file
+        :param str checksum_type: a type of the checksum
+        :param str checksum: a hex digest of the package
+        :return: True if the package was stored, otherwise False
+        """
+        cached_path = self.get_path(checksum_type, checksum)
+
+        if os.path.exists(cached_path):
+            os.utime(cached_path)
+            return True
+
+        # Write to a temporary file first, so an interrupted
+        # copy never leaves an incomplete package in the cache.
+        tmp_path = cached_path + ".part"
+
+        try:
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            self._link_or_copy(src_path, tmp_path)
+            os.rename(tmp_path, cached_path)
+        except OSError as e:
+            log.warning("Failed to store %s in the package cache: %s", src_path, e)
+            self._remove(tmp_path)
+            return False
+
+        return True
+
+    def evict(self):
+        """Remove the least recently used packages over the size limit.
+
+        :return: a number of removed packages
+        """
+        entries = []
+        total_size = 0
+
+        for root, _dirs, files in os.walk(self._path):
+            for name in files:
+                path = os.path.join(root, name)
+
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+
+                entries.append((st.st_mtime, st.st_size, path))
+                total_size += st.st_size
+
+        removed = 0
+        entries.sort()
+
+        for _mtime, size, path in entries:
+            if total_size <= self._max_size:
+                break
+
+            if self._remove(path):
+                total_size -= size
+                removed += 1
+
+        if removed:
+            log.debug("Removed %d packages from the package cache.", removed)
+
+        return removed
+
+    @staticmethod
+    def _link_or_copy(src_path, dest_path):
+        """Hard link the file or copy it to another file system."""
+        if os.path.lexists(dest_path):
+            os.unlink(dest_path)
+
+        try:
+            os.link(src_path, dest_path)
+        except OSError:
+            shutil.copyfile(src_path, dest_path)
+
+    @staticmethod
+    def _remove(path):
+        """Remove a file if it exists."""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+
+        return True
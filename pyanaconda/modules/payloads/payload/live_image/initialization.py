@@ -20,7 +20,8 @@ import hashlib
 import os
 from requests.exceptions import RequestException
 
-from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT, IMAGE_DIR
+from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT, IMAGE_DIR, \
+    IMAGE_DOWNLOAD_RETRIES
 from pyanaconda.core.util import lowerASCII, execWithRedirect
 from pyanaconda.modules.common.errors.payload import SourceSetupError
 from pyanaconda.modules.common.task import Task
@@ -70,48 +71,88 @@ class SetupInstallationSourceImageTask(Task):
         return "Set up installation source image."
 
     def _download_image(self, url, image_path, session):
-        """Download the image using Requests with progress reporting"""
-        error = None
-        try:
-            log.info("Starting image download")
-            with open(image_path, "wb") as f:
-                ssl_verify = not self._noverifyssl
-                proxies = get_proxies_from_option(self._proxy)
-                response = session.get(url, proxies=proxies, verify=ssl_verify, stream=True,
-                                       timeout=NETWORK_CONNECTION_TIMEOUT)
-                total_length = response.headers.get('content-length')
-                if total_length is None:
-                    # just download the file in one go and fake the progress reporting once done
-                    log.warning("content-length header is missing for the installation image, "
-                                "download progress reporting will not be available")
-                    f.write(response.content)
-                    size = f.tell()
-                    progress = DownloadProgress(self._url, size, self.report_progress)
-                    progress.end()
-                else:
-                    # requests return headers as strings, so convert total_length to int
-                    progress = DownloadProgress(self._url, int(total_length), self.report_progress)
-                    bytes_read = 0
+        """Download the image using Requests with progress reporting.
+
+        The SHA-256 digest of the image is computed while the data are
+        written, so the image doesn't have to be read again to check it.
+        An interrupted download is resumed with a HTTP Range request.
+
+        :return: a hex digest of the downloaded image
+        :rtype: str
+        """
+        log.info("Starting image download")
+        ssl_verify = not self._noverifyssl
+        proxies = get_proxies_from_option(self._proxy)
+        sha256 = hashlib.sha256()
+        progress = None
+        bytes_read = 0
+        retries = 0
+
+        with open(image_path, "wb") as f:
+            while True:
+                headers = {}
+                if bytes_read:
+                    headers["Range"] = "bytes={}-".format(bytes_read)
+
+                try:
+                    response = session.get(url, proxies=proxies, verify=ssl_verify, stream=True,
+                                           headers=headers, timeout=NETWORK_CONNECTION_TIMEOUT)
+
+                    if bytes_read and response.status_code != 206:
+                        # the server ignored the range, start from the beginning
+                        log.warning("The server doesn't support resuming of the download, "
+                                    "downloading the installation image again")
+                        f.seek(0)
+                        f.truncate()
+                        sha256 = hashlib.sha256()
+                        bytes_read = 0
+
+                    if progress is None:
+                        progress = self._create_download_progress(response)
+
                     for buf in response.iter_content(1024 * 1024):
                         if buf:
                             f.write(buf)
-                            f.flush()
+                            sha256.update(buf)
                             bytes_read += len(buf)
                             progress.update(bytes_read)
-                    progress.end()
-                log.info("Image download finished")
-        except RequestException as e:
-            error = "Error downloading liveimg: {}".format(e)
+
+                except RequestException as e:
+                    if retries >= IMAGE_DOWNLOAD_RETRIES:
+                        error = "Error downloading liveimg: {}".format(e)
+                        log.error(error)
+                        raise SourceSetupError(error) from e
+
+                    retries += 1
+                    log.warning("Image download interrupted after %d bytes: %s", bytes_read, e)
+                    log.info("Resuming image download (%d/%d)", retries, IMAGE_DOWNLOAD_RETRIES)
+                else:
+                    break
+
+        progress.end()
+        log.info("Image download finished")
+
+        if not os.path.exists(image_path):
+            error = "Failed to download {}, file doesn't exist".format(self._url)
             log.error(error)
-            raise SourceSetupError(error) from e
-        else:
-            if not os.path.exists(image_path):
-                error = "Failed to download {}, file doesn't exist".format(self._url)
-                log.error(error)
-                raise SourceSetupError(error)
+            raise SourceSetupError(error)
 
-    def _check_image_sum(self, image_path, checksum):
-        self.report_progress("Checking image checksum")
+        return sha256.hexdigest()
+
+    def _create_download_progress(self, response):
+        """Create the progress reporting for the given response."""
+        total_length = response.headers.get('content-length')
+
+        if total_length is None:
+            log.warning("content-length header is missing for the installation image, "
+                        "download progress reporting will not be available")
+            return DownloadProgress(self._url, None, self.report_progress)
+
+        # requests return headers as strings, so convert total_length to int
+        return DownloadProgress(self._url, int(total_length), self.report_progress)
+
+    def _calculate_image_sum(self, image_path):
+        """Calculate the SHA-256 digest of a local image."""
         sha256 = hashlib.sha256()
         with open(image_path, "rb") as f:
             while True:
@@ -119,7 +160,14 @@ class SetupInstallationSourceImageTask(Task):
                 if not data:
                     break
                 sha256.update(data)
-        filesum = sha256.hexdigest()
+        return sha256.hexdigest()
+
+    def _check_image_sum(self, image_path, checksum, filesum=None):
+        self.report_progress("Checking image checksum")
+
+        if filesum is None:
+            filesum = self._calculate_image_sum(image_path)
+
         log.debug("sha256 of %s is %s", image_path, filesum)
 
         if lowerASCII(checksum) != filesum:
@@ -173,17 +221,19 @@ class SetupInstallationSourceImageTask(Task):
     def run(self):
         """Run set up or installation source."""
         image_path_from_url = get_local_image_path_from_url(self._url)
+        filesum = None
+
         if image_path_from_url:
             self._image_path = image_path_from_url
         else:
-            self._download_image(self._url, self._image_path, self._session)
+            filesum = self._download_image(self._url, self._image_path, self._session)
 
         # TODO - do we use it at all in LiveImage
         # Used to make install progress % look correct
         # self._adj_size = os.stat(self.image_path).st_size
 
         if self._checksum:
-            self._check_image_sum(self._image_path, self._checksum)
+            self._check_image_sum(self._image_path, self._checksum, filesum)
 
         if not url_target_is_tarfile(self._url):
             self._mount_image(self._image_path, self._image_mount_point)
@@ -238,8 +288,8 @@ class DownloadProgress(object):
 
         :param url: url of the download
         :type url: str
-        :param size: length of the file
-        :type size: int
+        :param size: length of the file or None if unknown
+        :type size: int or None
         :param report_callback: callback with progress message argument
         :type report_callback: callable taking str argument
         """
@@ -254,7 +304,7 @@ class DownloadProgress(object):
         :param bytes_read: Bytes read so far
         :type bytes_read:  int
         """
-        if not bytes_read:
+        if not bytes_read or not self.size:
             return
         pct = min(100, int(100 * bytes_read / self.size))
 
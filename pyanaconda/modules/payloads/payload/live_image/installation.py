@@ -15,12 +15,35 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import hashlib
+import os
+import subprocess
+import tempfile
+
+from requests.exceptions import RequestException
+
 from pyanaconda.modules.common.task import Task
 from pyanaconda.modules.common.errors.payload import InstallError
-from pyanaconda.core.util import execWithRedirect
+from pyanaconda.modules.payloads.payload.live_image.initialization import DownloadProgress
+from pyanaconda.modules.payloads.payload.live_image.utils import get_proxies_from_option, \
+    get_tar_compression_option
+from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT
+from pyanaconda.core.util import execWithRedirect, startProgram, lowerASCII
 
-from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.anaconda_logging import program_log_lock
+from pyanaconda.anaconda_loggers import get_module_logger, get_program_logger
 log = get_module_logger(__name__)
+program_log = get_program_logger()
+
+
+def _get_tar_arguments():
+    """Get the arguments of tar shared by all installations from a tarball."""
+    # preserve: ACL's, xattrs, and SELinux context
+    return ["--numeric-owner", "--selinux", "--acls", "--xattrs", "--xattrs-include", "*",
+            "--exclude", "dev/*", "--exclude", "proc/*", "--exclude", "tmp/*",
+            "--exclude", "sys/*", "--exclude", "run/*", "--exclude", "boot/*rescue*",
+            "--exclude", "boot/loader", "--exclude", "boot/efi/loader",
+            "--exclude", "etc/machine-id"]
 
 
 class InstallFromTarTask(Task):
@@ -38,12 +61,7 @@ class InstallFromTarTask(Task):
     def run(self):
         """Run installation of the payload from a tarball."""
         cmd = "tar"
-        # preserve: ACL's, xattrs, and SELinux context
-        args = ["--numeric-owner", "--selinux", "--acls", "--xattrs", "--xattrs-include", "*",
-                "--exclude", "dev/*", "--exclude", "proc/*", "--exclude", "tmp/*",
-                "--exclude", "sys/*", "--exclude", "run/*", "--exclude", "boot/*rescue*",
-                "--exclude", "boot/loader", "--exclude", "boot/efi/loader",
-                "--exclude", "etc/machine-id", "-xaf", self._tarfile_path, "-C", self._dest_path]
+        args = _get_tar_arguments() + ["-xaf", self._tarfile_path, "-C", self._dest_path]
         try:
             rc = execWithRedirect(cmd, args)
         except (OSError, RuntimeError) as e:
@@ -57,3 +75,171 @@ class InstallFromTarTask(Task):
 
         if err:
             raise InstallError(err or msg)
+
+
+class InstallFromTarStreamTask(Task):
+    """Task to install the payload from a tarball streamed from the network.
+
+    The tarball is not stored in the local storage. The HTTP response is
+    piped directly into tar and the checksum is computed on the fly. The
+    checksum is known only after the extraction, so the extracted files
+    are removed again if it doesn't match.
+    """
+
+    def __init__(self, url, proxy, checksum, noverifyssl, dest_path, session):
+        """Create a new task.
+
+        :param url: installation source tarball url
+        :type url: str
+        :param proxy: proxy to be used to fetch the tarball
+        :type proxy: str
+        :param checksum: checksum of the tarball
+        :type checksum: str
+        :param noverifyssl: should we skip the verification of the SSL certificate?
+        :type noverifyssl: bool
+        :param dest_path: installation destination root path
+        :type dest_path: str
+        :param session: Requests session for the tarball download
+        :type session:
+        """
+        super().__init__()
+        self._url = url
+        self._proxy = proxy
+        self._checksum = checksum
+        self._noverifyssl = noverifyssl
+        self._dest_path = dest_path
+        self._session = session
+
+    @property
+    def name(self):
+        return "Install the payload from a streamed tarball"
+
+    def _get_response(self):
+        """Start the download of the tarball."""
+        try:
+            response = self._session.get(
+                self._url,
+                proxies=get_proxies_from_option(self._proxy),
+                verify=not self._noverifyssl,
+                stream=True,
+                timeout=NETWORK_CONNECTION_TIMEOUT
+            )
+            response.raise_for_status()
+        except RequestException as e:
+            msg = "Error downloading liveimg: {}".format(e)
+            log.error(msg)
+            raise InstallError(msg) from e
+
+        return response
+
+    def _get_tar_command(self, index_path):
+        """Get the tar command that reads the tarball from stdin.
+
+        :param index_path: a path to a file for the names of the extracted members
+        """
+        args = ["tar"] + _get_tar_arguments()
+
+        compression = get_tar_compression_option(self._url)
+        if compression:
+            args.append(compression)
+
+        return args + ["-xvf", "-", "--index-file", index_path, "-C", self._dest_path]
+
+    def _stream_tarball(self, response, stdin):
+        """Write the tarball to the given stream.
+
+        :return: a hex digest of the tarball
+        """
+        total_length = response.headers.get('content-length')
+        progress = DownloadProgress(
+            self._url,
+            int(total_length) if total_length else None,
+            self.report_progress
+        )
+
+        sha256 = hashlib.sha256()
+        bytes_read = 0
+
+        for buf in response.iter_content(1024 * 1024):
+            if not buf:
+                continue
+
+            stdin.write(buf)
+            sha256.update(buf)
+            bytes_read += len(buf)
+            progress.update(bytes_read)
+
+        progress.end()
+        return sha256.hexdigest()
+
+    def _remove_extracted_files(self, index):
+        """Remove the files extracted from the tarball.
+
+        Directories are removed only if they are empty,
+        so the existing content and mount points are kept.
+
+        :param index: a file with the names of the extracted members
+        """
+        log.info("Removing files extracted from %s.", self._url)
+        index.seek(0)
+        names = index.read().decode("utf-8", "replace").splitlines()
+
+        for name in reversed(names):
+            path = os.path.join(self._dest_path, name)
+
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    os.rmdir(path)
+                elif os.path.lexists(path):
+                    os.unlink(path)
+            except OSError as e:
+                log.debug("Failed to remove %s: %s", path, e)
+
+    def run(self):
+        """Run installation of the payload from a streamed tarball."""
+        response = self._get_response()
+        filesum = None
+        err = None
+
+        with tempfile.TemporaryFile() as output, tempfile.NamedTemporaryFile() as index:
+            argv = self._get_tar_command(index.name)
+
+            try:
+                proc = startProgram(argv, stdin=subprocess.PIPE, stdout=output,
+                                    stderr=subprocess.STDOUT)
+            except OSError as e:
+                log.error(str(e))
+                raise InstallError(str(e)) from e
+
+            try:
+                filesum = self._stream_tarball(response, proc.stdin)
+            except BrokenPipeError:
+                # Tar has terminated early. Its output will tell us why.
+                err = "{} stopped reading the tarball".format(argv[0])
+            except RequestException as e:
+                err = "Error downloading liveimg: {}".format(e)
+            finally:
+                proc.stdin.close()
+                rc = proc.wait()
+
+            output.seek(0)
+            with program_log_lock:
+                program_log.info("Running... %s", " ".join(argv))
+
+                for line in output.read().decode("utf-8", "replace").splitlines():
+                    program_log.info(line)
+
+                program_log.debug("Return code: %d", rc)
+
+            msg = "%s exited with code %d" % (argv[0], rc)
+            log.info(msg)
+
+            # tar exits with 1 if some files differ, the archive is still extracted
+            if err or rc > 1:
+                log.error(err or msg)
+                raise InstallError(err or msg)
+
+            if self._checksum and lowerASCII(self._checksum) != filesum:
+                log.error("%s does not match checksum of %s.", self._checksum, self._url)
+                self._remove_extracted_files(index)
+                raise InstallError("Checksum of image {} does not match".format(self._url))
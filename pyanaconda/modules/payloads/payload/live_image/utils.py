@@ -61,3 +61,24 @@ def get_proxies_from_option(proxy_option):
 def url_target_is_tarfile(url):
     """Does the url point to a tarfile?"""
     return any(url.endswith(suffix) for suffix in TAR_SUFFIX)
+
+
+def get_tar_compression_option(url):
+    """Get the tar option for decompression of the tarball the url points to.
+
+    Tar can't detect the compression of an archive that is read from
+    a pipe, so the option has to be derived from the suffix of the url.
+
+    :param str url: an url of the tarball
+    :return: a tar option or None if the tarball is not compressed
+    """
+    if url.endswith((".tgz", "tar.gz")):
+        return "--gzip"
+
+    if url.endswith((".tbz", ".tar.bz2")):
+        return "--bzip2"
+
+    if url.endswith((".txz", "tar.xz")):
+        return "--xz"
+
+    return None
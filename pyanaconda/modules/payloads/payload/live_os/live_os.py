@@ -142,8 +142,9 @@ class LiveOSModule(PayloadBase):
         self._check_source_availability("Installation task failed - source is not available!")
 
         return [InstallFromImageTask(
-            self._image_source,
-            conf.target.system_root
+            dest_path=conf.target.system_root,
+            source=self._image_source,
+            workers=conf.payload.parallel_copy_workers
         )]
 
     def post_install_with_tasks(self):
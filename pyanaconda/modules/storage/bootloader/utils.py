@@ -16,7 +16,9 @@
 # Red Hat, Inc.
 #
 import os
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
+from io import StringIO
 
 from pyanaconda.modules.common.errors.installation import BootloaderInstallationError
 from pyanaconda.modules.storage.bootloader.efi import EFIBase
@@ -25,8 +27,10 @@ from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.util import decode_bytes, execWithRedirect
 from pyanaconda.product import productName
 
-from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.anaconda_logging import program_log_lock
+from pyanaconda.anaconda_loggers import get_module_logger, get_program_logger
 log = get_module_logger(__name__)
+program_log = get_program_logger()
 
 __all__ = ["configure_boot_loader", "install_boot_loader", "recreate_initrds",
            "create_rescue_images"]
@@ -278,34 +282,106 @@ def recreate_initrds(sysroot, kernel_versions):
         log.debug("new-kernel-pkg does not exist, using dracut instead")
         use_dracut = True
 
-    for kernel in kernel_versions:
-        log.info("Recreating initrd for %s", kernel)
-
-        if conf.target.is_image:
-            # Dracut runs in the host-only mode by default, so we need to
-            # turn it off by passing the -N option, because the mode is not
-            # sensible for disk image installations. Using /dev/disk/by-uuid/
-            # is necessary due to disk image naming.
+    if not conf.target.is_image and not use_dracut:
+        # The new-kernel-pkg tool updates the shared boot
+        # loader configuration, so it has to run serially.
+        for kernel in kernel_versions:
+            log.info("Recreating initrd for %s", kernel)
             execWithRedirect(
-                "dracut", [
-                    "-N", "--persistent-policy", "by-uuid",
-                    "-f", "/boot/initramfs-%s.img" % kernel, kernel
-                ],
+                "new-kernel-pkg",
+                ["--mkinitrd", "--dracut", "--depmod", "--update", kernel],
                 root=sysroot
             )
-        else:
-            if use_dracut:
-                execWithRedirect(
-                    "depmod", ["-a", kernel], root=sysroot
-                )
-                execWithRedirect(
-                    "dracut",
-                    ["-f", "/boot/initramfs-%s.img" % kernel, kernel],
-                    root=sysroot
-                )
-            else:
-                execWithRedirect(
-                    "new-kernel-pkg",
-                    ["--mkinitrd", "--dracut", "--depmod", "--update", kernel],
-                    root=sysroot
-                )
+        return
+
+    _run_for_kernels(
+        lambda kernel, output: _recreate_initrd(sysroot, kernel, output),
+        kernel_versions
+    )
+
+
+def _recreate_initrd(sysroot, kernel, output):
+    """Recreate the initrd of the given kernel with dracut.
+
+    :param sysroot: a path to the root of the installed system
+    :param kernel: a kernel version
+    :param output: a file object for the output of the commands
+    """
+    log.info("Recreating initrd for %s", kernel)
+
+    if conf.target.is_image:
+        # Dracut runs in the host-only mode by default, so we need to
+        # turn it off by passing the -N option, because the mode is not
+        # sensible for disk image installations. Using /dev/disk/by-uuid/
+        # is necessary due to disk image naming.
+        execWithRedirect(
+            "dracut", [
+                "-N", "--persistent-policy", "by-uuid",
+                "-f", "/boot/initramfs-%s.img" % kernel, kernel
+            ],
+            root=sysroot,
+            stdout=output,
+            log_output=False
+        )
+    else:
+        execWithRedirect(
+            "depmod", ["-a", kernel],
+            root=sysroot,
+            stdout=output,
+            log_output=False
+        )
+        execWithRedirect(
+            "dracut",
+            ["-f", "/boot/initramfs-%s.img" % kernel, kernel],
+            root=sysroot,
+            stdout=output,
+            log_output=False
+        )
+
+
+def _run_for_kernels(function, kernel_versions):
+    """Run the function for every kernel in parallel.
+
+    The function is called with a kernel version and a file object
+    for the output of the commands. The output of every kernel is
+    logged at once when its work is done, so the logs of different
+    kernels are not mixed together. The number of workers is limited
+    by the number of CPUs.
+
+    :param function: a function to call
+    :param kernel_versions: a list of kernel versions
+    """
+    if not kernel_versions:
+        return
+
+    workers = min(len(kernel_versions), os.cpu_count() or 1)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_run_for_kernel, function, kernel)
+            for kernel in kernel_versions
+        ]
+
+    # Raise the first error in the order of kernels.
+    for future in futures:
+        future.result()
+
+
+def _run_for_kernel(function, kernel):
+    """Run the function for the kernel and log its output.
+
+    :param function: a function to call
+    :param kernel: a kernel version
+    """
+    output = StringIO()
+
+    try:
+        function(kernel, output)
+    finally:
+        lines = output.getvalue().splitlines()
+
+        with program_log_lock:
+            program_log.info("Output of the commands for %s:", kernel)
+
+            for line in lines:
+                program_log.info(line.strip())
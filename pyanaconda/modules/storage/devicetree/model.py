@@ -19,12 +19,14 @@
 #
 import os
 
+from blivet import udev
 from blivet.blivet import Blivet
 from blivet.devices import BTRFSSubVolumeDevice
 from blivet.formats import get_format
 from blivet.formats.disklabel import DiskLabel
 from blivet.size import Size
 from blivet.devicelibs.crypto import DEFAULT_LUKS_VERSION
+from blivet.static_data import lvs_info, pvs_info, mpath_members
 
 from pyanaconda.core import util
 from pyanaconda.modules.storage.bootloader import BootLoaderFactory
@@ -271,6 +273,176 @@ class InstallerStorage(Blivet):
         self.roots = find_existing_installations(self.devicetree)
         self.dump_state("initial")
 
+    def rescan_devices(self, device_names=None):
+        """Rescan only the changed devices.
+
+        Remove the changed devices and all devices that share a subtree
+        with them from the device tree, and populate the tree with the
+        block devices that are not in the tree. The rest of the model
+        is kept, so it is much faster than the reset on systems with
+        a lot of devices.
+
+        The disks that disappeared from udev are always rescanned and
+        the new devices are always added. The full reset is required
+        if the changes of the model have to be reverted or if hidden
+        disks should become visible.
+
+        :param device_names: a list of names of the changed devices
+        :return: False if the full reset is required, otherwise True
+        """
+        if conf.target.is_image:
+            log.debug("Devices of disk images can't be rescanned.")
+            return False
+
+        if self.devicetree.actions.find():
+            log.debug("Devices can't be rescanned with scheduled actions.")
+            return False
+
+        if any(d.is_disk and not self.devicetree._is_ignored_disk(d)
+               for d in self.devicetree._hidden):
+            log.debug("Hidden disks that are not ignored anymore can't be rescanned.")
+            return False
+
+        # Wait for the events of the changed devices.
+        udev.settle()
+
+        device_names = list(device_names or []) + self._find_removed_disks()
+        changed = []
+
+        for name in device_names:
+            device = self.devicetree.get_device_by_name(name, hidden=True)
+
+            if not device:
+                continue
+
+            if device not in self.devicetree.devices:
+                log.debug("The hidden device %s can't be rescanned.", name)
+                return False
+
+            changed.append(device)
+
+        log.info("Rescanning the devices: %s", device_names)
+
+        # Remove the changed subtrees.
+        for device in self._get_affected_disks(changed):
+            self._remove_subtree(device)
+
+        # Find the new devices.
+        old_devices = set(self.devicetree.devices)
+        self._populate_new_devices()
+        new_devices = [d for d in self.devicetree.devices if d not in old_devices]
+        log.info("Found the new devices: %s", [d.name for d in new_devices])
+
+        self.devicetree._hide_ignored_disks()
+
+        # Protect devices from teardown.
+        self._mark_protected_devices()
+        self.devicetree.teardown_all()
+
+        self.fsset = FSSet(self.devicetree)
+
+        # Clear out attributes that refer to devices that are no longer in the tree.
+        self.bootloader.reset()
+
+        # Keep the existing installations on the devices that are still in the tree.
+        devices = set(self.devicetree.devices)
+        roots = [
+            r for r in self.roots
+            if devices.issuperset(list(r.mounts.values()) + r.swaps)
+        ]
+
+        if new_devices:
+            roots += find_existing_installations(self.devicetree, devices=new_devices)
+
+        self.roots = roots
+        self.dump_state("rescanned")
+        return True
+
+    def _find_removed_disks(self):
+        """Find disks that are not available anymore.
+
+        :return: a list of disk names
+        """
+        names = {udev.device_get_name(info) for info in udev.get_devices()}
+        return [d.name for d in self.devicetree.devices if d.is_disk and d.name not in names]
+
+    def _get_affected_disks(self, devices):
+        """Get disks of all subtrees that contain the given devices.
+
+        For example, if one physical volume is changed, the whole
+        volume group with all its physical volumes has to be scanned.
+
+        :param devices: a list of changed devices
+        :return: a list of disks
+        """
+        affected = set()
+        queue = list(devices)
+
+        while queue:
+            device = queue.pop()
+
+            if device in affected:
+                continue
+
+            affected.add(device)
+
+            for dependent in self.devicetree.get_dependent_devices(device):
+                queue.extend(dependent.ancestors)
+
+            queue.extend(device.ancestors)
+
+        return [d for d in affected if not d.parents]
+
+    def _remove_subtree(self, device):
+        """Remove the device and its dependent devices from the tree.
+
+        :param device: a device without parents
+        """
+        # Save passphrases for luks devices so we don't have to reprompt.
+        for dependent in [device] + self.devicetree.get_dependent_devices(device):
+            if dependent.format.type == "luks" and dependent.format.exists:
+                self.save_passphrase(dependent)
+
+        self.devicetree.recursive_remove(device, actions=False)
+
+        # Disks are not removed recursively.
+        if device in self.devicetree.devices:
+            self.devicetree._remove_device(device)
+
+    def _populate_new_devices(self):
+        """Add the block devices that are not in the tree.
+
+        Scan the new devices again until nothing is changing,
+        because the scan of a device can activate other devices.
+        """
+        lvs_info.drop_cache()
+        pvs_info.drop_cache()
+        mpath_members.drop_cache()
+
+        scanned = set()
+
+        while True:
+            devices = []
+
+            for info in udev.get_devices():
+                name = udev.device_get_name(info)
+
+                if name in scanned:
+                    continue
+
+                scanned.add(name)
+
+                if self.devicetree.get_device_by_name(name, hidden=True):
+                    continue
+
+                devices.append(info)
+
+            if not devices:
+                break
+
+            for info in devices:
+                self.devicetree.handle_device(info)
+
     def _mark_protected_devices(self):
         """Mark protected devices.
 
@@ -17,6 +17,10 @@
 #
 import os
 import shlex
+import shutil
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from blivet import util as blivet_util
 from blivet.errors import StorageError
@@ -24,6 +28,7 @@ from blivet.storage_log import log_exception_info
 
 from pyanaconda.core import util
 from pyanaconda.core.configuration.anaconda import conf
+from pyanaconda.core.constants import EXISTING_SYSTEMS_PROBE_WORKERS
 from pyanaconda.core.i18n import _
 from pyanaconda.modules.storage.devicetree.fsset import BlkidTab, CryptTab
 
@@ -69,15 +74,16 @@ def mount_existing_system(storage, root_device, read_only=None):
         storage.make_mtab(chroot=root_path)
 
 
-def find_existing_installations(devicetree, teardown_all=True):
+def find_existing_installations(devicetree, teardown_all=True, devices=None):
     """Find existing GNU/Linux installations on devices from the device tree.
 
     :param devicetree: a device tree to find existing installations in
     :param bool teardown_all: whether to tear down all devices in the end
+    :param devices: a list of devices to probe or None to probe all devices
     :return: roots of all found installations
     """
     try:
-        roots = _find_existing_installations(devicetree)
+        roots = _find_existing_installations(devicetree, devices)
         return roots
     except Exception:  # pylint: disable=broad-except
         log_exception_info(log.info, "failure detecting existing installations")
@@ -88,21 +94,43 @@ def find_existing_installations(devicetree, teardown_all=True):
     return []
 
 
-def _find_existing_installations(devicetree):
+# Plain data of a device needed to probe it in a worker thread.
+DeviceProbe = namedtuple("DeviceProbe", [
+    "name", "path", "fstype", "mount_device", "mount_type", "options"
+])
+
+# Plain data of an installation found by a worker thread.
+InstallationData = namedtuple("InstallationData", [
+    "files_root", "arch", "product", "version", "fstab"
+])
+
+
+def _find_existing_installations(devicetree, candidates=None):
     """Find existing GNU/Linux installations on devices from the device tree.
 
+    The devices are set up one by one, because they can share parents.
+    Then they are probed in parallel. Every worker uses its own mount
+    point, so the probes don't interfere with each other.
+
+    This function is called with the blivet lock held, so the workers
+    can't access the device tree. They get plain data of the devices
+    and return plain data of the installations. The found file systems
+    are resolved to devices in the calling thread.
+
     :param devicetree: a device tree to find existing installations in
+    :param candidates: a list of devices to probe or None to probe all devices
     :return: roots of all found installations
     """
-    if not os.path.exists(conf.target.physical_root):
-        blivet_util.makedirs(conf.target.physical_root)
+    devices = []
+    probes = []
 
-    sysroot = conf.target.physical_root
-    roots = []
-    direct_devices = (dev for dev in devicetree.devices if dev.direct)
-    for device in direct_devices:
-        if not device.format.linux_native or not device.format.mountable or \
-           not device.controllable or not device.format.exists:
+    if candidates is None:
+        candidates = devicetree.devices
+
+    for device in candidates:
+        if not device.direct or not device.format.linux_native or \
+           not device.format.mountable or not device.controllable or \
+           not device.format.exists:
             continue
 
         try:
@@ -111,38 +139,397 @@ def _find_existing_installations(devicetree):
             log_exception_info(log.warning, "setup of %s failed", [device.name])
             continue
 
-        options = device.format.options + ",ro"
-        try:
-            device.format.mount(options=options, mountpoint=sysroot)
-        except Exception:  # pylint: disable=broad-except
-            log_exception_info(log.warning, "mount of %s as %s failed", [device.name, device.format.type])
-            blivet_util.umount(mountpoint=sysroot)
-            continue
+        devices.append(device)
+        probes.append(_get_device_probe(device))
+
+    if not devices:
+        return []
 
-        if not os.access(sysroot + "/etc/fstab", os.R_OK):
-            blivet_util.umount(mountpoint=sysroot)
+    workers = min(len(devices), EXISTING_SYSTEMS_PROBE_WORKERS)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_read_existing_installation, probes))
+
+    roots = []
+
+    for device, (has_fstab, data) in zip(devices, results):
+        if not has_fstab:
             device.teardown()
             continue
 
-        architecture, product, version = get_release_string(chroot=sysroot)
-        (mounts, swaps) = _parse_fstab(devicetree, chroot=sysroot)
-        blivet_util.umount(mountpoint=sysroot)
-
-        if not mounts and not swaps:
-            # empty /etc/fstab. weird, but I've seen it happen.
+        if not data:
             continue
 
-        roots.append(Root(
-            product=product,
-            version=version,
-            arch=architecture,
-            mounts=mounts,
-            swaps=swaps
-        ))
+        try:
+            root = _get_existing_installation(devicetree, data)
+        except Exception:  # pylint: disable=broad-except
+            log_exception_info(log.warning, "probe of %s failed", [device.name])
+            root = None
+        finally:
+            shutil.rmtree(data.files_root, ignore_errors=True)
+
+        if root:
+            roots.append(root)
 
     return roots
 
 
+def _get_device_probe(device):
+    """Get plain data of the device needed to probe it.
+
+    :param device: a device to probe
+    :return: an instance of DeviceProbe
+    """
+    return DeviceProbe(
+        name=device.name,
+        path=device.path,
+        fstype=device.format.type,
+        mount_device=device.format.device,
+        mount_type=device.format.mount_type,
+        options=device.format.options
+    )
+
+
+def _read_existing_installation(probe):
+    """Read an existing GNU/Linux installation from the given device.
+
+    Try to read the system files directly from the file system image
+    first. If it is not possible, mount the device read-only to a
+    private mount point. This method is called in a worker thread,
+    so it mustn't access the device tree.
+
+    The files needed to resolve the file systems of the installation
+    are kept in a temporary directory. The caller is responsible for
+    its removal.
+
+    :param probe: an instance of DeviceProbe
+    :return: a tuple of a flag whether /etc/fstab was found and
+             an instance of InstallationData or None
+    """
+    files_root = tempfile.mkdtemp(prefix="anaconda-files-")
+    result = None
+
+    try:
+        if _read_system_files(probe, files_root):
+            result = _read_installation_files(files_root, from_image=True)
+    except Exception:  # pylint: disable=broad-except
+        log_exception_info(log.warning, "reading of %s failed", [probe.name])
+
+    if result is None:
+        shutil.rmtree(files_root, ignore_errors=True)
+        files_root = tempfile.mkdtemp(prefix="anaconda-files-")
+        result = _read_mounted_installation(probe, files_root)
+
+    if not result[1]:
+        shutil.rmtree(files_root, ignore_errors=True)
+
+    return result
+
+
+def _read_mounted_installation(probe, files_root):
+    """Mount the device and read an existing installation from it.
+
+    :param probe: an instance of DeviceProbe
+    :param files_root: a path to a directory for the copied files
+    :return: a tuple of a flag whether /etc/fstab was found and
+             an instance of InstallationData or None
+    """
+    # Don't remove the mount point recursively. It could be still mounted.
+    mount_point = tempfile.mkdtemp(prefix="anaconda-root-")
+
+    try:
+        rc = blivet_util.mount(
+            probe.mount_device,
+            mount_point,
+            fstype=probe.mount_type,
+            options=probe.options + ",ro"
+        )
+    except Exception:  # pylint: disable=broad-except
+        rc = -1
+
+    try:
+        if rc:
+            log.warning("mount of %s as %s failed", probe.name, probe.fstype)
+            return True, None
+
+        try:
+            _copy_system_files(mount_point, files_root)
+            return _read_installation_files(files_root, chroot=mount_point)
+        except Exception:  # pylint: disable=broad-except
+            log_exception_info(log.warning, "probe of %s failed", [probe.name])
+            return True, None
+    finally:
+        blivet_util.umount(mountpoint=mount_point)
+        os.rmdir(mount_point)
+
+
+def _read_installation_files(files_root, chroot=None, from_image=False):
+    """Read the installation from its system files.
+
+    :param files_root: a path to the system files of the installation
+    :param chroot: a path to the mounted installation or None
+    :param from_image: were the files read from the file system image?
+    :return: a tuple of a flag whether /etc/fstab was found and
+             an instance of InstallationData or None
+    """
+    fstab = _read_fstab(files_root)
+
+    if fstab is None:
+        return False, None
+
+    if from_image:
+        architecture = _get_image_architecture(files_root)
+        product, version = _get_release(files_root)
+    else:
+        architecture, product, version = get_release_string(chroot=chroot)
+
+    return True, InstallationData(
+        files_root=files_root,
+        arch=architecture,
+        product=product,
+        version=version,
+        fstab=fstab
+    )
+
+
+def _get_existing_installation(devicetree, data):
+    """Get an existing installation from the read data.
+
+    :param devicetree: a device tree
+    :param data: an instance of InstallationData
+    :return: a root or None
+    """
+    (mounts, swaps) = _resolve_fstab(devicetree, data.fstab, chroot=data.files_root)
+
+    if not mounts and not swaps:
+        # empty /etc/fstab. weird, but I've seen it happen.
+        return None
+
+    return Root(
+        product=data.product,
+        version=data.version,
+        arch=data.arch,
+        mounts=mounts,
+        swaps=swaps
+    )
+
+
+# File systems supported by debugfs.
+DEBUGFS_FILE_SYSTEMS = ("ext2", "ext3", "ext4")
+
+# Files needed to identify an existing installation.
+SYSTEM_FILES = (
+    "/etc/fstab",
+    "/etc/crypttab",
+    "/etc/blkid/blkid.tab",
+    "/etc/redhat-release",
+    "/etc/os-release",
+    "/usr/bin/arch",
+)
+
+# Files needed to resolve the file systems of an installation.
+FSTAB_FILES = (
+    "/etc/fstab",
+    "/etc/crypttab",
+    "/etc/blkid/blkid.tab",
+)
+
+# How many symbolic links are followed.
+MAX_SYMLINKS = 8
+
+
+def _read_system_files(probe, files_root):
+    """Read the system files directly from the file system image.
+
+    The files are dumped with debugfs without mounting the device.
+    Symbolic links are resolved within the image and replaced with
+    copies of their targets, so the dumped files don't refer to the
+    files of the installation environment.
+
+    :param probe: an instance of DeviceProbe
+    :param files_root: a path to a directory for the dumped files
+    :return: True if the files were read, otherwise False
+    """
+    if probe.fstype not in DEBUGFS_FILE_SYSTEMS or not shutil.which("debugfs"):
+        return False
+
+    # The files might be only in the journal, so mount the device instead.
+    if _needs_recovery(probe.path):
+        log.debug("The journal of %s needs a recovery.", probe.path)
+        return False
+
+    pending = list(SYSTEM_FILES)
+    dumped = set()
+    links = {}
+
+    for _i in range(MAX_SYMLINKS):
+        if not pending:
+            break
+
+        if not _dump_files(probe.path, pending, files_root):
+            return False
+
+        dumped.update(pending)
+        paths, pending = pending, []
+
+        for path in paths:
+            local_path = files_root + path
+
+            if not os.path.islink(local_path):
+                continue
+
+            target = os.path.join(os.path.dirname(path), os.readlink(local_path))
+            target = os.path.normpath(target)
+            links[path] = target
+
+            if target not in dumped:
+                pending.append(target)
+
+    for path in links:
+        _resolve_link(files_root, path, links)
+
+    # The architecture is required for an installation with fstab.
+    if os.access(files_root + "/etc/fstab", os.R_OK):
+        return _get_image_architecture(files_root) is not None
+
+    return True
+
+
+def _copy_system_files(chroot, files_root):
+    """Copy the files needed to resolve the file systems.
+
+    :param chroot: a path to the mounted installation
+    :param files_root: a path to a directory for the copied files
+    """
+    for path in FSTAB_FILES:
+        if not os.access(chroot + path, os.R_OK):
+            continue
+
+        os.makedirs(files_root + os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(chroot + path, files_root + path)
+
+
+def _needs_recovery(device_path):
+    """Check if the journal of the file system needs a recovery.
+
+    Debugfs doesn't replay the journal, so the files of such
+    a file system might be incomplete or outdated.
+
+    :param device_path: a path to the device
+    :return: True if the journal needs a recovery or it is unknown, otherwise False
+    """
+    output = util.execWithCapture(
+        "debugfs", ["-c", "-R", "features", device_path],
+        log_output=False
+    )
+
+    for line in output.splitlines():
+        if line.startswith("Filesystem features:"):
+            return "needs_recovery" in line.split()
+
+    return True
+
+
+def _dump_files(device_path, paths, files_root):
+    """Dump the given files from the file system image with debugfs.
+
+    :param device_path: a path to the device
+    :param paths: a list of absolute paths in the image
+    :param files_root: a path to a directory for the dumped files
+    :return: False if the file system couldn't be opened, otherwise True
+    """
+    commands = []
+
+    for path in paths:
+        local_dir = files_root + os.path.dirname(path)
+        os.makedirs(local_dir, exist_ok=True)
+        commands.append('rdump "{}" "{}"'.format(path, local_dir))
+
+    commands_path = os.path.join(files_root, ".commands")
+
+    with open(commands_path, "w") as f:
+        f.write("\n".join(commands) + "\n")
+
+    try:
+        output = util.execWithCapture(
+            "debugfs", ["-c", "-f", commands_path, device_path],
+            log_output=False
+        )
+    finally:
+        os.unlink(commands_path)
+
+    return "while trying to open" not in output and "Filesystem not open" not in output
+
+
+def _resolve_link(files_root, path, links):
+    """Replace the dumped symbolic link with a copy of its target.
+
+    :param files_root: a path to the dumped files
+    :param path: an absolute path of the link in the image
+    :param links: a dictionary of links and their targets in the image
+    """
+    local_path = files_root + path
+    target = path
+
+    for _i in range(MAX_SYMLINKS):
+        if target not in links:
+            break
+
+        target = links[target]
+
+    local_target = files_root + target
+
+    if not os.path.islink(local_path):
+        return
+
+    os.unlink(local_path)
+
+    if os.path.isfile(local_target) and not os.path.islink(local_target):
+        shutil.copyfile(local_target, local_path)
+
+
+def _get_elf_machine(path):
+    """Get the ELF class, data encoding and machine of the binary.
+
+    :param path: a path to the binary
+    :return: a tuple of values or None
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(20)
+    except OSError:
+        return None
+
+    if len(header) < 20 or header[:4] != b"\x7fELF":
+        return None
+
+    byte_order = "little" if header[5] == 1 else "big"
+    return header[4], header[5], int.from_bytes(header[18:20], byte_order)
+
+
+def _get_image_architecture(files_root):
+    """Get the architecture of the dumped installation.
+
+    The installation in a chroot would report the architecture of
+    the running kernel if its binaries can run here. Otherwise, the
+    architecture is unknown.
+
+    :param files_root: a path to the dumped files
+    :return: a name of the architecture or None
+    """
+    host_binary = shutil.which("arch")
+
+    if not host_binary:
+        return None
+
+    machine = _get_elf_machine(files_root + "/usr/bin/arch")
+
+    if not machine or machine != _get_elf_machine(host_binary):
+        return None
+
+    return os.uname().machine
+
+
 def get_release_string(chroot):
     """Identify the installation of a Linux distribution.
 
@@ -154,15 +541,25 @@ def get_release_string(chroot):
     or None for any parts that cannot be determined
     :rtype: (string, string, string)
     """
-    rel_name = None
-    rel_ver = None
-    sysroot = chroot
-
     try:
-        rel_arch = blivet_util.capture_output(["arch"], root=sysroot).strip()
+        rel_arch = blivet_util.capture_output(["arch"], root=chroot).strip()
     except OSError:
         rel_arch = None
 
+    rel_name, rel_ver = _get_release(chroot)
+    return rel_arch, rel_name, rel_ver
+
+
+def _get_release(chroot):
+    """Identify the distribution name and version.
+
+    :param chroot: a path to the files of the installation
+    :return: a tuple of the distribution name and version or None for either
+    """
+    rel_name = None
+    rel_ver = None
+    sysroot = chroot
+
     try:
         filename = "%s/etc/redhat-release" % sysroot
         if os.access(filename, os.R_OK):
@@ -174,7 +571,7 @@ def get_release_string(chroot):
     except ValueError:
         pass
 
-    return rel_arch, rel_name, rel_ver
+    return rel_name, rel_ver
 
 
 def _release_from_redhat_release(fn):
@@ -245,20 +642,44 @@ def _release_from_os_release(fn):
     return rel_name, rel_ver
 
 
-def _parse_fstab(devicetree, chroot):
-    """Parse /etc/fstab.
+def _read_fstab(chroot):
+    """Read /etc/fstab.
+
+    :param chroot: a path to the target OS installation
+    :return: a list of (devspec, mountpoint, fstype, options) or None
+    """
+    path = "%s/etc/fstab" % chroot
+    if not os.access(path, os.R_OK):
+        return None
+
+    entries = []
+
+    with open(path) as f:
+        log.debug("parsing %s", path)
+        for line in f.readlines():
+
+            (line, _pound, _comment) = line.partition("#")
+            fields = line.split(None, 4)
+
+            if len(fields) < 5:
+                continue
+
+            (devspec, mountpoint, fstype, options, _rest) = fields
+            entries.append((devspec, mountpoint, fstype, options))
+
+    return entries
+
+
+def _resolve_fstab(devicetree, entries, chroot):
+    """Resolve entries of /etc/fstab to devices.
 
     :param devicetree: a device tree
+    :param entries: a list of (devspec, mountpoint, fstype, options)
     :param chroot: a path to the target OS installation
     :return: a tuple of a mount dict and swap list
     """
     mounts = {}
     swaps = []
-    path = "%s/etc/fstab" % chroot
-    if not os.access(path, os.R_OK):
-        # XXX should we raise an exception instead?
-        log.info("cannot open %s for read", path)
-        return mounts, swaps
 
     blkid_tab = BlkidTab(chroot=chroot)
     try:
@@ -276,31 +697,20 @@ def _parse_fstab(devicetree, chroot):
         log_exception_info(log.info, "error parsing crypttab")
         crypt_tab = None
 
-    with open(path) as f:
-        log.debug("parsing %s", path)
-        for line in f.readlines():
-
-            (line, _pound, _comment) = line.partition("#")
-            fields = line.split(None, 4)
-
-            if len(fields) < 5:
-                continue
+    for (devspec, mountpoint, fstype, options) in entries:
+        # find device in the tree
+        device = devicetree.resolve_device(devspec,
+                                           crypt_tab=crypt_tab,
+                                           blkid_tab=blkid_tab,
+                                           options=options)
 
-            (devspec, mountpoint, fstype, options, _rest) = fields
-
-            # find device in the tree
-            device = devicetree.resolve_device(devspec,
-                                               crypt_tab=crypt_tab,
-                                               blkid_tab=blkid_tab,
-                                               options=options)
-
-            if device is None:
-                continue
+        if device is None:
+            continue
 
-            if fstype != "swap":
-                mounts[mountpoint] = device
-            else:
-                swaps.append(device)
+        if fstype != "swap":
+            mounts[mountpoint] = device
+        else:
+            swaps.append(device)
 
     return mounts, swaps
 
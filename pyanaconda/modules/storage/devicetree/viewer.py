@@ -27,7 +27,7 @@ from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.i18n import _
 from pyanaconda.modules.common.errors.storage import UnknownDeviceError
 from pyanaconda.modules.common.structures.storage import DeviceData, DeviceActionData, \
-    DeviceFormatData, OSData
+    DeviceFormatData, DeviceInfoData, DeviceTreeData, OSData
 from pyanaconda.modules.storage.devicetree.utils import get_required_device_size, \
     get_supported_filesystems
 
@@ -39,6 +39,15 @@ __all__ = ["DeviceTreeViewer"]
 class DeviceTreeViewer(ABC):
     """The viewer of the device tree."""
 
+    def __init__(self):
+        super().__init__()
+        # The generation of the device tree.
+        self._generation = 0
+        # Device names mapped to their fingerprints and generations.
+        self._device_states = {}
+        # Names of removed devices mapped to their generations.
+        self._removed_devices = {}
+
     @property
     @abstractmethod
     def storage(self):
@@ -89,9 +98,15 @@ class DeviceTreeViewer(ABC):
         :return: an instance of DeviceData
         :raise: UnknownDeviceError if the device is not found
         """
-        # Find the device.
         device = self._get_device(name)
+        return self._get_device_data(device)
+
+    def _get_device_data(self, device):
+        """Get the device data.
 
+        :param device: an instance of the Blivet's device
+        :return: an instance of DeviceData
+        """
         # Collect the device data.
         data = DeviceData()
         self._set_device_data(device, data)
@@ -203,6 +218,166 @@ class DeviceTreeViewer(ABC):
         data.attrs = self._prune_attributes(data.attrs)
         return data
 
+    def get_device_tree_data(self, device_names, generation=0):
+        """Get data of the specified devices at once.
+
+        Collect the device data, the format data and the free space
+        of the devices. If no device names are specified, collect
+        data of all devices in the device tree.
+
+        Only devices that changed after the given generation of the
+        device tree are included. For all devices in the device tree,
+        names of devices removed after the given generation are listed.
+
+        :param device_names: a list of device names or an empty list
+        :param generation: a generation of the device tree or 0
+        :return: an instance of DeviceTreeData
+        :raise: UnknownDeviceError if a device is not found
+        """
+        if device_names:
+            devices = self._get_devices(device_names)
+        else:
+            devices = self.storage.devices
+
+        infos = self._update_generation(devices, all_devices=not device_names)
+
+        data = DeviceTreeData()
+        data.generation = self._generation
+        data.devices = [
+            infos[device.name] for device in devices
+            if self._get_device_generation(device) > generation
+        ]
+
+        if not device_names:
+            data.removed_devices = sorted(
+                name for name, removed in self._removed_devices.items()
+                if removed > generation
+            )
+
+        return data
+
+    def get_device_tree_generation(self):
+        """Get the current generation of the device tree.
+
+        :return: a number of the generation
+        """
+        self._update_generation(self.storage.devices, all_devices=True)
+        return self._generation
+
+    def _update_generation(self, devices, all_devices=False):
+        """Detect changes of the given devices.
+
+        Compare fingerprints of the devices with the last known
+        fingerprints and increase the generation if they differ.
+        Only the given devices are checked, so the cost depends
+        on the number of the requested devices. Removed devices
+        are detected only if all devices are checked.
+
+        :param devices: a list of devices to check
+        :param all_devices: are these all devices of the device tree?
+        :return: a dictionary of device names and their DeviceInfoData
+        """
+        infos = {}
+        changed = {}
+
+        for device in devices:
+            info = self._get_device_info_data(device)
+            infos[device.name] = info
+
+            # Don't track hidden devices.
+            if device in self.storage.devicetree._hidden:
+                continue
+
+            fingerprint = self._get_device_fingerprint(device, info)
+
+            if self._device_states.get(device.name, (None, 0))[0] != fingerprint:
+                changed[device.name] = fingerprint
+
+        removed = []
+
+        if all_devices:
+            removed = [
+                name for name in self._device_states
+                if name not in infos
+            ]
+
+        if not changed and not removed:
+            return infos
+
+        self._generation += 1
+
+        for name, fingerprint in changed.items():
+            self._device_states[name] = (fingerprint, self._generation)
+            self._removed_devices.pop(name, None)
+
+        for name in removed:
+            self._device_states.pop(name)
+            self._removed_devices[name] = self._generation
+
+        log.debug("The device tree has changed, the generation is %d.", self._generation)
+        return infos
+
+    def _get_device_generation(self, device):
+        """Get the generation of the last change of the device.
+
+        Devices that are not tracked, for example hidden
+        devices, are always considered to be changed.
+        """
+        _fingerprint, generation = self._device_states.get(
+            device.name, (None, self._generation)
+        )
+        return generation
+
+    @staticmethod
+    def _get_device_fingerprint(device, info):
+        """Get a fingerprint of the device.
+
+        The fingerprint is created from the same data that are
+        provided about the device, so it changes every time
+        these data change.
+
+        :param device: an instance of the Blivet's device
+        :param info: an instance of DeviceInfoData of the device
+        :return: a tuple of values
+        """
+        device_data = info.device
+        format_data = info.format
+
+        return (
+            device.id,
+            device.format.id,
+            device_data.type,
+            device_data.path,
+            device_data.size,
+            device_data.is_disk,
+            device_data.protected,
+            device_data.removable,
+            tuple(device_data.parents),
+            tuple(device_data.children),
+            device_data.description,
+            tuple(sorted(device_data.attrs.items())),
+            format_data.type,
+            format_data.mountable,
+            format_data.description,
+            tuple(sorted(format_data.attrs.items())),
+            info.free_space,
+        )
+
+    def _get_device_info_data(self, device):
+        """Get all data of the device.
+
+        :param device: an instance of the Blivet's device
+        :return: an instance of DeviceInfoData
+        """
+        data = DeviceInfoData()
+        data.device = self._get_device_data(device)
+        data.format = self._get_format_data(device.format)
+
+        if device.is_disk:
+            data.free_space = self.storage.get_disk_free_space([device]).get_bytes()
+
+        return data
+
     def _get_device(self, name):
         """Find a device by its name.
 
@@ -22,7 +22,7 @@ from pyanaconda.modules.common.base.base_template import InterfaceTemplate
 from dasbus.typing import *  # pylint: disable=wildcard-import
 from pyanaconda.modules.common.constants.interfaces import DEVICE_TREE_VIEWER
 from pyanaconda.modules.common.structures.storage import DeviceData, DeviceActionData, \
-    DeviceFormatData, OSData
+    DeviceFormatData, DeviceTreeData, OSData
 
 __all__ = ["DeviceTreeViewerInterface"]
 
@@ -88,6 +88,37 @@ class DeviceTreeViewerInterface(InterfaceTemplate):
         """
         return DeviceFormatData.to_structure(self.implementation.get_format_type_data(name))
 
+    def GetDeviceTreeData(self, names: List[Str], generation: UInt64) -> Structure:
+        """Get data of the specified devices at once.
+
+        Collect the device data, the format data and the free space
+        of the devices with one call. If no device names are specified,
+        collect data of all devices in the device tree.
+
+        Only devices that changed after the given generation of the
+        device tree are included. Use 0 to get all requested devices.
+        For all devices in the device tree, names of devices removed
+        after the given generation are listed.
+
+        :param names: a list of device names or an empty list
+        :param generation: a generation of the device tree or 0
+        :return: a structure with device tree data
+        :raise: UnknownDeviceError if a device is not found
+        """
+        return DeviceTreeData.to_structure(
+            self.implementation.get_device_tree_data(names, generation)
+        )
+
+    def GetDeviceTreeGeneration(self) -> UInt64:
+        """Get the current generation of the device tree.
+
+        The generation is increased every time
+        a change of the device tree is detected.
+
+        :return: a number of the generation
+        """
+        return self.implementation.get_device_tree_generation()
+
     def GetActions(self) -> List[Structure]:
         """Get the device actions.
 
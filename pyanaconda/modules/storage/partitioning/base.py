@@ -97,6 +97,20 @@ class PartitioningModule(KickstartBaseModule, Publishable):
         """Drop the storage playground."""
         self._storage_playground = None
 
+    def take_storage_playground(self):
+        """Take the storage playground from the module.
+
+        The applied storage playground becomes the current storage
+        of the partitioning modules, so the module doesn't keep its
+        own reference. If the module is used again, a new playground
+        will be copied from the applied one on the first access.
+
+        :return: an instance of Blivet
+        """
+        storage = self.storage
+        self._storage_playground = None
+        return storage
+
     def on_selected_disks_changed(self, selection):
         """Keep the current disk selection."""
         self._selected_disks = selection
@@ -61,6 +61,17 @@ class BlivetPartitioningModule(PartitioningModule):
 
         return storage
 
+    def take_storage_playground(self):
+        """Take a copy of the storage playground from the module.
+
+        The request handler of Blivet-GUI keeps references to the
+        devices and actions of the storage playground, so the module
+        keeps its playground and provides a copy of it instead.
+
+        :return: an instance of Blivet
+        """
+        return self.storage.copy()
+
     @property
     def storage_handler(self):
         """The handler of the storage.
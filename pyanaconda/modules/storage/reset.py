@@ -39,15 +39,20 @@ class ScanDevicesTask(Task):
 
     Scan the system’s storage configuration and store it in the tree.
     This task will reset the given instance of Blivet.
+
+    If the changed devices are specified, the task will try to rescan
+    only these devices and fall back to the reset if it is not possible.
     """
 
-    def __init__(self, storage):
+    def __init__(self, storage, device_names=None):
         """Create a new task.
 
         :param storage: an instance of Blivet
+        :param device_names: a list of names of the changed devices or None
         """
         super().__init__()
         self._storage = storage
+        self._device_names = device_names
 
     @property
     def name(self):
@@ -59,6 +64,9 @@ class ScanDevicesTask(Task):
         :raise: UnusableStorageError if the model is not usable
         """
         try:
+            if self._rescan_storage(self._storage):
+                return
+
             self._reload_modules()
             self._reset_storage(self._storage)
         except UnusableConfigurationError as e:
@@ -77,6 +85,20 @@ class ScanDevicesTask(Task):
         if arch.is_s390():
             zfcp.startup()
 
+    def _rescan_storage(self, storage):
+        """Rescan the changed devices.
+
+        :return: True if the changed devices were rescanned, otherwise False
+        """
+        if self._device_names is None:
+            return False
+
+        if storage.rescan_devices(self._device_names):
+            return True
+
+        log.debug("Falling back to the full reset of the storage.")
+        return False
+
     def _reset_storage(self, storage):
         """Reset the storage."""
         storage.reset()
@@ -251,12 +251,16 @@ class StorageService(KickstartService):
 
         self.storage.protect_devices(protected_devices)
 
-    def scan_devices_with_task(self):
+    def scan_devices_with_task(self, device_names=None):
         """Scan all devices with a task.
 
         We will reset a copy of the current storage model
         and switch the models if the reset is successful.
 
+        If the changed devices are specified, only these
+        devices will be rescanned if it is possible.
+
+        :param device_names: a list of names of the changed devices or None
         :return: a task
         """
         # Copy the storage.
@@ -269,7 +273,7 @@ class StorageService(KickstartService):
         storage.disk_images = self._disk_selection_module.disk_images
 
         # Create the task.
-        task = ScanDevicesTask(storage)
+        task = ScanDevicesTask(storage, device_names)
         task.succeeded_signal.connect(lambda: self._set_storage(storage))
         return task
 
@@ -329,14 +333,15 @@ class StorageService(KickstartService):
         :raise: InvalidStorageError of the partitioning is not valid
         """
         # Validate the partitioning.
-        storage = module.storage.copy()
-        task = StorageValidateTask(storage)
+        task = StorageValidateTask(module.storage)
         report = task.run()
 
         if not report.is_valid():
             raise InvalidStorageError(" ".join(report.error_messages))
 
-        # Apply the partitioning.
+        # Apply the partitioning. Take over the storage playground
+        # of the module instead of copying the whole storage model.
+        storage = module.take_storage_playground()
         self._set_storage_playground(storage)
         self._set_applied_partitioning(module)
 
@@ -49,6 +49,23 @@ class StorageInterface(KickstartModuleInterface):
             self.implementation.scan_devices_with_task()
         )
 
+    def ScanChangedDevicesWithTask(self, device_names: List[Str]) -> ObjPath:
+        """Scan only the changed devices with a task.
+
+        The changed devices and the devices that depend on them
+        will be scanned again. The new devices will be added. If
+        it is not possible, all devices will be scanned.
+
+        The disks that are not available anymore are always
+        considered to be changed.
+
+        :param device_names: a list of names of the changed devices
+        :return: a path to a task
+        """
+        return TaskContainer.to_object_path(
+            self.implementation.scan_devices_with_task(device_names)
+        )
+
     @emits_properties_changed
     def CreatePartitioning(self, method: Str) -> ObjPath:
         """Create a new partitioning.
@@ -0,0 +1,131 @@
+#
+# Copyright (C) 2020  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+from pyanaconda.anaconda_loggers import get_packaging_logger
+
+log = get_packaging_logger()
+
+__all__ = ["CompsIndex", "collect_environment_options"]
+
+
+def collect_environment_options(env):
+    """Collect optional groups of the given environment.
+
+    :param env: an environment of comps
+    :return: a dictionary of group ids and their default flags
+    """
+    options = {}
+
+    for option in env.option_ids:
+        options[option.name] = options.get(option.name, False) or option.default
+
+    return options
+
+
+class CompsIndex(object):
+    """Index of environments and groups of comps.
+
+    The comps of DNF can find environments and groups only by patterns,
+    which means a full scan of the comps for every lookup. The index
+    maps the ids of environments and groups to the comps objects and
+    the ids of environments to their optional groups.
+
+    The translated names and descriptions are still provided by the
+    comps objects, so they follow the current locale.
+    """
+
+    def __init__(self, comps=None):
+        """Create a new index.
+
+        :param comps: the comps of DNF or None for an empty index
+        """
+        self._environments = {}
+        self._groups = {}
+        self._options = {}
+        self._addons = {}
+
+        if comps is not None:
+            self._build(comps)
+
+    def _build(self, comps):
+        """Build the index from the given comps."""
+        for env in comps.environments:
+            self._environments[env.id] = env
+            self._options[env.id] = collect_environment_options(env)
+
+        for grp in comps.groups_iter():
+            self._groups[grp.id] = grp
+
+        visible_groups = [g for g in self._groups if self._groups[g].visible]
+
+        # Determine which groups are specific to each environment
+        # and which other groups are available in the environment.
+        for env_id, options in self._options.items():
+            self._addons[env_id] = (
+                [g for g in self._groups if g in options],
+                [g for g in visible_groups if g not in options]
+            )
+
+        log.debug("Indexed %d environments and %d groups.",
+                  len(self._environments), len(self._groups))
+
+    @property
+    def environments(self):
+        """A list of environment ids."""
+        return list(self._environments)
+
+    @property
+    def groups(self):
+        """A list of group ids."""
+        return list(self._groups)
+
+    @property
+    def environment_addons(self):
+        """Add-ons of environments.
+
+        The dictionary keys are environment ids. The dictionary values are
+        two-tuples consisting of lists of group ids. The first list is the
+        add-ons specific to the environment, and the second list is the
+        other add-ons possible for the environment.
+
+        :return: a dictionary
+        """
+        return self._addons
+
+    def get_environment(self, environment_id):
+        """Get an environment with the given id.
+
+        :param environment_id: an id of the environment
+        :return: an environment or None
+        """
+        return self._environments.get(environment_id)
+
+    def get_group(self, group_id):
+        """Get a group with the given id.
+
+        :param group_id: an id of the group
+        :return: a group or None
+        """
+        return self._groups.get(group_id)
+
+    def get_environment_options(self, environment_id):
+        """Get optional groups of the given environment.
+
+        :param environment_id: an id of the environment
+        :return: a dictionary of group ids and their default flags or None
+        """
+        return self._options.get(environment_id)
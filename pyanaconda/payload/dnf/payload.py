@@ -22,6 +22,8 @@ import os
 import shutil
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import dnf
 import dnf.logging
 import dnf.exceptions
@@ -45,6 +47,7 @@ from pyanaconda.modules.payloads.payload.dnf.utils import get_kernel_package, \
     get_product_release_version, get_default_environment, get_installation_specs, \
     get_kernel_version_list
 from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager
+from pyanaconda.modules.payloads.payload.dnf.package_cache import PackageCache
 from pyanaconda.payload.source import SourceFactory, PayloadSourceTypeUnrecognized
 
 from pyanaconda import errors as errors
@@ -53,7 +56,8 @@ from pyanaconda.core import constants, util
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.constants import INSTALL_TREE, ISO_DIR, PAYLOAD_TYPE_DNF, \
     SOURCE_TYPE_URL, SOURCE_TYPE_CDROM, URL_TYPE_BASEURL, URL_TYPE_MIRRORLIST, \
-    URL_TYPE_METALINK, SOURCE_REPO_FILE_TYPES, SOURCE_TYPE_CDN, MULTILIB_POLICY_ALL
+    URL_TYPE_METALINK, SOURCE_REPO_FILE_TYPES, SOURCE_TYPE_CDN, MULTILIB_POLICY_ALL, \
+    DNF_METADATA_LOADING_THREADS
 from pyanaconda.core.i18n import N_, _
 from pyanaconda.core.payload import ProxyString, ProxyStringError
 from pyanaconda.flags import flags
@@ -67,8 +71,12 @@ from pyanaconda.payload import utils as payload_utils
 from pyanaconda.payload.base import Payload
 from pyanaconda.payload.dnf.utils import DNF_PACKAGE_CACHE_DIR_SUFFIX, \
     YUM_REPOS_DIR, do_transaction, get_df_map, pick_mount_point
+from pyanaconda.payload.dnf.comps_index import CompsIndex, collect_environment_options
 from pyanaconda.payload.dnf.download_progress import DownloadProgress
-from pyanaconda.payload.dnf.repomd import RepoMDMetaHash
+from pyanaconda.payload.dnf.repomd import RepoMDMetaHash, store_repoMD_hashes, \
+    verify_repoMD_hashes
+from pyanaconda.payload.dnf.transaction_progress import TransactionProgressState, \
+    receive_transaction_events
 from pyanaconda.payload.errors import MetadataError, PayloadError, NoSuchGroup, DependencyError, \
     PayloadInstallError, PayloadSetupError
 from pyanaconda.payload.image import find_first_iso_image, find_optical_install_media
@@ -105,8 +113,12 @@ class DNFPayload(Payload):
         # environment.
         self._environment_addons = {}
 
+        # Used to look up environments and groups by their ids.
+        self._comps_index = CompsIndex()
+
         self._dnf_manager = DNFManager()
         self._download_location = None
+        self._transaction_progress = None
         self._updates_enabled = True
 
         # Configure the DNF logging.
@@ -373,6 +385,10 @@ class DNFPayload(Payload):
         return data.proxy
 
     def _configure(self):
+        # The comps of the previous base are no longer valid.
+        self._comps_index = CompsIndex()
+        self._environment_addons = self._comps_index.environment_addons
+
         self._dnf_manager.reset_base()
         self._dnf_manager.configure_base(self.get_packages_data())
         self._dnf_manager.configure_proxy(self._get_proxy_url())
@@ -413,14 +429,99 @@ class DNFPayload(Payload):
 
         return pkgdir
 
-    def _sync_metadata(self, dnf_repo):
+    def _get_package_cache(self):
+        """Get the package cache if it is enabled.
+
+        :return: an instance of PackageCache or None
+        """
+        path = conf.payload.package_cache_directory
+
+        if not path:
+            return None
+
+        return PackageCache(path, conf.payload.package_cache_size * 1024 * 1024)
+
+    def _get_downloaded_packages(self, packages):
+        """Get packages that are downloaded to the download location.
+
+        Packages from local repositories are used in place.
+
+        :return: a list of tuples with a package and its local path
+        """
+        result = []
+
+        for pkg in packages:
+            path = pkg.localPkg()
+
+            if os.path.dirname(path) == self._download_location:
+                result.append((pkg, path))
+
+        return result
+
+    def _get_cacheable_packages(self, packages):
+        """Get downloaded packages that can be cached.
+
+        Packages without a checksum are skipped.
+
+        :return: a list of tuples with a local path, a checksum type and a checksum
+        """
+        result = []
+
+        for pkg, path in self._get_downloaded_packages(packages):
+            checksum_type, checksum = pkg.returnIdSum()
+
+            if not checksum_type or not checksum:
+                log.debug("Package %s has no checksum and can't be cached.", pkg)
+                continue
+
+            result.append((path, checksum_type, checksum))
+
+        return result
+
+    def _restore_cached_packages(self, package_cache, packages):
+        """Restore the packages from the package cache.
+
+        DNF doesn't download packages that are already present
+        in the download location and match their checksums.
+        """
+        restored = 0
+
+        for path, checksum_type, checksum in self._get_cacheable_packages(packages):
+            if package_cache.restore(checksum_type, checksum, path):
+                restored += 1
+
+        log.info("Restored %d packages from the package cache %s.",
+                 restored, package_cache.path)
+
+    def _store_cached_packages(self, package_cache, packages):
+        """Store the downloaded packages in the package cache."""
+        for path, checksum_type, checksum in self._get_cacheable_packages(packages):
+            package_cache.store(path, checksum_type, checksum)
+
+        package_cache.evict()
+
+    @staticmethod
+    def _load_metadata(dnf_repo):
+        """Load the metadata of the given repo.
+
+        This method is called from a worker thread, so it
+        shouldn't change the state of the payload.
+
+        :return: a RepoError or None
+        """
         try:
             dnf_repo.load()
         except dnf.exceptions.RepoError as e:
+            return e
+
+        return None
+
+    def _sync_metadata(self, dnf_repo, error):
+        if error:
             id_ = dnf_repo.id
-            log.info('_sync_metadata: addon repo error: %s', e)
+            log.info('_sync_metadata: addon repo error: %s', error)
             self.disable_repo(id_)
-            self.verbose_errors.append(str(e))
+            self.verbose_errors.append(str(error))
         log.debug('repo %s: _sync_metadata success from %s', dnf_repo.id,
                   dnf_repo.baseurl or dnf_repo.mirrorlist or dnf_repo.metalink)
 
@@ -690,11 +791,38 @@ class DNFPayload(Payload):
             log.debug("Installation space required %s", size)
         return size
 
-    def _is_group_visible(self, grpid):
-        grp = self._base.comps.group_by_pattern(grpid)
+    def _get_environment(self, environment_id):
+        """Get an environment specified by id or a pattern."""
+        env = self._comps_index.get_environment(environment_id) \
+            or self._base.comps.environment_by_pattern(environment_id)
+
+        if env is None:
+            raise NoSuchGroup(environment_id)
+
+        return env
+
+    def _get_group(self, grpid):
+        """Get a group specified by id or a pattern."""
+        grp = self._comps_index.get_group(grpid) \
+            or self._base.comps.group_by_pattern(grpid)
+
         if grp is None:
             raise NoSuchGroup(grpid)
-        return grp.visible
+
+        return grp
+
+    def _get_environment_options(self, environment_id):
+        """Get a dictionary of optional groups and their default flags."""
+        options = self._comps_index.get_environment_options(environment_id)
+
+        if options is None:
+            env = self._get_environment(environment_id)
+            options = collect_environment_options(env)
+
+        return options
+
+    def _is_group_visible(self, grpid):
+        return self._get_group(grpid).visible
 
     def check_software_selection(self):
         log.info("checking software selection")
@@ -758,11 +886,7 @@ class DNFPayload(Payload):
             repo.enabled = True
 
     def environment_description(self, environment_id):
-        env = self._base.comps.environment_by_pattern(environment_id)
-
-        if env is None:
-            raise NoSuchGroup(environment_id)
-
+        env = self._get_environment(environment_id)
         return (env.ui_name, env.ui_description)
 
     def environment_id(self, environment):
@@ -772,33 +896,19 @@ class DNFPayload(Payload):
             log.warning("environment_id() called with non-string "
                         "argument: %s", environment)
 
-        env = self._base.comps.environment_by_pattern(environment)
-
-        if env is None:
-            raise NoSuchGroup(environment)
-
-        return env.id
+        return self._get_environment(environment).id
 
     def environment_has_option(self, environment_id, grpid):
-        env = self._base.comps.environment_by_pattern(environment_id)
-        if env is None:
-            raise NoSuchGroup(environment_id)
-        return grpid in (id_.name for id_ in env.option_ids)
+        return grpid in self._get_environment_options(environment_id)
 
     def environment_option_is_default(self, environment_id, grpid):
-        env = self._base.comps.environment_by_pattern(environment_id)
-        if env is None:
-            raise NoSuchGroup(environment_id)
-
         # Look for a group in the optionlist that matches the group_id and has
         # default set
-        return any(grp for grp in env.option_ids if grp.name == grpid and grp.default)
+        return self._get_environment_options(environment_id).get(grpid, False)
 
     def group_description(self, grpid):
         """Return name/description tuple for the group specified by id."""
-        grp = self._base.comps.group_by_pattern(grpid)
-        if grp is None:
-            raise NoSuchGroup(grpid)
+        grp = self._get_group(grpid)
         return (grp.ui_name, grp.ui_description or "")
 
     def group_id(self, group_name):
@@ -809,33 +919,28 @@ class DNFPayload(Payload):
         :raise NoSuchGroup: If group_name doesn't exists.
         :raise PayloadError: When Yum's groups are not available.
         """
-        grp = self._base.comps.group_by_pattern(group_name)
-        if grp is None:
-            raise NoSuchGroup(group_name)
-        return grp.id
+        return self._get_group(group_name).id
 
     def gather_repo_metadata(self):
         with self._repos_lock:
-            for repo in self._base.repos.iter_enabled():
-                self._sync_metadata(repo)
+            repos = list(self._base.repos.iter_enabled())
+
+            # Load the metadata of the repositories concurrently, but
+            # process the results in the original order of the repos.
+            with ThreadPoolExecutor(max_workers=DNF_METADATA_LOADING_THREADS) as executor:
+                results = list(executor.map(self._load_metadata, repos))
+
+            for repo, error in zip(repos, results):
+                self._sync_metadata(repo, error)
+
         self._base.fill_sack(load_system_repo=False)
         self._base.read_comps(arch_filter=True)
         self._refresh_environment_addons()
 
     def _refresh_environment_addons(self):
         log.info("Refreshing environment_addons")
-        self._environment_addons = {}
-
-        for environment in self.environments:
-            self._environment_addons[environment] = ([], [])
-
-            # Determine which groups are specific to this environment and which other groups
-            # are available in this environment.
-            for grp in self.groups:
-                if self.environment_has_option(environment, grp):
-                    self._environment_addons[environment][0].append(grp)
-                elif self._is_group_visible(grp):
-                    self._environment_addons[environment][1].append(grp)
+        self._comps_index = CompsIndex(self._base.comps)
+        self._environment_addons = self._comps_index.environment_addons
 
     def pre_install(self):
         super().pre_install()
@@ -869,6 +974,11 @@ class DNFPayload(Payload):
                      "location: %s", self._download_location)
             shutil.rmtree(self._download_location)
         pkgs_to_download = self._base.transaction.install_set
+        package_cache = self._get_package_cache()
+
+        if package_cache:
+            self._restore_cached_packages(package_cache, pkgs_to_download)
+
         log.info('Downloading packages to %s.', self._download_location)
         progressQ.send_message(_('Downloading packages'))
         progress = DownloadProgress()
@@ -880,6 +990,9 @@ class DNFPayload(Payload):
 
         log.info('Downloading packages finished.')
 
+        if package_cache:
+            self._store_cached_packages(package_cache, pkgs_to_download)
+
         pre_msg = (N_("Preparing transaction from installation source"))
         progress_message(pre_msg)
 
@@ -887,34 +1000,14 @@ class DNFPayload(Payload):
         process = multiprocessing.Process(target=do_transaction,
                                           args=(self._base, queue_instance))
         process.start()
-        (token, msg) = queue_instance.get()
+        self._transaction_progress = TransactionProgressState()
+
         # When the installation works correctly it will get 'install' updates
-        # followed by a 'post' message and then a 'quit' message.
+        # followed by a 'post' message and then a 'done' message.
         # If the installation fails it will send 'quit' without 'post'
-        while token:
-            if token == 'install':
-                msg = _("Installing %s") % msg
-                progressQ.send_message(msg)
-            elif token == 'configure':
-                msg = _("Configuring %s") % msg
-                progressQ.send_message(msg)
-            elif token == 'verify':
-                msg = _("Verifying %s") % msg
-                progressQ.send_message(msg)
-            elif token == 'log':
-                log.info(msg)
-            elif token == 'post':
-                msg = (N_("Performing post-installation setup tasks"))
-                progressQ.send_message(msg)
-            elif token == 'done':
-                break  # Installation finished successfully
-            elif token == 'quit':
-                msg = ("Payload error - DNF installation has ended up abruptly: %s" % msg)
-                raise PayloadError(msg)
-            elif token == 'error':
-                raise PayloadInstallError("DNF error: %s" % msg)
-
-            (token, msg) = queue_instance.get()
+        for events in receive_transaction_events(queue_instance):
+            if self._process_transaction_events(events):
+                break
 
         process.join()
         # Don't close the mother base here, because we still need it.
@@ -930,6 +1023,58 @@ class DNFPayload(Payload):
             log.warning("Can't delete nonexistent download "
                         "location: %s", self._download_location)
 
+    def _process_transaction_events(self, events):
+        """Process a batch of events of the DNF transaction.
+
+        Every event is logged, but only the last progress
+        message of the batch is shown in the user interface.
+
+        :param events: a list of tuples with a token and data
+        :return: True if the transaction is finished, otherwise False
+        """
+        message = None
+        finished = False
+
+        for (token, data) in events:
+            self._transaction_progress.update(token, data)
+
+            if token == 'install':
+                message = _("Installing %s") % ("%s.%s (%d/%d)" % data)
+            elif token == 'configure':
+                message = _("Configuring %s") % ("%s.%s" % data)
+            elif token == 'verify':
+                message = _("Verifying %s") % ("%s.%s (%d/%d)" % data)
+            elif token == 'log':
+                log.info(data)
+            elif token == 'post':
+                progressQ.send_message(N_("Performing post-installation setup tasks"))
+                message = None
+            elif token == 'done':
+                finished = True  # Installation finished successfully
+                break
+            elif token == 'quit':
+                msg = ("Payload error - DNF installation has ended up abruptly: %s" % data)
+                raise PayloadError(msg)
+            elif token == 'error':
+                raise PayloadInstallError("DNF error: %s" % data)
+
+        if message:
+            progressQ.send_message(message)
+
+        return finished
+
+    def get_transaction_progress(self):
+        """Get the current progress of the DNF transaction.
+
+        The progress can be polled from any thread.
+
+        :return: an instance of TransactionProgressSnapshot or None
+        """
+        if not self._transaction_progress:
+            return None
+
+        return self._transaction_progress.snapshot()
+
     def get_repo(self, repo_id):
         """Return the yum repo object."""
         return self._base.repos[repo_id]
@@ -955,18 +1100,16 @@ class DNFPayload(Payload):
         if not self._repoMD_list:
             return False
 
-        for repo in self._repoMD_list:
-            if not repo.verify_repoMD():
-                log.debug("Can't reach repo %s", repo.id)
-                return False
-        return True
+        return verify_repoMD_hashes(self._repoMD_list)
 
     def reset(self):
         tear_down_sources(self.proxy)
         self.reset_additional_repos()
         self._install_tree_metadata = None
         self.tx_id = None
-        self._dnf_manager.clear_cache()
+        self._comps_index = CompsIndex()
+        self._environment_addons = self._comps_index.environment_addons
+        self._dnf_manager.clear_cache(keep_metadata=True)
         self._dnf_manager.configure_proxy(self._get_proxy_url())
         self._repoMD_list = []
 
@@ -1505,9 +1648,10 @@ class DNFPayload(Payload):
 
         for repo in self._base.repos.iter_enabled():
             repoMD = RepoMDMetaHash(repo, proxy_url)
-            repoMD.store_repoMD_hash()
             self._repoMD_list.append(repoMD)
 
+        store_repoMD_hashes(self._repoMD_list)
+
     def post_install(self):
         """Perform post-installation tasks."""
         # Write selected kickstart repos to target system
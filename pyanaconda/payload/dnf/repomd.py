@@ -16,6 +16,7 @@
 # Red Hat, Inc.
 #
 import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from requests import RequestException
 
@@ -26,19 +27,30 @@ from pyanaconda.payload.dnf.utils import USER_AGENT
 
 log = get_packaging_logger()
 
-__all__ = ["RepoMDMetaHash"]
+__all__ = ["RepoMDMetaHash", "store_repoMD_hashes", "verify_repoMD_hashes"]
 
 
 class RepoMDMetaHash(object):
     """Class that holds hash of a repomd.xml file content from a repository.
     This class can test availability of this repository by comparing hashes.
+
+    All urls of the repository are tried at the same time and the first
+    working url in the order of the urls is used. The ETag and Last-Modified
+    headers of the response are stored with the hash, so the repomd.xml file
+    is not downloaded again if the server says that it hasn't been modified.
     """
     def __init__(self, repo, proxy_url):
+        """Create a new instance.
+
+        :param repo: a DNF repository
+        :param proxy_url: a proxy url or None
+        """
         self._repoId = repo.id
         self._proxy_url = proxy_url
         self._ssl_verify = repo.sslverify
         self._urls = repo.baseurl
         self._repomd_hash = ""
+        self._validators = {}
 
     @property
     def repoMD_hash(self):
@@ -52,12 +64,18 @@ class RepoMDMetaHash(object):
 
     def store_repoMD_hash(self):
         """Download and store hash of the repomd.xml file content."""
-        repomd = self._download_repoMD()
+        url, status, repomd, validators = self._download_repoMD()
         self._repomd_hash = self._calculate_hash(repomd)
+        self._validators = {url: validators} if url else {}
 
     def verify_repoMD(self):
         """Download and compare with stored repomd.xml file."""
-        new_repomd = self._download_repoMD()
+        _url, status, new_repomd, _validators = self._download_repoMD(self._validators)
+
+        # The repomd.xml file hasn't been modified since it was stored.
+        if status == 304:
+            return True
+
         new_repomd_hash = self._calculate_hash(new_repomd)
         return new_repomd_hash == self._repomd_hash
 
@@ -66,10 +84,8 @@ class RepoMDMetaHash(object):
         m.update(data.encode('ascii', 'backslashreplace'))
         return m.digest()
 
-    def _download_repoMD(self):
+    def _get_proxies(self):
         proxies = {}
-        repomd = ""
-        headers = {"user-agent": USER_AGENT}
 
         if self._proxy_url is not None:
             try:
@@ -80,25 +96,143 @@ class RepoMDMetaHash(object):
                 log.info("Failed to parse proxy for test if repo available %s: %s",
                          self._proxy_url, e)
 
-        session = util.requests_session()
+        return proxies
+
+    def _download_repoMD(self, validators=None):
+        """Download the repomd.xml file from the first working url.
+
+        The urls are tried at the same time, but the result of the first
+        working url in the order of the urls is returned. It is returned
+        as soon as it is known, the downloads from the next urls are not
+        waited for.
+
+        :param validators: a dictionary of urls and headers of conditional requests
+        :return: a tuple of the url, the status code, the content and the headers
+                 of conditional requests; the url and the status code are None and
+                 the content is empty if no url works
+        """
+        validators = validators or {}
+        proxies = self._get_proxies()
+        result = (None, None, "", {})
+
+        if not self._urls:
+            return result
+
+        # Test all urls for this repo at the same time, but use the first
+        # working url in the order of the urls, so the same mirror is used
+        # to store and to verify the repomd.xml file.
+        executor = ThreadPoolExecutor(max_workers=len(self._urls))
+        futures = [
+            executor.submit(self._download_repoMD_from_url, url, proxies, validators.get(url))
+            for url in self._urls
+        ]
+
+        try:
+            for future in futures:
+                if future.result():
+                    result = future.result()
+                    break
+        finally:
+            _shutdown_executor(executor, futures)
 
-        # Test all urls for this repo. If any of these is working it is enough.
-        for url in self._urls:
-            try:
+        return result
+
+    def _download_repoMD_from_url(self, url, proxies, validators):
+        """Download the repomd.xml file from the given url.
+
+        This method is called from a worker thread, so it uses its own
+        requests session.
+
+        :return: a tuple of the url, the status code, the content and
+                 the headers of conditional requests or None
+        """
+        headers = {"user-agent": USER_AGENT}
+        headers.update(validators or {})
+
+        try:
+            with util.requests_session() as session:
                 result = session.get("%s/repodata/repomd.xml" % url, headers=headers,
                                      proxies=proxies, verify=self._ssl_verify,
                                      timeout=constants.NETWORK_CONNECTION_TIMEOUT)
-                if result.ok:
-                    repomd = result.text
-                    result.close()
-                    break
-                else:
-                    log.debug("Server returned %i code when downloading repomd",
-                              result.status_code)
-                    result.close()
-                    continue
-            except RequestException as e:
-                log.debug("Can't download new repomd.xml from %s with proxy: %s. Error: %s",
-                          url, proxies, e)
-
-        return repomd
+        except RequestException as e:
+            log.debug("Can't download new repomd.xml from %s with proxy: %s. Error: %s",
+                      url, proxies, e)
+            return None
+
+        with result:
+            if result.status_code == 304:
+                return url, result.status_code, "", validators
+
+            if not result.ok:
+                log.debug("Server returned %i code when downloading repomd",
+                          result.status_code)
+                return None
+
+            return url, result.status_code, result.text, self._get_validators(result)
+
+    @staticmethod
+    def _get_validators(result):
+        """Get headers of conditional requests for the given response."""
+        validators = {}
+
+        if result.headers.get("ETag"):
+            validators["If-None-Match"] = result.headers["ETag"]
+
+        if result.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = result.headers["Last-Modified"]
+
+        return validators
+
+
+def store_repoMD_hashes(repomd_list):
+    """Store hashes of the repomd.xml files of the given repositories.
+
+    The repositories are processed at the same time.
+
+    :param repomd_list: a list of RepoMDMetaHash instances
+    """
+    if not repomd_list:
+        return
+
+    with ThreadPoolExecutor(max_workers=len(repomd_list)) as executor:
+        for future in [executor.submit(r.store_repoMD_hash) for r in repomd_list]:
+            future.result()
+
+
+def verify_repoMD_hashes(repomd_list):
+    """Verify the repomd.xml files of the given repositories.
+
+    The repositories are verified at the same time. The verification
+    fails at the first repository that can't be reached. The remaining
+    repositories are not waited for.
+
+    :param repomd_list: a list of RepoMDMetaHash instances
+    :return: True if all repositories are reachable, otherwise False
+    """
+    if not repomd_list:
+        return True
+
+    executor = ThreadPoolExecutor(max_workers=len(repomd_list))
+    futures = {executor.submit(r.verify_repoMD): r for r in repomd_list}
+
+    try:
+        for future in as_completed(futures):
+            if not future.result():
+                log.debug("Can't reach repo %s", futures[future].id)
+                return False
+    finally:
+        _shutdown_executor(executor, futures)
+
+    return True
+
+
+def _shutdown_executor(executor, futures):
+    """Shut down the executor without waiting for the running futures.
+
+    :param executor: an instance of ThreadPoolExecutor
+    :param futures: a collection of futures of the executor
+    """
+    for future in futures:
+        future.cancel()
+
+    executor.shutdown(wait=False)
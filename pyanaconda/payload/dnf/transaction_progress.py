@@ -15,20 +15,98 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import threading
+from collections import namedtuple
+
 import dnf.transaction
 import dnf.callback
 
-__all__ = ["TransactionProgress"]
+from pyanaconda.core.constants import DNF_TRANSACTION_PROGRESS_INTERVAL
+
+__all__ = ["TransactionProgress", "TransactionProgressState", "TransactionProgressSnapshot",
+           "receive_transaction_events"]
+
+# The progress of a transaction at some point.
+#
+# The phase is one of 'install', 'post', 'configure', 'verify' and 'done'
+# or None if the transaction hasn't started yet. The package is a name
+# and an architecture of the last processed package.
+TransactionProgressSnapshot = namedtuple(
+    "TransactionProgressSnapshot",
+    ["phase", "package", "installed", "configured", "verified", "total"]
+)
 
 
 class TransactionProgress(dnf.callback.TransactionProgress):
-    def __init__(self, queue_instance):
+    """Report the progress of a transaction to anaconda.
+
+    The events of the transaction are collected and sent to the queue
+    in batches of ('batch', events), at most once per the given time
+    interval. The events are tuples of a token and structured data:
+
+        ('install', (name, arch, ts_done, ts_total))
+        ('configure', (name, arch))
+        ('verify', (name, arch, ts_done, ts_total))
+        ('log', message)
+        ('post', None)
+        ('done', None)
+        ('error', message)
+
+    The events that change the phase of the transaction and errors are
+    sent immediately. Pending events are sent by a background thread,
+    so the last event is never delayed by more than the interval.
+    """
+
+    def __init__(self, queue_instance, interval=DNF_TRANSACTION_PROGRESS_INTERVAL):
         super().__init__()
         self._queue = queue_instance
+        self._interval = interval
         self._last_ts = None
         self._postinst_phase = False
         self.cnt = 0
 
+        self._events = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start to send the pending events periodically."""
+        self._thread = threading.Thread(
+            name="AnaTransactionProgressThread",
+            target=self._flush_periodically,
+            daemon=True
+        )
+        self._thread.start()
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self._interval):
+            self.flush()
+
+    def stop(self):
+        """Stop the background thread and send the pending events."""
+        self._stopped.set()
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+        self.flush()
+
+    def flush(self):
+        """Send the pending events to the queue."""
+        with self._lock:
+            if self._events:
+                self._queue.put(('batch', self._events))
+                self._events = []
+
+    def _send(self, token, data, immediately=False):
+        with self._lock:
+            self._events.append((token, data))
+
+        if immediately:
+            self.flush()
+
     def progress(self, package, action, ti_done, ti_total, ts_done, ts_total):
         # Process DNF actions, communicating with anaconda via the queue
         # A normal installation consists of 'install' messages followed by
@@ -39,20 +117,18 @@ class TransactionProgress(dnf.callback.TransactionProgress):
                 return
             self._last_ts = ts_done
 
-            msg = '%s.%s (%d/%d)' % \
-                (package.name, package.arch, ts_done, ts_total)
             self.cnt += 1
-            self._queue.put(('install', msg))
+            self._send('install', (package.name, package.arch, ts_done, ts_total))
 
             # Log the exact package nevra, build time and checksum
             nevra = "%s-%s.%s" % (package.name, package.evr, package.arch)
             log_msg = "Installed: %s %s %s" % (nevra, package.buildtime, package.returnIdSum()[1])
-            self._queue.put(('log', log_msg))
+            self._send('log', log_msg)
 
         elif action == dnf.transaction.TRANS_POST:
-            self._queue.put(('post', None))
+            self._send('post', None)
             log_msg = "Post installation setup phase started."
-            self._queue.put(('log', log_msg))
+            self._send('log', log_msg, immediately=True)
             self._postinst_phase = True
 
         elif action == dnf.transaction.PKG_SCRIPTLET:
@@ -60,28 +136,100 @@ class TransactionProgress(dnf.callback.TransactionProgress):
             nevra = "%s-%s.%s" % (package.name, package.evr, package.arch)
             log_msg = "Configuring (running scriptlet for): %s %s %s" % (nevra, package.buildtime,
                                                                          package.returnIdSum()[1])
-            self._queue.put(('log', log_msg))
+            self._send('log', log_msg)
 
             # only show progress in UI for post-installation scriptlets
             if self._postinst_phase:
-                msg = '%s.%s' % (package.name, package.arch)
-                self._queue.put(('configure', msg))
+                self._send('configure', (package.name, package.arch))
 
         elif action == dnf.transaction.PKG_VERIFY:
-            msg = '%s.%s (%d/%d)' % (package.name, package.arch, ts_done, ts_total)
-            self._queue.put(('verify', msg))
+            self._send('verify', (package.name, package.arch, ts_done, ts_total))
 
             # Log the exact package nevra, build time and checksum
             nevra = "%s-%s.%s" % (package.name, package.evr, package.arch)
             log_msg = "Verifying: %s %s %s" % (nevra, package.buildtime, package.returnIdSum()[1])
-            self._queue.put(('log', log_msg))
+            self._send('log', log_msg)
 
             # Once the last package is verified the transaction is over
             if ts_done == ts_total:
-                self._queue.put(('done', None))
+                self._send('done', None, immediately=True)
 
     def error(self, message):
         """Report an error that occurred during the transaction. Message is a
         string which describes the error.
         """
-        self._queue.put(('error', message))
+        self._send('error', message, immediately=True)
+
+
+def receive_transaction_events(queue_instance):
+    """Receive the events of a transaction from the queue.
+
+    :param queue_instance: a queue filled by TransactionProgress
+    :return: a generator of lists of tuples with a token and data
+    """
+    while True:
+        token, data = queue_instance.get()
+
+        if token == 'batch':
+            yield data
+        else:
+            yield [(token, data)]
+
+
+class TransactionProgressState(object):
+    """The state of a transaction reported by TransactionProgress.
+
+    The state is updated by the thread that receives the events
+    and it can be read from other threads at any time, for example
+    by a user interface that is refreshed at a fixed rate.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phase = None
+        self._package = None
+        self._installed = 0
+        self._configured = 0
+        self._verified = 0
+        self._total = 0
+
+    def update(self, token, data):
+        """Update the state with an event of the transaction.
+
+        :param token: a token of the event
+        :param data: data of the event
+        """
+        with self._lock:
+            if token == 'install':
+                name, arch, ts_done, ts_total = data
+                self._package = "%s.%s" % (name, arch)
+                self._installed = ts_done
+                self._total = ts_total
+            elif token == 'configure':
+                name, arch = data
+                self._package = "%s.%s" % (name, arch)
+                self._configured += 1
+            elif token == 'verify':
+                name, arch, ts_done, ts_total = data
+                self._package = "%s.%s" % (name, arch)
+                self._verified = ts_done
+                self._total = ts_total
+            elif token not in ('post', 'done'):
+                return
+
+            self._phase = token
+
+    def snapshot(self):
+        """Get the current progress of the transaction.
+
+        :return: an instance of TransactionProgressSnapshot
+        """
+        with self._lock:
+            return TransactionProgressSnapshot(
+                phase=self._phase,
+                package=self._package,
+                installed=self._installed,
+                configured=self._configured,
+                verified=self._verified,
+                total=self._total
+            )
@@ -102,8 +102,10 @@ def do_transaction(base, queue_instance):
     # Execute the DNF transaction and catch any errors. An error doesn't
     # always raise a BaseException, so presence of 'quit' without a preceeding
     # 'post' message also indicates a problem.
+    display = TransactionProgress(queue_instance)
+
     try:
-        display = TransactionProgress(queue_instance)
+        display.start()
         base.do_transaction(display=display)
         exit_reason = "DNF quit"
     except BaseException as e:  # pylint: disable=broad-except
@@ -113,4 +115,5 @@ def do_transaction(base, queue_instance):
         exit_reason = str(e) + traceback.format_exc()
     finally:
         base.close()  # Always close this base.
+        display.stop()  # Send the pending events before quit.
         queue_instance.put(('quit', str(exit_reason)))
@@ -22,7 +22,8 @@ from enum import IntEnum
 
 from dasbus.error import DBusError
 from pyanaconda.core.constants import THREAD_STORAGE, THREAD_PAYLOAD, THREAD_PAYLOAD_RESTART, \
-    THREAD_WAIT_FOR_CONNECTING_NM, THREAD_SUBSCRIPTION, PAYLOAD_TYPE_DNF
+    THREAD_WAIT_FOR_CONNECTING_NM, THREAD_SUBSCRIPTION, PAYLOAD_TYPE_DNF, SOURCE_TYPE_URL, \
+    SOURCE_TYPE_CDN, SOURCE_TYPE_CLOSEST_MIRROR
 from pyanaconda.core.i18n import _, N_
 from pyanaconda.threading import threadMgr, AnacondaThread
 from pyanaconda.payload.errors import PayloadError
@@ -75,6 +76,19 @@ class PayloadManager(object):
     ERROR_SETUP = N_("Failed to set up installation source")
     ERROR_MD = N_("Error downloading package metadata")
 
+    # Sources that don't need the storage.
+    NETWORK_SOURCE_TYPES = (
+        SOURCE_TYPE_URL,
+        SOURCE_TYPE_CDN,
+        SOURCE_TYPE_CLOSEST_MIRROR
+    )
+
+    # Protocols of additional repositories that need mounts.
+    LOCAL_REPO_PROTOCOLS = (
+        "nfs:",
+        "file:",
+    )
+
     def __init__(self):
         self._event_lock = threading.Lock()
         self._event_listeners = {}
@@ -167,6 +181,41 @@ class PayloadManager(object):
             for func in self._event_listeners[event_id]:
                 func()
 
+    def _needs_storage(self, payload, checkmount):
+        """Does the payload need the storage to be set up?
+
+        The metadata of network sources can be downloaded while the
+        storage is still being scanned. The default source might be
+        replaced with an installation media, so it needs the storage
+        if we should check for mounted media. The additional repositories
+        on a hard drive, NFS or a local path need the storage as well.
+
+        :param payload.Payload payload: The payload instance
+        :param bool checkmount: Whether to check for valid mounted media
+        :return: True or False
+        """
+        if payload.type != PAYLOAD_TYPE_DNF:
+            return True
+
+        if payload.source_type not in self.NETWORK_SOURCE_TYPES:
+            return True
+
+        if checkmount and payload.is_source_default():
+            return True
+
+        # The additional repositories can be on the local storage.
+        for ksrepo in payload.data.repo.dataList():
+            if not ksrepo.enabled:
+                continue
+
+            if ksrepo.is_harddrive_based():
+                return True
+
+            if ksrepo.baseurl and ksrepo.baseurl.startswith(self.LOCAL_REPO_PROTOCOLS):
+                return True
+
+        return False
+
     def _run_thread(self, payload, fallback, checkmount, onlyOnChange):
         # This is the thread entry
         # Set the initial state
@@ -174,8 +223,11 @@ class PayloadManager(object):
         self._set_state(PayloadState.STARTED)
 
         # Wait for storage
-        self._set_state(PayloadState.WAITING_STORAGE)
-        threadMgr.wait(THREAD_STORAGE)
+        if self._needs_storage(payload, checkmount):
+            self._set_state(PayloadState.WAITING_STORAGE)
+            threadMgr.wait(THREAD_STORAGE)
+        else:
+            log.debug("The payload source doesn't need storage, not waiting for it.")
 
         # Wait for network
         self._set_state(PayloadState.WAITING_NETWORK)
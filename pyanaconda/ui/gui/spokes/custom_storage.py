@@ -47,7 +47,7 @@ from pyanaconda.modules.common.structures.partitioning import PartitioningReques
 from pyanaconda.modules.common.structures.device_factory import DeviceFactoryRequest, \
     DeviceFactoryPermissions
 from pyanaconda.product import productName, productVersion
-from pyanaconda.ui.lib.storage import reset_bootloader, create_partitioning
+from pyanaconda.ui.lib.storage import reset_bootloader, create_partitioning, get_device_infos
 from pyanaconda.core.storage import DEVICE_TYPE_UNSUPPORTED, DEVICE_TEXT_MAP, \
     MOUNTPOINT_DESCRIPTIONS, NAMED_DEVICE_TYPES, CONTAINER_DEVICE_TYPES, device_type_from_autopart, \
     PROTECTED_FORMAT_TYPES, DEVICE_TYPE_BTRFS, DEVICE_TYPE_MD, Size
@@ -122,6 +122,7 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
 
         self._partitioning = None
         self._device_tree = None
+        self._device_infos = {}
         self._request = DeviceFactoryRequest()
         self._original_request = DeviceFactoryRequest()
         self._permissions = DeviceFactoryPermissions()
@@ -396,6 +397,9 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
             )
             ui_roots.insert(0, new_root)
 
+        # Get data of the shown devices with one call.
+        self._load_device_infos(ui_roots, unused_devices)
+
         # Add root pages.
         for root in ui_roots:
             self._add_root_page(root)
@@ -404,6 +408,15 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
         if unused_devices:
             self._add_unknown_page(unused_devices)
 
+    def _load_device_infos(self, roots, devices):
+        """Get data of the devices of the given roots and other devices."""
+        device_names = set(devices)
+
+        for root in roots:
+            device_names.update(root.get_devices())
+
+        self._device_infos = get_device_infos(self._device_tree, sorted(device_names))
+
     def _add_initial_page(self, reuse_existing=False):
         page = CreateNewPage(
             self._os_name,
@@ -463,13 +476,9 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
         if not root_name:
             root_name = selector.root_name
 
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
-
-        format_data = DeviceFormatData.from_structure(
-            self._device_tree.GetFormatData(device_name)
-        )
+        device_info = self._device_infos[device_name]
+        device_data = device_info.device
+        format_data = device_info.format
 
         mount_point = self._get_mount_point_description(
             mount_point, format_data
@@ -18,14 +18,13 @@
 #
 from blivet import arch
 
-from pyanaconda.modules.common.structures.storage import DeviceData
 from pyanaconda.core.constants import BOOTLOADER_ENABLED, BOOTLOADER_LOCATION_MBR, \
     BOOTLOADER_DRIVE_UNSET, BOOTLOADER_SKIPPED
 from pyanaconda.core.i18n import C_
 from pyanaconda.modules.common.constants.objects import BOOTLOADER, DEVICE_TREE
 from pyanaconda.modules.common.constants.services import STORAGE
 from pyanaconda.ui.gui import GUIObject
-from pyanaconda.ui.lib.storage import get_disks_summary
+from pyanaconda.ui.lib.storage import get_disks_summary, get_device_infos
 from blivet.size import Size
 
 __all__ = ["SelectedDisksDialog"]
@@ -89,14 +88,11 @@ class SelectedDisksDialog(GUIObject):
         return rc
 
     def _update_disks(self):
-        for device_name in self._disks:
-            device_data = DeviceData.from_structure(
-                self._device_tree.GetDeviceData(device_name)
-            )
+        device_infos = get_device_infos(self._device_tree, self._disks)
 
-            device_free_space = self._device_tree.GetDiskFreeSpace(
-                [device_name]
-            )
+        for device_name in self._disks:
+            device_data = device_infos[device_name].device
+            device_free_space = device_infos[device_name].free_space
 
             self._store.append([
                 False,
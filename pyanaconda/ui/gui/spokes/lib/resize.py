@@ -22,9 +22,10 @@ from blivet.size import Size
 from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.i18n import _, C_, N_, P_
 from pyanaconda.modules.common.constants.services import STORAGE
-from pyanaconda.modules.common.structures.storage import OSData, DeviceData, DeviceFormatData
+from pyanaconda.modules.common.structures.storage import OSData
 from pyanaconda.ui.gui import GUIObject
 from pyanaconda.ui.gui.utils import blockedHandler, escape_markup, timed_action
+from pyanaconda.ui.lib.storage import get_device_infos
 
 import gi
 gi.require_version("Gdk", "3.0")
@@ -86,6 +87,7 @@ class ResizeDialog(GUIObject):
         self._initial_free_space = Size(0)
         self._selected_reclaimable_space = Size(0)
         self._can_shrink_something = False
+        self._device_infos = {}
 
         self._disk_store = self.builder.get_object("diskStore")
         self._selection = self.builder.get_object("diskView-selection")
@@ -132,10 +134,32 @@ class ResizeDialog(GUIObject):
         else:
             return None
 
+    def _load_device_infos(self, device_names):
+        """Get data of the given devices with one call.
+
+        :param device_names: a list of device names
+        :raise: UnknownDeviceError if a device is not found
+        """
+        self._device_infos.update(
+            get_device_infos(self._device_tree, device_names)
+        )
+
+    def _get_device_info(self, device_name):
+        """Get data of the given device.
+
+        :raise: UnknownDeviceError if the device is not found
+        """
+        if device_name not in self._device_infos:
+            self._load_device_infos([device_name])
+
+        return self._device_infos[device_name]
+
     def populate(self, disks):
         self._initial_free_space = Size(0)
         self._selected_reclaimable_space = Size(0)
         self._can_shrink_something = False
+        self._device_infos = {}
+        self._load_device_infos(disks)
 
         total_disks = 0
         total_reclaimable_space = Size(0)
@@ -165,12 +189,9 @@ class ResizeDialog(GUIObject):
 
     def _add_disk(self, device_name):
         # Get the device data.
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
-        format_data = DeviceFormatData.from_structure(
-            self._device_tree.GetFormatData(device_name)
-        )
+        device_info = self._get_device_info(device_name)
+        device_data = device_info.device
+        format_data = device_info.format
 
         # First add the disk itself.
         is_partitioned = self._device_tree.IsDevicePartitioned(device_name)
@@ -201,6 +222,7 @@ class ResizeDialog(GUIObject):
 
         # Then add all its partitions.
         partitions = self._device_tree.GetDevicePartitions(device_name)
+        self._load_device_infos(partitions)
 
         for child_name in partitions:
             free_size = self._add_partition(itr, child_name)
@@ -219,12 +241,9 @@ class ResizeDialog(GUIObject):
 
     def _add_partition(self, itr, device_name):
         # Get the device data.
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
-        format_data = DeviceFormatData.from_structure(
-            self._device_tree.GetFormatData(device_name)
-        )
+        device_info = self._get_device_info(device_name)
+        device_data = device_info.device
+        format_data = device_info.format
 
         # Calculate the free size.
         # Devices that are not resizable are still deletable.
@@ -274,7 +293,7 @@ class ResizeDialog(GUIObject):
 
     def _add_free_space(self, itr, device_name):
         # Calculate the free space.
-        disk_free = Size(self._device_tree.GetDiskFreeSpace([device_name]))
+        disk_free = Size(self._get_device_info(device_name).free_space)
 
         if disk_free < Size("1MiB"):
             return
@@ -388,9 +407,7 @@ class ResizeDialog(GUIObject):
             return
 
         device_name = obj.name
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
+        device_data = self._get_device_info(device_name).device
 
         # If the selected filesystem does not support shrinking, make that
         # button insensitive.
@@ -451,9 +468,7 @@ class ResizeDialog(GUIObject):
         if is_partitioned:
             return False
 
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
+        device_data = self._get_device_info(device_name).device
 
         if obj.action == _(PRESERVE):
             return False
@@ -509,9 +524,7 @@ class ResizeDialog(GUIObject):
                     self._disk_store[part_itr][EDITABLE_COL] = False
                 elif new_action == PRESERVE:
                     part_name = self._disk_store[part_itr][DEVICE_NAME_COL]
-                    part_data = DeviceData.from_structure(
-                        self._device_tree.GetDeviceData(part_name)
-                    )
+                    part_data = self._get_device_info(part_name).device
                     self._disk_store[part_itr][EDITABLE_COL] = not part_data.protected
 
                 part_itr = self._disk_store.iter_next(part_itr)
@@ -577,9 +590,7 @@ class ResizeDialog(GUIObject):
                 continue
 
             device_name = obj.name
-            device_data = DeviceData.from_structure(
-                self._device_tree.GetDeviceData(device_name)
-            )
+            device_data = self._get_device_info(device_name).device
 
             if device_data.is_disk:
                 self._on_action_changed(itr, action)
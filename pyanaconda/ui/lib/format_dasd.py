@@ -111,9 +111,9 @@ class DasdFormatting(object):
         self.report.emit(_("Formatting DASDs"))
         self.do_format()
 
-        # Update the storage.
+        # Update the storage. Only the formatted DASDs have changed.
         self.report.emit(_("Probing storage"))
-        reset_storage()
+        reset_storage(device_names=self._dasds)
 
     @staticmethod
     def run_automatically(disks, callback=None):
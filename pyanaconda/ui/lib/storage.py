@@ -35,6 +35,8 @@ from pyanaconda.modules.common.constants.objects import DISK_SELECTION, BOOTLOAD
 from pyanaconda.modules.common.constants.services import STORAGE
 from pyanaconda.modules.common.errors.configuration import StorageConfigurationError, \
     BootloaderConfigurationError
+from pyanaconda.modules.common.errors.storage import UnknownDeviceError
+from pyanaconda.modules.common.structures.storage import DeviceTreeData
 from pyanaconda.modules.common.structures.validation import ValidationReport
 from pyanaconda.modules.common.task import sync_run_task
 from pyanaconda.core.storage import device_matches
@@ -75,11 +77,12 @@ def find_partitioning():
     return STORAGE.get_proxy(object_path)
 
 
-def reset_storage(scan_all=False, retry=True):
+def reset_storage(scan_all=False, retry=True, device_names=None):
     """Reset the storage model.
 
     :param scan_all: should we scan all devices in the system?
     :param retry: should we allow to retry the reset?
+    :param device_names: a list of changed devices to rescan or None to scan all devices
     """
     # Clear the exclusive disks to scan all devices in the system.
     if scan_all:
@@ -91,7 +94,11 @@ def reset_storage(scan_all=False, retry=True):
 
     while True:
         try:
-            task_path = storage_proxy.ScanDevicesWithTask()
+            if device_names is not None:
+                task_path = storage_proxy.ScanChangedDevicesWithTask(device_names)
+            else:
+                task_path = storage_proxy.ScanDevicesWithTask()
+
             task_proxy = STORAGE.get_proxy(task_path)
             sync_run_task(task_proxy)
         except DBusError as e:
@@ -216,6 +223,31 @@ def get_disks_summary(disks):
     )
 
 
+def get_device_infos(device_tree, device_names):
+    """Get data of the given devices with one call.
+
+    :param device_tree: a proxy of a device tree
+    :param device_names: a list of device names
+    :return: a dictionary of device names and instances of DeviceInfoData
+    :raise: UnknownDeviceError if a device is not found
+    """
+    if not device_names:
+        return {}
+
+    tree_data = DeviceTreeData.from_structure(
+        device_tree.GetDeviceTreeData(device_names, 0)
+    )
+    device_infos = {
+        info.device.name: info for info in tree_data.devices
+    }
+
+    for device_name in device_names:
+        if device_name not in device_infos:
+            raise UnknownDeviceError(device_name)
+
+    return device_infos
+
+
 def mark_protected_device(spec):
     """Mark a device as protected.
 
@@ -25,12 +25,12 @@ from pyanaconda.modules.common.constants.objects import DISK_SELECTION, DISK_INI
 from pyanaconda.modules.common.constants.services import STORAGE
 from pyanaconda.modules.common.structures.partitioning import MountPointRequest, \
     PartitioningRequest
-from pyanaconda.modules.common.structures.storage import DeviceFormatData, DeviceData
+from pyanaconda.modules.common.structures.storage import DeviceFormatData
 from pyanaconda.modules.common.structures.validation import ValidationReport
 from pyanaconda.ui.categories.system import SystemCategory
 from pyanaconda.ui.lib.storage import find_partitioning, reset_storage, \
     select_default_disks, apply_disk_selection, get_disks_summary, apply_partitioning, \
-    create_partitioning, filter_disks_by_names
+    create_partitioning, filter_disks_by_names, get_device_infos
 from pyanaconda.ui.tui.spokes import NormalTUISpoke
 from pyanaconda.ui.tui.tuiobject import Dialog, PasswordDialog
 from pyanaconda.core.storage import get_supported_autopart_choices
@@ -190,9 +190,12 @@ class StorageSpoke(NormalTUISpoke):
         # Create a new container.
         self._container = ListColumnContainer(1, spacing=1)
 
+        # Get data of the disks with one call.
+        device_infos = get_device_infos(self._device_tree, self._available_disks)
+
         # loop through the disks and present them.
         for disk_name in self._available_disks:
-            disk_info = self._format_disk_info(disk_name)
+            disk_info = self._format_disk_info(device_infos[disk_name].device)
             c = CheckboxWidget(title=disk_info, completed=(disk_name in self._selected_disks))
             self._container.add(c, self._update_disk_list_callback, disk_name)
 
@@ -217,17 +220,15 @@ class StorageSpoke(NormalTUISpoke):
         self._select_all = False
         self._update_disk_list(disk)
 
-    def _format_disk_info(self, disk):
+    def _format_disk_info(self, data):
         """ Some specialized disks are difficult to identify in the storage
             spoke, so add and return extra identifying information about them.
 
             Since this is going to be ugly to do within the confines of the
             CheckboxWidget, pre-format the display string right here.
-        """
-        data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(disk)
-        )
 
+            :param data: an instance of DeviceData
+        """
         # show this info for all disks
         format_str = "{}: {} ({})".format(
             data.attrs.get("model", "DISK"),
@@ -636,8 +637,16 @@ class MountPointAssignSpoke(NormalTUISpoke):
         super().refresh(args)
         self._container = ListColumnContainer(2)
 
-        for request in self._requests:
-            widget = TextWidget(self._get_request_description(request))
+        # Get data of the requested devices with one call.
+        device_names = [
+            self._device_tree.ResolveDevice(request.device_spec)
+            for request in self._requests
+        ]
+        device_infos = get_device_infos(self._device_tree, device_names)
+
+        for request, device_name in zip(self._requests, device_names):
+            device_data = device_infos[device_name].device
+            widget = TextWidget(self._get_request_description(request, device_data))
             self._container.add(widget, self._configure_request, request)
 
         message = _(
@@ -694,14 +703,8 @@ class MountPointAssignSpoke(NormalTUISpoke):
             self._partitioning.GatherRequests()
         )
 
-    def _get_request_description(self, request):
+    def _get_request_description(self, request, device_data):
         """Get description of the given mount info."""
-        # Get the device data.
-        device_name = self._device_tree.ResolveDevice(request.device_spec)
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
-
         # Generate the description.
         description = "{} ({})".format(request.device_spec, Size(device_data.size))
 
@@ -23,11 +23,9 @@ from pyanaconda import network, product
 from pyanaconda.core import util, constants
 import socket
 import subprocess
-import dbus
 
 from pyanaconda.core.i18n import _, P_
 from pyanaconda.ui.tui import tui_quit_callback
-from pyanaconda.ui.tui.spokes.askvnc import VNCPassSpoke
 
 from simpleline import App
 from simpleline.render.screen_handler import ScreenHandler
@@ -38,6 +36,10 @@ stdoutLog = get_stdout_logger()
 from pyanaconda.anaconda_loggers import get_module_logger
 log = get_module_logger(__name__)
 
+# The DBus bindings and the spoke are needed only in some cases.
+dbus = util.lazy_import("dbus")
+askvnc = util.lazy_import("pyanaconda.ui.tui.spokes.askvnc")
+
 XVNC_BINARY_NAME = "Xvnc"
 
 
@@ -295,7 +297,7 @@ class VncServer(object):
         App.initialize()
         loop = App.get_event_loop()
         loop.set_quit_callback(tui_quit_callback)
-        spoke = VNCPassSpoke(self.anaconda.ksdata, None, None, message)
+        spoke = askvnc.VNCPassSpoke(self.anaconda.ksdata, None, None, message)
         ScreenHandler.schedule_screen(spoke)
         App.run()
 
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+#
+# Compare the parallel copy of a live image with rsync.
+#
+# The script generates a synthetic directory tree and copies it with
+# rsync and with the parallel copy using different numbers of workers.
+# Run it from the root of the repository, ideally on the storage that
+# should be measured:
+#
+#   PYTHONPATH=. scripts/testing/benchmark_parallel_copy.py --files 300000 --dir /var/tmp
+#
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+from pyanaconda.modules.payloads.base.installation import IMAGE_EXCLUDES
+from pyanaconda.modules.payloads.base.parallel_copy import ParallelCopy
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the parallel copy.")
+    parser.add_argument("--files", type=int, default=300000,
+                        help="number of files in the synthetic tree")
+    parser.add_argument("--files-per-dir", type=int, default=500,
+                        help="number of files in one directory")
+    parser.add_argument("--max-size", type=int, default=64 * 1024,
+                        help="maximal size of a file in bytes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, 16],
+                        help="numbers of workers of the parallel copy")
+    parser.add_argument("--dir", default=None,
+                        help="directory for the source and destination trees")
+    return parser.parse_args()
+
+
+def create_tree(source, files, files_per_dir, max_size):
+    """Create a synthetic tree similar to a root file system."""
+    random.seed(0)
+    data = os.urandom(max_size)
+
+    for i in range(files):
+        directory = os.path.join(source, "usr", "d{}".format(i // files_per_dir))
+
+        if i % files_per_dir == 0:
+            os.makedirs(directory)
+
+        path = os.path.join(directory, "f{}".format(i))
+        with open(path, "wb") as f:
+            f.write(data[:random.randint(0, max_size)])
+
+        # Add some hardlinks and symlinks.
+        if i % 100 == 1:
+            os.link(path, path + ".hardlink")
+        elif i % 100 == 2:
+            os.symlink(os.path.basename(path), path + ".symlink")
+
+
+def measure(name, func):
+    start = time.monotonic()
+    func()
+    elapsed = time.monotonic() - start
+    print("{:<24} {:>8.2f} s".format(name, elapsed))
+
+
+def run_rsync(source, dest):
+    args = ["rsync", "-pogAXtlHrDx"]
+
+    for pattern in IMAGE_EXCLUDES:
+        args.extend(["--exclude", pattern])
+
+    subprocess.run(args + [source + "/", dest], check=True)
+
+
+def drop_caches():
+    """Drop the page cache if possible, so the runs are comparable."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+    except OSError:
+        pass
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        source = os.path.join(tmp, "source")
+
+        print("Creating a tree of {} files...".format(args.files))
+        create_tree(source, args.files, args.files_per_dir, args.max_size)
+
+        if shutil.which("rsync"):
+            dest = os.path.join(tmp, "rsync")
+            drop_caches()
+            measure("rsync", lambda: run_rsync(source, dest))
+            shutil.rmtree(dest)
+        else:
+            print("rsync is not installed, skipping")
+
+        for workers in args.workers:
+            dest = os.path.join(tmp, "parallel-{}".format(workers))
+            copy = ParallelCopy(source, dest, excludes=IMAGE_EXCLUDES, workers=workers)
+            drop_caches()
+            measure("parallel ({} workers)".format(workers), copy.run)
+            shutil.rmtree(dest)
+
+
+if __name__ == "__main__":
+    main()
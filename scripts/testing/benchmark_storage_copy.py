@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+#
+# Measure the cost of copies of the storage model.
+#
+# The script generates synthetic device trees with the given numbers
+# of disks and measures the time and the memory that are needed to
+# create one copy of the storage model. Every storage playground of
+# a partitioning module is such a copy. Run it from the root of the
+# repository:
+#
+#   PYTHONPATH=. scripts/testing/benchmark_storage_copy.py --disks 10 100 1000
+#
+import argparse
+import gc
+import os
+import time
+
+from blivet.devices import DiskDevice, LVMVolumeGroupDevice, LVMLogicalVolumeDevice
+from blivet.formats import get_format
+from blivet.size import Size
+
+from pyanaconda.modules.storage.devicetree import create_storage
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark copies of the storage model.")
+    parser.add_argument("--disks", type=int, nargs="+", default=[10, 100, 1000],
+                        help="numbers of disks in the synthetic trees")
+    parser.add_argument("--disks-per-vg", type=int, default=10,
+                        help="number of physical volumes in one volume group")
+    parser.add_argument("--copies", type=int, default=3,
+                        help="number of measured copies of every tree")
+    return parser.parse_args()
+
+
+def create_tree(disks, disks_per_vg):
+    """Create a storage model with a synthetic device tree.
+
+    Every disk is a physical volume. The physical volumes
+    are grouped into volume groups with one logical volume.
+    """
+    storage = create_storage()
+    pvs = []
+
+    for i in range(disks):
+        # Use names that don't exist in /dev, so nothing is probed.
+        disk = DiskDevice(
+            "benchmark{}".format(i),
+            fmt=get_format("lvmpv"),
+            size=Size("100 GiB"),
+            serial="BENCHMARK{:08d}".format(i),
+            exists=True
+        )
+        storage.devicetree._add_device(disk)
+        pvs.append(disk)
+
+    for i in range(0, disks, disks_per_vg):
+        vg = LVMVolumeGroupDevice(
+            "benchmark_vg{}".format(i // disks_per_vg),
+            parents=pvs[i:i + disks_per_vg]
+        )
+        storage.devicetree._add_device(vg)
+
+        lv = LVMLogicalVolumeDevice(
+            "root",
+            size=Size("10 GiB"),
+            parents=[vg],
+            fmt=get_format("xfs"),
+            exists=False
+        )
+        storage.devicetree._add_device(lv)
+
+    return storage
+
+
+def get_rss():
+    """Get the resident set size of this process in bytes."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(storage, copies):
+    """Measure copies of the storage model.
+
+    :return: an average time and an average RSS of one copy
+    """
+    results = []
+    elapsed = 0.0
+
+    gc.collect()
+    rss = get_rss()
+
+    for _i in range(copies):
+        start = time.monotonic()
+        results.append(storage.copy())
+        elapsed += time.monotonic() - start
+
+    gc.collect()
+    rss = get_rss() - rss
+
+    return elapsed / copies, rss / copies
+
+
+def main():
+    args = parse_args()
+    print("{:>8} {:>10} {:>12} {:>12}".format("disks", "devices", "time [s]", "RSS [MiB]"))
+
+    for disks in args.disks:
+        storage = create_tree(disks, args.disks_per_vg)
+        elapsed, rss = measure(storage, args.copies)
+
+        print("{:>8} {:>10} {:>12.3f} {:>12.1f}".format(
+            disks, len(storage.devices), elapsed, rss / 1024 / 1024
+        ))
+
+
+if __name__ == "__main__":
+    main()
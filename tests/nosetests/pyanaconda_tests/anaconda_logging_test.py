@@ -0,0 +1,126 @@
+#
+# Copyright (C) 2020  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import logging
+import threading
+import unittest
+
+from pyanaconda.anaconda_logging import AnacondaLogWriter, AnacondaQueueHandler
+
+
+class CollectingHandler(logging.Handler):
+    """Handler that collects the formatted messages."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+        self.blocked = threading.Event()
+        self.blocked.set()
+
+    def emit(self, record):
+        self.blocked.wait()
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+class AnacondaLogWriterTestCase(unittest.TestCase):
+    """Test the asynchronous logging."""
+
+    def setUp(self):
+        self.handler = CollectingHandler()
+        self.writer = AnacondaLogWriter(max_size=2)
+        self.logger = logging.getLogger("anaconda.test.writer")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.addHandler(AnacondaQueueHandler(self.handler, self.writer))
+
+    def tearDown(self):
+        self.handler.blocked.set()
+        self.writer.stop()
+        self.logger.handlers = []
+
+    def synchronous_test(self):
+        """Test the logging without a running writer."""
+        self.logger.info("Message %d.", 1)
+        self.assertEqual(self.handler.messages, ["Message 1."])
+        self.assertEqual(self.handler.threads, {threading.current_thread().name})
+
+    def asynchronous_test(self):
+        """Test the logging with a running writer."""
+        self.writer.start()
+
+        for i in range(10):
+            self.logger.info("Message %d.", i)
+
+        self.assertTrue(self.writer.flush())
+        self.assertEqual(self.handler.messages, ["Message %d." % i for i in range(10)])
+        self.assertNotIn(threading.current_thread().name, self.handler.threads)
+
+    def format_arguments_test(self):
+        """Test the formatting of arguments on the calling thread."""
+        self.writer.start()
+        self.handler.blocked.clear()
+
+        values = [1]
+        self.logger.info("Values: %s", values)
+        values.append(2)
+
+        self.handler.blocked.set()
+        self.assertTrue(self.writer.flush())
+        self.assertEqual(self.handler.messages, ["Values: [1]"])
+
+    def drop_debug_messages_test(self):
+        """Test the dropping of debug messages."""
+        self.writer.start()
+        self.handler.blocked.clear()
+
+        # The writer is blocked by the first message
+        # and the queue is filled with two others.
+        self.logger.info("Message 1.")
+
+        while self.writer._queue.qsize():
+            pass
+
+        self.logger.info("Message 2.")
+        self.logger.info("Message 3.")
+
+        # The debug message is dropped.
+        self.logger.debug("Message 4.")
+        self.assertEqual(self.writer.dropped, 1)
+
+        self.handler.blocked.set()
+        self.assertTrue(self.writer.flush())
+        self.assertEqual(self.handler.messages, [
+            "Message 1.",
+            "Message 2.",
+            "Message 3.",
+        ])
+
+    def stop_test(self):
+        """Test the stopping of the writer."""
+        self.writer.start()
+        self.assertTrue(self.writer.is_running)
+
+        self.logger.info("Message 1.")
+        self.writer.stop()
+        self.assertFalse(self.writer.is_running)
+        self.assertEqual(self.handler.messages, ["Message 1."])
+
+        # Log synchronously after the writer is stopped.
+        self.logger.info("Message 2.")
+        self.assertEqual(self.handler.messages, ["Message 1.", "Message 2."])
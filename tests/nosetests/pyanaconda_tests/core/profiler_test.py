@@ -0,0 +1,140 @@
+#
+# Copyright (C) 2020  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+import os
+import sys
+import tempfile
+import unittest
+from textwrap import dedent
+from unittest.mock import patch, Mock
+
+from pyanaconda.core.startup.profiler import StartupProfiler
+
+
+class StartupProfilerTestCase(unittest.TestCase):
+    """Test the start-up profiler."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        sys.path.insert(0, self._tmp.name)
+
+    def tearDown(self):
+        sys.path.remove(self._tmp.name)
+
+        for name in list(sys.modules):
+            if name.startswith("profiler_test_"):
+                del sys.modules[name]
+
+        self._tmp.cleanup()
+
+    def _create_module(self, name, content=""):
+        """Create a Python module."""
+        with open(os.path.join(self._tmp.name, name + ".py"), "w") as f:
+            f.write(dedent(content))
+
+    def disabled_test(self):
+        """Test a disabled profiler."""
+        profiler = StartupProfiler()
+        self.assertFalse(profiler.enabled)
+
+        profiler.start_phase("Phase")
+        profiler.stop()
+
+        report = profiler.get_report()
+        self.assertEqual(report["phases"], [])
+        self.assertEqual(report["imports"], [])
+
+    def is_requested_test(self):
+        """Test the is_requested method."""
+        self.assertTrue(StartupProfiler.is_requested(["anaconda", "--startupprofile"]))
+
+        with patch("pyanaconda.core.startup.profiler.kernel_arguments") as kernel_arguments:
+            kernel_arguments.is_enabled.return_value = False
+            self.assertFalse(StartupProfiler.is_requested(["anaconda"]))
+
+            kernel_arguments.is_enabled.return_value = True
+            self.assertTrue(StartupProfiler.is_requested(["anaconda"]))
+            kernel_arguments.is_enabled.assert_called_with("inst.startupprofile")
+
+    def profile_test(self):
+        """Profile the phases and the imports."""
+        self._create_module("profiler_test_a", """
+        import profiler_test_b
+        """)
+        self._create_module("profiler_test_b")
+        self._create_module("profiler_test_c")
+
+        profiler = StartupProfiler()
+        profiler.start()
+        self.assertTrue(profiler.enabled)
+
+        profiler.start_phase("First")
+        import profiler_test_a  # pylint: disable=import-error,unused-import,unused-variable
+
+        profiler.start_phase("Second")
+        import profiler_test_c  # pylint: disable=import-error,unused-import,unused-variable
+
+        profiler.stop()
+        self.assertFalse(profiler.enabled)
+
+        # Imports after the stop are not profiled.
+        self._create_module("profiler_test_d")
+        import profiler_test_d  # pylint: disable=import-error,unused-import,unused-variable
+
+        report = profiler.get_report()
+        self.assertGreaterEqual(report["total_time"], 0)
+
+        phases = report["phases"]
+        self.assertEqual([p["name"] for p in phases], ["First", "Second"])
+        self.assertEqual([p["imports"] for p in phases], [1, 1])
+
+        for phase in phases:
+            self.assertGreaterEqual(phase["duration"], phase["import_time"])
+
+        imports = {i["name"]: i for i in report["imports"]}
+        self.assertEqual(
+            set(imports.keys()),
+            {"profiler_test_a", "profiler_test_b", "profiler_test_c"}
+        )
+
+        self.assertEqual(imports["profiler_test_a"]["phase"], "First")
+        self.assertEqual(imports["profiler_test_b"]["phase"], "First")
+        self.assertEqual(imports["profiler_test_c"]["phase"], "Second")
+
+        a, b = imports["profiler_test_a"], imports["profiler_test_b"]
+        self.assertGreaterEqual(a["duration"], b["duration"])
+        self.assertAlmostEqual(a["self_duration"], a["duration"] - b["duration"])
+
+    def write_report_test(self):
+        """Write the report."""
+        profiler = StartupProfiler()
+        profiler.start()
+        profiler.start_phase("Phase")
+        profiler.stop()
+
+        path = os.path.join(self._tmp.name, "report.json")
+        profiler.write_report(path)
+
+        with open(path) as f:
+            report = json.load(f)
+
+        self.assertEqual(report["phases"][0]["name"], "Phase")
+
+        log = Mock()
+        profiler.log_report(log)
+        log.debug.assert_called()
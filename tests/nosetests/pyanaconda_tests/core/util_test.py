@@ -22,6 +22,7 @@ import tempfile
 import signal
 import shutil
 import sys
+import time
 
 from io import StringIO
 from textwrap import dedent
@@ -154,6 +155,86 @@ echo "error" >&2
         # check that the output is an empty string
         self.assertEqual(util.execWithCapture("/bin/sh", ["-c", "exit 0"]), "")
 
+    def exec_with_capture_no_newline_test(self):
+        """Test execWithCapture with no new line at the end of the output."""
+        self.assertEqual(util.execWithCapture("/bin/sh", ["-c", "printf out"]), "out\n")
+
+    def exec_with_capture_invalid_output_test(self):
+        """Test execWithCapture with an output that is not UTF-8."""
+        with self.assertRaises(UnicodeDecodeError):
+            util.execWithCapture("/bin/sh", ["-c", r"printf '\240\241\242'"])
+
+    def exec_with_redirect_stdout_test(self):
+        """Test execWithRedirect with stdout."""
+        stdout = StringIO()
+
+        rc = util.execWithRedirect("/bin/sh", ["-c", "echo out; echo err >&2; printf end"],
+                                   stdout=stdout)
+
+        self.assertEqual(rc, 0)
+        self.assertEqual(stdout.getvalue(), "out\nerr\nend\n")
+
+    def exec_with_redirect_line_callback_test(self):
+        """Test execWithRedirect with a line callback."""
+        lines = []
+
+        script = dedent("""
+        echo first
+        sleep 0.1
+        printf '  10%%\\r  50%%\\r 100%%\\n'
+        printf last
+        """)
+
+        rc = util.execWithRedirect("/bin/sh", ["-c", script], line_callback=lines.append)
+
+        self.assertEqual(rc, 0)
+        self.assertEqual(lines, ["first", "10%", "50%", "100%", "last"])
+
+    def run_program_streaming_test(self):
+        """Test that _run_program logs the output as it arrives."""
+        logged = []
+
+        def log_line(msg, *args):
+            logged.append((msg % args, time.monotonic()))
+
+        script = "echo first; sleep 0.5; echo second"
+
+        with patch("pyanaconda.core.util.program_log") as program_log:
+            program_log.info.side_effect = log_line
+            start = time.monotonic()
+            rc, output = util._run_program(["/bin/sh", "-c", script])
+
+        self.assertEqual(rc, 0)
+        self.assertEqual(output, "first\nsecond\n")
+        self.assertEqual([line for line, _ in logged[1:]], ["first", "second"])
+
+        # The first line was logged before the program finished.
+        self.assertLess(logged[1][1] - start, 0.4)
+
+    def run_program_no_capture_test(self):
+        """Test _run_program without capturing the output."""
+        rc, output = util._run_program(["echo", "out"], capture_output=False)
+        self.assertEqual(rc, 0)
+        self.assertEqual(output, "")
+
+        rc, output = util._run_program(["echo", "out"], binary_output=True, capture_output=False)
+        self.assertEqual(rc, 0)
+        self.assertEqual(output, b"")
+
+    def parse_rsync_progress_test(self):
+        """Test parse_rsync_progress."""
+        self.assertEqual(util.parse_rsync_progress(""), None)
+        self.assertEqual(util.parse_rsync_progress("sending incremental file list"), None)
+        self.assertEqual(util.parse_rsync_progress("0 0% 0.00kB/s 0:00:00"), (0, 0))
+        self.assertEqual(
+            util.parse_rsync_progress("1,238,099  13%  111.03MB/s    0:00:01 (xfr#1, to-chk=99/101)"),
+            (1238099, 13)
+        )
+        self.assertEqual(
+            util.parse_rsync_progress("  9,520,386,031 100%  215.30MB/s    0:00:42 (xfr#45, to-chk=0/51)"),
+            (9520386031, 100)
+        )
+
     def exec_readlines_test(self):
         """Test execReadlines."""
 
@@ -494,6 +575,30 @@ class MiscTests(unittest.TestCase):
         # remove the testing directory
         shutil.rmtree(ANACONDA_TEST_DIR)
 
+    def lazy_import_test(self):
+        """Test lazy_import."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "lazy_import_test_module.py"), "w") as f:
+                f.write("VALUE = 42\n")
+
+            sys.path.insert(0, tmp)
+
+            try:
+                module = util.lazy_import("lazy_import_test_module")
+                self.assertIs(sys.modules["lazy_import_test_module"], module)
+                self.assertIs(util.lazy_import("lazy_import_test_module"), module)
+
+                # The module is loaded on the first access.
+                self.assertEqual(module.VALUE, 42)
+            finally:
+                sys.path.remove(tmp)
+                sys.modules.pop("lazy_import_test_module", None)
+
+        self.assertIs(util.lazy_import("os.path"), os.path)
+
+        with self.assertRaises(ModuleNotFoundError):
+            util.lazy_import("lazy_import_missing_module")
+
     def mkdir_chain_test(self):
         """Test mkdirChain."""
 
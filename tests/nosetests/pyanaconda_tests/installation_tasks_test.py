@@ -19,7 +19,11 @@
 #
 
 import unittest
+import unittest.mock
 
+from threading import Event
+
+from pyanaconda.errors import ERROR_RAISE
 from pyanaconda.installation_tasks import Task
 from pyanaconda.installation_tasks import TaskQueue
 
@@ -369,3 +373,55 @@ class InstallTasksTestCase(unittest.TestCase):
         self.assertEqual(self._test_variable1, 3)
         self.assertEqual(self._test_variable2, 2)
         self.assertEqual(self._test_variable3, 1)
+
+    def parallel_task_queue_test(self):
+        """Check that a parallel task queue respects the requirements."""
+        order = []
+        barrier = Event()
+
+        def run(name, wait=False):
+            if wait:
+                # Wait for a task that is started later.
+                self.assertTrue(barrier.wait(timeout=10))
+            order.append(name)
+
+        queue = TaskQueue(name="queue", parallel=True)
+        queue.append(Task("first", run, ("first",)))
+        queue.append(Task("a", run, ("a", True), requires=(), provides=("a",)))
+        queue.append(Task("b", barrier.set, requires=(), provides=("b",)))
+        queue.append(Task("c", run, ("c",), requires=("a",)))
+        queue.append(Task("last", run, ("last",)))
+
+        task_completed = []
+        queue.task_completed.connect(lambda x: task_completed.append(x.name))
+
+        self.assertEqual(queue.task_count, 5)
+        queue.start()
+
+        self.assertEqual(order, ["first", "a", "c", "last"])
+        self.assertEqual(len(task_completed), 5)
+        self.assertEqual(task_completed[0], "first")
+        self.assertEqual(task_completed[-1], "last")
+        self.assertTrue(queue.done)
+        self.assertFalse(queue.running)
+        self.assertTrue(all(task.done for task in queue))
+
+    def parallel_task_queue_error_test(self):
+        """Check that a parallel task queue stops on errors."""
+        def fail():
+            raise ValueError("Fake error!")
+
+        called = []
+        queue = TaskQueue(name="queue", parallel=True)
+        queue.append(Task("a", called.append, ("a",), requires=()))
+        queue.append(TaskQueue(name="b", requires=()))
+        queue[1].append(Task("fail", fail))
+        queue.append(Task("c", called.append, ("c",)))
+
+        with unittest.mock.patch("pyanaconda.installation_tasks.errorHandler") as handler:
+            handler.cb.return_value = ERROR_RAISE
+
+            with self.assertRaises(ValueError):
+                queue.start()
+
+        self.assertEqual(called, ["a"])
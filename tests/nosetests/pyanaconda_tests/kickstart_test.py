@@ -0,0 +1,183 @@
+#
+# Copyright (C) 2020  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import tempfile
+import unittest
+from textwrap import dedent
+from unittest.mock import patch
+
+from pykickstart.errors import KickstartError
+
+from pyanaconda.kickstart import SplitKickstartCache, AnacondaKSHandler, AnacondaKSParser, \
+    get_handled_elements, read_kickstart_elements, preScriptPass, split_kickstart_cache
+
+
+class SplitKickstartTestCase(unittest.TestCase):
+    """Test the single-pass processing of the kickstart file."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._path = self._create_file("ks.cfg", """
+        network --device=eth0 --bootproto=dhcp
+        reboot
+        %packages
+        vim
+        %end
+        %post
+        echo "Hello!"
+        %end
+        """)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        split_kickstart_cache.clear()
+
+    def _create_file(self, name, content):
+        """Create a kickstart file."""
+        path = os.path.join(self._tmp.name, name)
+
+        with open(path, "w") as f:
+            f.write(dedent(content).lstrip())
+
+        return path
+
+    def _read_kickstart(self, path):
+        """Read the handled elements of the kickstart file."""
+        handler = AnacondaKSHandler()
+        parser = AnacondaKSParser(handler)
+        elements = SplitKickstartCache().get_elements(path)
+        read_kickstart_elements(parser, get_handled_elements(handler, elements), path)
+        return handler
+
+    def cache_test(self):
+        """Test the cache of the split kickstart files."""
+        cache = SplitKickstartCache()
+
+        elements = cache.get_elements(self._path)
+        self.assertIs(cache.get_elements(self._path), elements)
+
+        # The file has changed.
+        self._create_file("ks.cfg", "reboot\n")
+        elements = cache.get_elements(self._path)
+        self.assertEqual([e.name for e in elements.all_elements], ["reboot"])
+        self.assertIs(cache.get_elements(self._path), elements)
+
+        # The cache is empty.
+        cache.clear()
+        self.assertIsNot(cache.get_elements(self._path), elements)
+
+    def cache_include_test(self):
+        """Test the cache of the split kickstart files with includes."""
+        include = self._create_file("include.cfg", "reboot\n")
+        path = self._create_file("main.cfg", "%include {}\n".format(include))
+
+        cache = SplitKickstartCache()
+        elements = cache.get_elements(path)
+        self.assertEqual([e.filename for e in elements.all_elements], [include])
+        self.assertIs(cache.get_elements(path), elements)
+
+        # The included file has changed.
+        self._create_file("include.cfg", "reboot\nshutdown\n")
+        elements = cache.get_elements(path)
+        self.assertEqual([e.name for e in elements.all_elements], ["reboot", "shutdown"])
+
+    def handled_elements_test(self):
+        """Test the elements handled by the main process."""
+        handler = AnacondaKSHandler()
+        elements = SplitKickstartCache().get_elements(self._path)
+
+        handled = get_handled_elements(handler, elements)
+        self.assertEqual([e.name for e in handled], ["reboot", "post"])
+
+    def read_elements_test(self):
+        """Read the handled elements of the kickstart file."""
+        handler = self._read_kickstart(self._path)
+
+        self.assertTrue(handler.reboot.seen)
+        self.assertEqual(len(handler.scripts), 1)
+        self.assertEqual(handler.scripts[0].script, "echo \"Hello!\"\n")
+        self.assertEqual(handler.scripts[0].lineno, 6)
+
+    def read_elements_error_test(self):
+        """Read invalid elements of the kickstart file."""
+        path = self._create_file("ks.cfg", """
+        network --device=eth0 --bootproto=dhcp
+        network --device=eth1 --bootproto=dhcp
+        reboot --invalid
+        """)
+
+        with self.assertRaises(KickstartError) as cm:
+            self._read_kickstart(path)
+
+        self.assertEqual(cm.exception.lineno, 3)
+
+    def read_elements_include_error_test(self):
+        """Read invalid elements of the included file."""
+        include = self._create_file("include.cfg", """
+        network --device=eth0 --bootproto=dhcp
+        reboot --invalid
+        """)
+
+        path = self._create_file("main.cfg", """
+        %packages
+        %end
+        %include {}
+        """.format(include))
+
+        with self.assertRaises(KickstartError) as cm:
+            self._read_kickstart(path)
+
+        self.assertEqual(cm.exception.lineno, 2)
+
+    @patch("pyanaconda.kickstart.runPreScripts")
+    def pre_script_pass_test(self, run_scripts):
+        """Test the pass of the %pre scripts."""
+        path = self._create_file("ks.cfg", """
+        reboot
+        %pre
+        echo "Hello!"
+        %end
+        """)
+
+        preScriptPass(path)
+
+        run_scripts.assert_called_once()
+        scripts = run_scripts.call_args[0][0]
+        self.assertEqual(len(scripts), 1)
+        self.assertEqual(scripts[0].script, "echo \"Hello!\"\n")
+        self.assertEqual(scripts[0].lineno, 2)
+
+        # The split kickstart file is cached for the next pass.
+        elements = split_kickstart_cache.get_elements(path)
+        self.assertIs(split_kickstart_cache.get_elements(path), elements)
+
+    @patch("pyanaconda.kickstart.runPreScripts")
+    def pre_script_pass_missing_include_test(self, run_scripts):
+        """Test the pass of the %pre scripts with a missing include."""
+        path = self._create_file("ks.cfg", """
+        %include /nonexistent/include.cfg
+        %pre
+        echo "Hello!"
+        %end
+        """)
+
+        preScriptPass(path)
+
+        run_scripts.assert_called_once()
+        scripts = run_scripts.call_args[0][0]
+        self.assertEqual(len(scripts), 1)
@@ -17,13 +17,15 @@
 #
 # Red Hat Author(s): Radek Vykydal <rvykydal@redhat.com>
 #
+import threading
 import unittest
 from unittest.mock import Mock, patch
 from textwrap import dedent
 
 from pyanaconda.modules.network.nm_client import get_slaves_from_connections, \
     get_dracut_arguments_from_connection, get_config_file_connection_of_device, \
-    get_kickstart_network_data, NM_BRIDGE_DUMPED_SETTINGS_DEFAULTS
+    get_kickstart_network_data, NM_BRIDGE_DUMPED_SETTINGS_DEFAULTS, ConnectionBatch, \
+    ConnectionOperation
 from pyanaconda.core.kickstart.commands import NetworkData
 from pyanaconda.modules.network.constants import NM_CONNECTION_TYPE_WIFI, \
     NM_CONNECTION_TYPE_ETHERNET, NM_CONNECTION_TYPE_VLAN, NM_CONNECTION_TYPE_BOND, \
@@ -983,3 +985,149 @@ class NMClientTestCase(unittest.TestCase):
             if generated_ks:
                 generated_ks = dedent(str(generated_ks)).strip()
             self.assertEqual(generated_ks, expected_ks)
+
+
+class ConnectionBatchTestCase(unittest.TestCase):
+    """Test the batch of connection operations."""
+
+    def setUp(self):
+        patcher = patch("pyanaconda.modules.network.nm_client.NM")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_connection(self, uuid):
+        """Get a mock of a connection."""
+        connection = Mock()
+        connection.get_uuid.return_value = uuid
+        return connection
+
+    def _get_nm_client(self, operations, finish=None):
+        """Get a mock of the client that finishes the operations together.
+
+        The callbacks are called from a different thread in the reversed
+        order when all expected operations are submitted.
+        """
+        nm_client = Mock()
+        callbacks = []
+
+        def add_connection2(settings, flags, args, ignore_out_of_range, cancellable,
+                            callback, user_data):
+            callbacks.append((nm_client, callback, user_data))
+            finish_all()
+
+        def update2(connection, callback, user_data):
+            callbacks.append((connection, callback, user_data))
+            finish_all()
+
+        def finish_all():
+            if len(callbacks) != operations:
+                return
+
+            def run():
+                for source, callback, user_data in reversed(callbacks):
+                    callback(source, Mock(), user_data)
+
+            threading.Thread(target=run).start()
+
+        nm_client.add_connection2.side_effect = add_connection2
+        nm_client.add_connection2_finish.side_effect = finish or (
+            lambda result: (self._get_connection("added"), None)
+        )
+        nm_client.update2 = update2
+        return nm_client
+
+    def empty_batch_test(self):
+        """Run an empty batch."""
+        batch = ConnectionBatch(Mock())
+        self.assertEqual(batch.run(), [])
+
+    def add_connections_test(self):
+        """Add connections in a batch."""
+        nm_client = self._get_nm_client(operations=3)
+        batch = ConnectionBatch(nm_client, timeout=5)
+
+        con1 = self._get_connection("uuid1")
+        con2 = self._get_connection("uuid2")
+        con3 = self._get_connection("uuid3")
+
+        batch.add_connection(con1, "bond0", activate=True)
+        batch.add_connection(con2, "ens3", activate=False)
+        batch.add_connection(con3, None, activate=True)
+        self.assertEqual(len(batch.operations), 3)
+
+        operations = batch.run()
+        self.assertEqual(batch.operations, [])
+        self.assertEqual([op.connection for op in operations], [con1, con2, con3])
+
+        for operation in operations:
+            self.assertEqual(operation.kind, ConnectionOperation.ADD)
+            self.assertTrue(operation.succeeded)
+            self.assertIsNone(operation.error)
+            self.assertGreaterEqual(operation.duration, 0)
+
+        # The activations are started in the order of the submission.
+        self.assertEqual([op.activated for op in operations], [True, False, True])
+        self.assertEqual(nm_client.activate_connection_async.call_count, 2)
+
+        calls = nm_client.activate_connection_async.call_args_list
+        nm_client.get_device_by_iface.assert_called_once_with("bond0")
+        self.assertEqual(calls[0][0][1], nm_client.get_device_by_iface.return_value)
+        self.assertEqual(calls[1][0][1], None)
+
+    def update_connections_test(self):
+        """Update connections in a batch."""
+        con1 = self._get_connection("uuid1")
+        con2 = self._get_connection("uuid2")
+
+        nm_client = self._get_nm_client(operations=2)
+        con1.update2.side_effect = lambda *args: nm_client.update2(con1, *args[-2:])
+        con2.update2.side_effect = lambda *args: nm_client.update2(con2, *args[-2:])
+
+        batch = ConnectionBatch(nm_client, timeout=5)
+        batch.update_connection(con1, "ens3", activate=True)
+        batch.update_connection(con2, "ens4", activate=False)
+
+        operations = batch.run()
+        self.assertEqual([op.kind for op in operations], [ConnectionOperation.UPDATE] * 2)
+        self.assertEqual([op.result for op in operations], [con1, con2])
+        self.assertTrue(all(op.succeeded for op in operations))
+
+        con1.update2_finish.assert_called_once()
+        con2.update2_finish.assert_called_once()
+        nm_client.activate_connection_async.assert_called_once_with(
+            con1, nm_client.get_device_by_iface.return_value, None, None
+        )
+
+    def failed_operations_test(self):
+        """Run a batch with failed operations."""
+        results = {}
+
+        def finish(result):
+            if results.setdefault("failed", False):
+                return self._get_connection("added"), None
+
+            results["failed"] = True
+            raise Exception("Fake error!")
+
+        nm_client = self._get_nm_client(operations=2, finish=finish)
+        batch = ConnectionBatch(nm_client, timeout=5)
+        batch.add_connection(self._get_connection("uuid1"), "ens3", activate=True)
+        batch.add_connection(self._get_connection("uuid2"), "ens4", activate=True)
+
+        operations = batch.run()
+        self.assertEqual([op.succeeded for op in operations], [True, False])
+        self.assertEqual(operations[1].error, "Fake error!")
+        self.assertEqual([op.activated for op in operations], [True, False])
+
+    def timed_out_operations_test(self):
+        """Run a batch with timed out operations."""
+        # The client never finishes the operations.
+        nm_client = self._get_nm_client(operations=3)
+        batch = ConnectionBatch(nm_client, timeout=0.1)
+        batch.add_connection(self._get_connection("uuid1"), "ens3", activate=True)
+        batch.add_connection(self._get_connection("uuid2"), "ens4", activate=True)
+
+        operations = batch.run()
+        self.assertEqual([op.succeeded for op in operations], [False, False])
+        self.assertEqual([op.error for op in operations], ["timed out", "timed out"])
+        nm_client.activate_connection_async.assert_not_called()
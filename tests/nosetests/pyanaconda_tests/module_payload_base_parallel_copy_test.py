@@ -0,0 +1,117 @@
+#
+# Copyright (C) 2020  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import stat
+
+from tempfile import TemporaryDirectory
+from unittest.case import TestCase
+from unittest.mock import patch
+
+from pyanaconda.modules.payloads.base.installation import IMAGE_EXCLUDES
+from pyanaconda.modules.payloads.base.parallel_copy import ParallelCopy, ParallelCopyError
+
+
+class ParallelCopyTestCase(TestCase):
+    """Test the parallel copy of a directory tree."""
+
+    def _create_file(self, path, content="", mode=0o644):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+        os.chmod(path, mode)
+
+    def _create_tree(self, source):
+        self._create_file(source + "/etc/os-release", "NAME=Test\n")
+        self._create_file(source + "/etc/machine-id", "123\n")
+        self._create_file(source + "/usr/bin/tool", "#!/bin/sh\n", mode=0o755)
+        self._create_file(source + "/tmp/file", "temporary\n")
+        self._create_file(source + "/proc/cpuinfo", "cpu\n")
+        self._create_file(source + "/boot/initramfs-0-rescue.img", "rescue\n")
+        self._create_file(source + "/boot/vmlinuz", "kernel\n")
+        self._create_file(source + "/boot/loader/entries/0.conf", "entry\n")
+        self._create_file(source + "/var/loader", "not excluded\n")
+
+        os.link(source + "/usr/bin/tool", source + "/usr/bin/tool-link")
+        os.symlink("../etc/os-release", source + "/usr/os-release")
+        os.mkfifo(source + "/var/fifo")
+        os.utime(source + "/etc", (1000, 2000))
+
+    def copy_test(self):
+        """Test the parallel copy."""
+        with TemporaryDirectory() as source, TemporaryDirectory() as dest:
+            self._create_tree(source)
+
+            progress = []
+            ParallelCopy(
+                source,
+                dest,
+                excludes=IMAGE_EXCLUDES,
+                workers=4,
+                progress_callback=lambda *args: progress.append(args)
+            ).run()
+
+            with open(dest + "/etc/os-release") as f:
+                self.assertEqual(f.read(), "NAME=Test\n")
+
+            self.assertEqual(stat.S_IMODE(os.stat(dest + "/usr/bin/tool").st_mode), 0o755)
+            self.assertEqual(os.stat(dest + "/etc").st_mtime, 2000)
+
+            self.assertTrue(os.path.samefile(dest + "/usr/bin/tool",
+                                             dest + "/usr/bin/tool-link"))
+            self.assertEqual(os.readlink(dest + "/usr/os-release"), "../etc/os-release")
+            self.assertTrue(stat.S_ISFIFO(os.lstat(dest + "/var/fifo").st_mode))
+            self.assertTrue(os.path.exists(dest + "/var/loader"))
+            self.assertTrue(os.path.exists(dest + "/boot/vmlinuz"))
+
+            self.assertFalse(os.path.exists(dest + "/etc/machine-id"))
+            self.assertFalse(os.path.exists(dest + "/proc"))
+            self.assertFalse(os.path.exists(dest + "/boot/loader"))
+            self.assertFalse(os.path.exists(dest + "/boot/initramfs-0-rescue.img"))
+            self.assertFalse(os.path.exists(dest + "/tmp/file"))
+            self.assertTrue(os.path.isdir(dest + "/tmp"))
+
+            total = sum(os.path.getsize(os.path.join(source, p)) for p in [
+                "etc/os-release", "usr/bin/tool", "boot/vmlinuz", "var/loader"
+            ])
+            self.assertEqual(progress[-1], (total, total))
+
+    def copy_xattrs_test(self):
+        """Test the parallel copy of extended attributes."""
+        with TemporaryDirectory() as source, TemporaryDirectory() as dest:
+            self._create_file(source + "/file", "data")
+
+            try:
+                os.setxattr(source + "/file", "user.test", b"value")
+            except OSError:
+                self.skipTest("Extended attributes are not supported.")
+
+            ParallelCopy(source, dest).run()
+            self.assertEqual(os.getxattr(dest + "/file", "user.test"), b"value")
+
+    @patch("pyanaconda.modules.payloads.base.parallel_copy.shutil.copyfile")
+    def copy_failed_test(self, copyfile):
+        """Test the failed parallel copy."""
+        copyfile.side_effect = OSError(28, "No space left on device")
+
+        with TemporaryDirectory() as source, TemporaryDirectory() as dest:
+            self._create_file(source + "/file", "data")
+
+            with self.assertRaises(ParallelCopyError):
+                ParallelCopy(source, dest).run()
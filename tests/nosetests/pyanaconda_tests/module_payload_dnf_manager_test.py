@@ -16,7 +16,7 @@
 # Red Hat, Inc.
 #
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, PropertyMock
 
 from blivet.size import Size, ROUND_UP
 from dnf.exceptions import MarkingErrors
@@ -63,12 +63,24 @@ class DNFMangerTestCase(unittest.TestCase):
         """Test the clear_cache method."""
         self.dnf_manager.clear_cache()
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.shutil.rmtree")
+    def clear_cache_keep_metadata_test(self, rmtree):
+        """Test the clear_cache method with kept metadata."""
+        self.dnf_manager.clear_cache(keep_metadata=True)
+        rmtree.assert_called_once_with("/tmp/dnf.pluginconf", ignore_errors=True)
+
+        rmtree.reset_mock()
+        self.dnf_manager.clear_cache()
+        self.assertEqual(rmtree.call_count, 2)
+
     def set_default_configuration_test(self):
         """Test the default configuration of the DNF base."""
         self._check_configuration(
             "cachedir = /tmp/dnf.cache",
             "pluginconfpath = /tmp/dnf.pluginconf",
             "logdir = /tmp/",
+            "metadata_expire = 0",
+            "max_parallel_downloads = 10",
         )
         self._check_configuration(
             "installroot = /mnt/sysroot",
@@ -207,6 +219,35 @@ class DNFMangerTestCase(unittest.TestCase):
 
         self.assertEqual(size, Size("450 MiB"))
 
+    def get_cached_sizes_test(self):
+        """Test the caching of the transaction sizes."""
+        files = PropertyMock(return_value=["/file"] * 10)
+
+        tsi_1 = Mock()
+        tsi_1.pkg.installsize = 1024 * 100
+        tsi_1.pkg.downloadsize = 1024 * 1024 * 100
+        type(tsi_1.pkg).files = files
+
+        self.dnf_manager._base.transaction = [tsi_1]
+        self.assertEqual(self.dnf_manager.get_download_size(), Size("250 MiB"))
+
+        for _ in range(2):
+            size = self.dnf_manager.get_installation_size()
+            size = size.round_to_nearest("KiB", ROUND_UP)
+            self.assertEqual(size, Size("176 KiB"))
+
+        self.assertEqual(files.call_count, 1)
+
+        # A new transaction.
+        tsi_1.pkg.downloadsize = 1024 * 1024 * 200
+        self.dnf_manager._base.transaction = [tsi_1]
+        self.assertEqual(self.dnf_manager.get_download_size(), Size("350 MiB"))
+        self.assertEqual(files.call_count, 2)
+
+        # A reset base.
+        self.dnf_manager.reset_base()
+        self.assertIsNone(self.dnf_manager._transaction_sizes)
+
     def environments_test(self):
         """Test the environments property."""
         self.assertEqual(self.dnf_manager.environments, [])
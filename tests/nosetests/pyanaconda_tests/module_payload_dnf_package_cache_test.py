@@ -0,0 +1,113 @@
+#
+# Copyright (C) 2020  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+
+from tempfile import TemporaryDirectory
+from unittest.case import TestCase
+from unittest.mock import patch
+
+from pyanaconda.modules.payloads.payload.dnf.package_cache import PackageCache
+
+
+class PackageCacheTestCase(TestCase):
+    """Test the cache of downloaded packages."""
+
+    def _create_file(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _read_file(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def get_path_test(self):
+        """Test the paths of cached packages."""
+        cache = PackageCache("/cache", 0)
+        self.assertEqual(
+            cache.get_path("sha256", "abcdef"),
+            "/cache/sha256/ab/abcdef.rpm"
+        )
+
+    def store_and_restore_test(self):
+        """Test storing and restoring of packages."""
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as download_dir:
+            cache = PackageCache(cache_dir, 1024)
+            path = os.path.join(download_dir, "a.rpm")
+            self._create_file(path, "package a")
+
+            self.assertFalse(cache.restore("sha256", "aaaa", path))
+            self.assertTrue(cache.store(path, "sha256", "aaaa"))
+            self.assertEqual(self._read_file(cache.get_path("sha256", "aaaa")), "package a")
+
+            os.unlink(path)
+            dest = os.path.join(download_dir, "packages", "a.rpm")
+            self.assertTrue(cache.restore("sha256", "aaaa", dest))
+            self.assertEqual(self._read_file(dest), "package a")
+
+            # Store the same package again.
+            self.assertTrue(cache.store(dest, "sha256", "aaaa"))
+            self.assertFalse(os.path.exists(cache.get_path("sha256", "aaaa") + ".part"))
+
+    def restore_copy_test(self):
+        """Test restoring of packages from other file systems."""
+        with TemporaryDirectory() as cache_dir, TemporaryDirectory() as download_dir:
+            cache = PackageCache(cache_dir, 1024)
+            self._create_file(cache.get_path("sha256", "aaaa"), "package a")
+            dest = os.path.join(download_dir, "a.rpm")
+
+            with patch("os.link", side_effect=OSError("Invalid cross-device link")):
+                self.assertTrue(cache.restore("sha256", "aaaa", dest))
+
+            self.assertEqual(self._read_file(dest), "package a")
+            self.assertFalse(os.path.samefile(dest, cache.get_path("sha256", "aaaa")))
+
+    def store_failed_test(self):
+        """Test a failed storing of a package."""
+        with TemporaryDirectory() as cache_dir:
+            cache = PackageCache(cache_dir, 1024)
+            self.assertFalse(cache.store("/nonexistent.rpm", "sha256", "aaaa"))
+            self.assertFalse(os.path.exists(cache.get_path("sha256", "aaaa")))
+            self.assertFalse(os.path.exists(cache.get_path("sha256", "aaaa") + ".part"))
+
+    def evict_test(self):
+        """Test the eviction of the least recently used packages."""
+        with TemporaryDirectory() as cache_dir:
+            cache = PackageCache(cache_dir, 20)
+
+            for i, checksum in enumerate(["aaaa", "bbbb", "cccc"]):
+                path = cache.get_path("sha256", checksum)
+                self._create_file(path, "0123456789")
+                os.utime(path, (1000 + i, 1000 + i))
+
+            self.assertEqual(cache.evict(), 1)
+            self.assertFalse(os.path.exists(cache.get_path("sha256", "aaaa")))
+            self.assertTrue(os.path.exists(cache.get_path("sha256", "bbbb")))
+            self.assertTrue(os.path.exists(cache.get_path("sha256", "cccc")))
+
+            # Use the oldest package, so it becomes the newest one.
+            cache.restore("sha256", "bbbb", os.path.join(cache_dir, "tmp", "b.rpm"))
+            os.unlink(os.path.join(cache_dir, "tmp", "b.rpm"))
+            self._create_file(cache.get_path("sha256", "dddd"), "0123456789")
+            os.utime(cache.get_path("sha256", "dddd"), (1000, 1000))
+
+            self.assertEqual(cache.evict(), 1)
+            self.assertFalse(os.path.exists(cache.get_path("sha256", "dddd")))
+            self.assertTrue(os.path.exists(cache.get_path("sha256", "bbbb")))
+            self.assertTrue(os.path.exists(cache.get_path("sha256", "cccc")))
@@ -17,7 +17,15 @@
 #
 # Red Hat Author(s): Jiri Konecny <jkonecny@redhat.com>
 #
+import hashlib
+import io
+import os
+import tarfile
+import tempfile
 import unittest
+from unittest.mock import Mock
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
 
 from tests.nosetests.pyanaconda_tests import patch_dbus_publish_object
 from tests.nosetests.pyanaconda_tests.module_payload_shared import PayloadKickstartSharedTest, \
@@ -29,6 +37,12 @@ from pyanaconda.modules.payloads.payloads_interface import PayloadsInterface
 from pyanaconda.modules.payloads.payload.live_image.live_image import LiveImageModule
 from pyanaconda.modules.payloads.payload.live_image.live_image_interface import \
     LiveImageInterface
+from pyanaconda.modules.payloads.payload.live_image.initialization import \
+    SetupInstallationSourceImageTask
+from pyanaconda.modules.payloads.payload.live_image.installation import \
+    InstallFromTarStreamTask
+from pyanaconda.modules.payloads.payload.live_image.utils import get_tar_compression_option
+from pyanaconda.modules.common.errors.payload import SourceSetupError, InstallError
 from pyanaconda.modules.payloads.source.factory import SourceFactory
 
 
@@ -165,3 +179,182 @@ class LiveImageInterfaceTestCase(unittest.TestCase):
         #     self.assertIsInstance(obj, TaskInterface)
         #     self.assertIsInstance(obj.implementation, task_classes[i])
         self.assertEqual(self.live_image_interface.PostInstallWithTasks(), [])
+
+
+class SetupInstallationSourceImageTaskTestCase(unittest.TestCase):
+    """Test the download of the installation image."""
+
+    DATA = b"x" * 3000 + b"y" * 3000
+
+    def _create_response(self, data, status_code=200, length=True, fail_after=None):
+        response = Mock()
+        response.status_code = status_code
+        response.headers = {"content-length": str(len(data))} if length else {}
+
+        def iter_content(chunk_size):
+            for i in range(0, len(data), 1000):
+                if fail_after is not None and i >= fail_after:
+                    raise RequestsConnectionError("Connection reset")
+                yield data[i:i + 1000]
+
+        response.iter_content = iter_content
+        return response
+
+    def _run_download(self, session, checksum=None):
+        with tempfile.TemporaryDirectory() as d:
+            image_path = os.path.join(d, "image.img")
+            task = SetupInstallationSourceImageTask(
+                url="http://my/image.tar",
+                proxy="",
+                checksum=checksum,
+                noverifyssl=False,
+                image_path=image_path,
+                image_mount_point=os.path.join(d, "mnt"),
+                session=session
+            )
+            task.run()
+
+            with open(image_path, "rb") as f:
+                return f.read()
+
+    def download_test(self):
+        """Test the image download with a checksum."""
+        session = Mock()
+        session.get.return_value = self._create_response(self.DATA)
+        checksum = hashlib.sha256(self.DATA).hexdigest()
+
+        self.assertEqual(self._run_download(session, checksum.upper()), self.DATA)
+        self.assertEqual(session.get.call_count, 1)
+
+    def download_wrong_checksum_test(self):
+        """Test the image download with a wrong checksum."""
+        session = Mock()
+        session.get.return_value = self._create_response(self.DATA)
+
+        with self.assertRaises(SourceSetupError):
+            self._run_download(session, "invalid")
+
+    def download_without_length_test(self):
+        """Test the image download without the content-length header."""
+        session = Mock()
+        session.get.return_value = self._create_response(self.DATA, length=False)
+        checksum = hashlib.sha256(self.DATA).hexdigest()
+
+        self.assertEqual(self._run_download(session, checksum), self.DATA)
+
+    def download_resume_test(self):
+        """Test the resumed image download."""
+        session = Mock()
+        session.get.side_effect = [
+            self._create_response(self.DATA, fail_after=2000),
+            self._create_response(self.DATA[2000:], status_code=206),
+        ]
+        checksum = hashlib.sha256(self.DATA).hexdigest()
+
+        self.assertEqual(self._run_download(session, checksum), self.DATA)
+        self.assertEqual(session.get.call_count, 2)
+        self.assertEqual(session.get.call_args_list[1][1]["headers"], {"Range": "bytes=2000-"})
+
+    def download_resume_unsupported_test(self):
+        """Test the resumed image download without the range support."""
+        session = Mock()
+        session.get.side_effect = [
+            self._create_response(self.DATA, fail_after=2000),
+            self._create_response(self.DATA, status_code=200),
+        ]
+        checksum = hashlib.sha256(self.DATA).hexdigest()
+
+        self.assertEqual(self._run_download(session, checksum), self.DATA)
+        self.assertEqual(session.get.call_count, 2)
+
+    def download_failed_test(self):
+        """Test the failed image download."""
+        session = Mock()
+        session.get.side_effect = RequestsConnectionError("No route to host")
+
+        with self.assertRaises(SourceSetupError):
+            self._run_download(session)
+
+        self.assertEqual(session.get.call_count, 4)
+
+
+class InstallFromTarStreamTaskTestCase(unittest.TestCase):
+    """Test the installation from a streamed tarball."""
+
+    def _create_tarball(self):
+        data = io.BytesIO()
+
+        with tarfile.open(fileobj=data, mode="w:gz") as archive:
+            for name, content in [("etc/os-release", b"NAME=Test\n"),
+                                  ("etc/machine-id", b"123\n"),
+                                  ("proc/cpuinfo", b"cpu\n")]:
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+
+        return data.getvalue()
+
+    def _create_session(self, data):
+        response = Mock()
+        response.headers = {"content-length": str(len(data))}
+        response.iter_content = lambda size: (data[i:i + size] for i in range(0, len(data), size))
+
+        session = Mock()
+        session.get.return_value = response
+        return session
+
+    def _run_task(self, dest_path, data, checksum=None):
+        task = InstallFromTarStreamTask(
+            url="http://my/image.tar.gz",
+            proxy="",
+            checksum=checksum,
+            noverifyssl=False,
+            dest_path=dest_path,
+            session=self._create_session(data)
+        )
+        task.run()
+
+    def compression_option_test(self):
+        """Test the get_tar_compression_option function."""
+        self.assertEqual(get_tar_compression_option("http://my/image.tar"), None)
+        self.assertEqual(get_tar_compression_option("http://my/image.tgz"), "--gzip")
+        self.assertEqual(get_tar_compression_option("http://my/image.tar.gz"), "--gzip")
+        self.assertEqual(get_tar_compression_option("http://my/image.tbz"), "--bzip2")
+        self.assertEqual(get_tar_compression_option("http://my/image.tar.bz2"), "--bzip2")
+        self.assertEqual(get_tar_compression_option("http://my/image.txz"), "--xz")
+        self.assertEqual(get_tar_compression_option("http://my/image.tar.xz"), "--xz")
+
+    def install_test(self):
+        """Test the installation from a streamed tarball."""
+        data = self._create_tarball()
+
+        with tempfile.TemporaryDirectory() as d:
+            self._run_task(d, data, hashlib.sha256(data).hexdigest())
+
+            with open(os.path.join(d, "etc/os-release")) as f:
+                self.assertEqual(f.read(), "NAME=Test\n")
+
+            self.assertFalse(os.path.exists(os.path.join(d, "etc/machine-id")))
+            self.assertFalse(os.path.exists(os.path.join(d, "proc/cpuinfo")))
+
+    def install_wrong_checksum_test(self):
+        """Test the installation from a streamed tarball with a wrong checksum."""
+        data = self._create_tarball()
+
+        with tempfile.TemporaryDirectory() as d:
+            os.mkdir(os.path.join(d, "etc"))
+            open(os.path.join(d, "etc/hostname"), "w").close()
+
+            with self.assertRaises(InstallError):
+                self._run_task(d, data, "invalid")
+
+            # The extracted files are removed, the existing files are kept.
+            self.assertFalse(os.path.exists(os.path.join(d, "etc/os-release")))
+            self.assertEqual(os.listdir(d), ["etc"])
+            self.assertEqual(os.listdir(os.path.join(d, "etc")), ["hostname"])
+
+    def install_invalid_tarball_test(self):
+        """Test the installation from an invalid streamed tarball."""
+        with tempfile.TemporaryDirectory() as d:
+            with self.assertRaises(InstallError):
+                self._run_task(d, b"x" * 1024 * 1024 * 3)
@@ -20,7 +20,7 @@
 import os
 import unittest
 
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, ANY
 from tempfile import TemporaryDirectory
 
 from pyanaconda.core.constants import INSTALL_TREE
@@ -85,13 +85,16 @@ class LiveTasksTestCase(unittest.TestCase):
 
         InstallFromImageTask(dest_path, source).run()
 
-        expected_rsync_args = ["-pogAXtlHrDx", "--exclude", "/dev/", "--exclude", "/proc/",
+        expected_rsync_args = ["-pogAXtlHrDx", "--info=progress2",
+                               "--exclude", "/dev/", "--exclude", "/proc/",
                                "--exclude", "/tmp/*", "--exclude", "/sys/", "--exclude", "/run/",
                                "--exclude", "/boot/*rescue*", "--exclude", "/boot/loader/",
                                "--exclude", "/boot/efi/loader/",
                                "--exclude", "/etc/machine-id", INSTALL_TREE + "/", dest_path]
 
-        exec_with_redirect.assert_called_once_with("rsync", expected_rsync_args)
+        exec_with_redirect.assert_called_once_with(
+            "rsync", expected_rsync_args, line_callback=ANY
+        )
 
     @patch("pyanaconda.modules.payloads.base.installation.execWithRedirect")
     def install_image_task_source_unready_test(self, exec_with_redirect):
@@ -102,13 +105,16 @@ class LiveTasksTestCase(unittest.TestCase):
 
         InstallFromImageTask(dest_path, source).run()
 
-        expected_rsync_args = ["-pogAXtlHrDx", "--exclude", "/dev/", "--exclude", "/proc/",
+        expected_rsync_args = ["-pogAXtlHrDx", "--info=progress2",
+                               "--exclude", "/dev/", "--exclude", "/proc/",
                                "--exclude", "/tmp/*", "--exclude", "/sys/", "--exclude", "/run/",
                                "--exclude", "/boot/*rescue*", "--exclude", "/boot/loader/",
                                "--exclude", "/boot/efi/loader/",
                                "--exclude", "/etc/machine-id", INSTALL_TREE + "/", dest_path]
 
-        exec_with_redirect.assert_called_once_with("rsync", expected_rsync_args)
+        exec_with_redirect.assert_called_once_with(
+            "rsync", expected_rsync_args, line_callback=ANY
+        )
 
     @patch("pyanaconda.modules.payloads.base.installation.execWithRedirect")
     def install_image_task_failed_exception_test(self, exec_with_redirect):
@@ -123,13 +129,16 @@ class LiveTasksTestCase(unittest.TestCase):
 
             self.assertTrue(any(map(lambda x: "mock exception" in x, cm.output)))
 
-        expected_rsync_args = ["-pogAXtlHrDx", "--exclude", "/dev/", "--exclude", "/proc/",
+        expected_rsync_args = ["-pogAXtlHrDx", "--info=progress2",
+                               "--exclude", "/dev/", "--exclude", "/proc/",
                                "--exclude", "/tmp/*", "--exclude", "/sys/", "--exclude", "/run/",
                                "--exclude", "/boot/*rescue*", "--exclude", "/boot/loader/",
                                "--exclude", "/boot/efi/loader/",
                                "--exclude", "/etc/machine-id", INSTALL_TREE + "/", dest_path]
 
-        exec_with_redirect.assert_called_once_with("rsync", expected_rsync_args)
+        exec_with_redirect.assert_called_once_with(
+            "rsync", expected_rsync_args, line_callback=ANY
+        )
 
     @patch("pyanaconda.modules.payloads.base.installation.execWithRedirect")
     def install_image_task_failed_return_code_test(self, exec_with_redirect):
@@ -144,10 +153,13 @@ class LiveTasksTestCase(unittest.TestCase):
 
             self.assertTrue(any(map(lambda x: "exited with code 11" in x, cm.output)))
 
-        expected_rsync_args = ["-pogAXtlHrDx", "--exclude", "/dev/", "--exclude", "/proc/",
+        expected_rsync_args = ["-pogAXtlHrDx", "--info=progress2",
+                               "--exclude", "/dev/", "--exclude", "/proc/",
                                "--exclude", "/tmp/*", "--exclude", "/sys/", "--exclude", "/run/",
                                "--exclude", "/boot/*rescue*", "--exclude", "/boot/loader/",
                                "--exclude", "/boot/efi/loader/",
                                "--exclude", "/etc/machine-id", INSTALL_TREE + "/", dest_path]
 
-        exec_with_redirect.assert_called_once_with("rsync", expected_rsync_args)
+        exec_with_redirect.assert_called_once_with(
+            "rsync", expected_rsync_args, line_callback=ANY
+        )
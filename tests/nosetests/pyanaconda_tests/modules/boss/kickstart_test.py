@@ -16,6 +16,7 @@
 # Red Hat, Inc.
 #
 
+import threading
 import unittest
 import os
 from contextlib import contextmanager
@@ -264,6 +265,57 @@ class KickstartManagerTestCase(unittest.TestCase):
 
         self.assertEqual(manager.generate_kickstart(), self._m123_kickstart)
 
+    def specification_cache_test(self):
+        """Read the kickstart specifications of modules only once."""
+        manager = KickstartManager()
+        module1 = TestModule(commands=["network"])
+        observers = [self._get_module_observer("1", module1)]
+        manager.on_module_observers_changed(observers)
+
+        ks_content = "network --device=ens3\n"
+
+        with self._create_ks_files([("ks.mgr.test.cache.cfg", ks_content)]) as filename:
+            manager.read_kickstart_file(filename)
+            manager.read_kickstart_file(filename)
+            self.assertEqual(module1.specification_reads, 1)
+
+            # The cache is dropped if the modules change.
+            manager.on_module_observers_changed(observers)
+            manager.read_kickstart_file(filename)
+            self.assertEqual(module1.specification_reads, 2)
+
+        self.assertEqual(module1.kickstart, "network --device=ens3\n")
+
+    def concurrent_calls_test(self):
+        """Call the modules concurrently."""
+        # The modules wait for each other, so the calls have to be concurrent.
+        barrier = threading.Barrier(2, timeout=5)
+        module1 = TestModule(commands=["network"], barrier=barrier)
+        module2 = TestModule(commands=["firewall"], barrier=barrier)
+
+        manager = KickstartManager()
+        manager.on_module_observers_changed([
+            self._get_module_observer("2", module2),
+            self._get_module_observer("1", module1),
+        ])
+
+        ks_content = "firewall --enabled\nnetwork --device=PARSE_ERROR\n"
+
+        with self._create_ks_files([("ks.mgr.test.concurrent.cfg", ks_content)]) as filename:
+            report = manager.read_kickstart_file(filename)
+
+        self.assertEqual(module1.kickstart, "network --device=PARSE_ERROR\n")
+        self.assertEqual(module2.kickstart, "firewall --enabled\n")
+
+        self.assertEqual(len(report.get_messages()), 1)
+        self.assertEqual(report.get_messages()[0].module_name, "1")
+        self.assertEqual(report.get_messages()[0].line_number, 2)
+
+        self.assertEqual(
+            manager.generate_kickstart(),
+            "network --device=PARSE_ERROR\n\nfirewall --enabled"
+        )
+
     def nothing_to_parse_test(self):
         ks_content = ""
         manager = KickstartManager()
@@ -345,11 +397,13 @@ network --device=ens3
 
 class TestModule(object):
 
-    def __init__(self, commands=None, sections=None, addons=None):
+    def __init__(self, commands=None, sections=None, addons=None, barrier=None):
         self.kickstart_commands = commands or []
         self.kickstart_sections = sections or []
         self.kickstart_addons = addons or []
         self.kickstart = ""
+        self.specification_reads = 0
+        self.barrier = barrier
 
     @property
     def KickstartSections(self):
@@ -361,6 +415,7 @@ class TestModule(object):
 
     @property
     def KickstartCommands(self):
+        self.specification_reads += 1
         return self.kickstart_commands
 
     def ReadKickstart(self, kickstart):
@@ -368,6 +423,9 @@ class TestModule(object):
 
         Returns parse error if PARSE_ERROR string is found in kickstart.
         """
+        if self.barrier:
+            self.barrier.wait()
+
         self.kickstart = kickstart
         report = KickstartReport()
 
@@ -382,4 +440,7 @@ class TestModule(object):
 
     def GenerateKickstart(self):
         """Mock generating a kickstart."""
+        if self.barrier:
+            self.barrier.wait()
+
         return self.kickstart
@@ -87,7 +87,11 @@ class ModuleManagerTestCase(unittest.TestCase):
         ]
 
         task = StartModulesTask(self._message_bus, service_names, addons_enabled=False)
-        self._check_started_modules(task, service_names)
+        observers = self._check_started_modules(task, service_names)
+
+        for observer in observers:
+            self.assertIsNotNone(observer.startup_time)
+            self.assertGreaterEqual(observer.startup_time, 0)
 
     @patch("dasbus.client.observer.Gio")
     def start_addons_test(self, gio):
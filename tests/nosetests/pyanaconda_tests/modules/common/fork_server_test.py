@@ -0,0 +1,155 @@
+#
+# Copyright (C) 2020  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from textwrap import dedent
+from unittest.mock import patch
+
+from pyanaconda.modules.common.fork_server import ForkServer, start_module
+
+
+class ForkServerTestCase(unittest.TestCase):
+    """Test the fork server of the DBus modules."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._socket_path = os.path.join(self._tmp.name, "fork-server.socket")
+        self._server = None
+
+    def tearDown(self):
+        if self._server:
+            self._server.terminate()
+            self._server.wait()
+
+        self._tmp.cleanup()
+
+    def _start_server(self):
+        """Start the fork server and wait for its socket."""
+        self._server = subprocess.Popen([
+            sys.executable, "-m", "pyanaconda.modules.common.fork_server",
+            "--serve", "--socket", self._socket_path
+        ])
+
+        for _i in range(100):
+            if os.path.exists(self._socket_path):
+                return
+
+            time.sleep(0.1)
+
+        self.fail("The fork server hasn't started.")
+
+    def _create_module(self, name, content):
+        """Create a Python module."""
+        with open(os.path.join(self._tmp.name, name + ".py"), "w") as f:
+            f.write(dedent(content))
+
+    def _get_environment(self, **variables):
+        """Get an environment that can import the created modules."""
+        environment = dict(os.environ)
+        environment.update(variables)
+
+        paths = [self._tmp.name, environment.get("PYTHONPATH", "")]
+        environment["PYTHONPATH"] = os.pathsep.join(filter(None, paths))
+        return environment
+
+    def _start_module(self, name, **kwargs):
+        """Start a module and return its exit status and output."""
+        output_path = os.path.join(self._tmp.name, name + ".out")
+
+        with open(os.devnull, "rb") as stdin, open(output_path, "wb") as stdout:
+            status = start_module(
+                name,
+                socket_path=self._socket_path,
+                fds=[stdin.fileno(), stdout.fileno(), stdout.fileno()],
+                **kwargs
+            )
+
+        with open(output_path) as f:
+            return status, f.read()
+
+    def start_module_test(self):
+        """Start a module with the fork server."""
+        self._start_server()
+        self._create_module("fork_test_module", """
+        import os
+        import sys
+        print(__name__, os.environ["FORK_TEST"], os.getpid() != os.getppid())
+        sys.exit(3)
+        """)
+
+        status, output = self._start_module(
+            "fork_test_module",
+            environment=self._get_environment(FORK_TEST="value")
+        )
+
+        self.assertEqual(status, 3)
+        self.assertEqual(output, "__main__ value True\n")
+
+    def start_module_timeout_test(self):
+        """Start a module that doesn't terminate in time."""
+        self._start_server()
+        self._create_module("fork_test_module", """
+        import time
+        time.sleep(5)
+        """)
+
+        status, _output = self._start_module(
+            "fork_test_module",
+            environment=self._get_environment(),
+            timeout=0.5
+        )
+
+        self.assertEqual(status, 0)
+
+    def start_module_incompatible_test(self):
+        """Start a module with an incompatible environment."""
+        self._start_server()
+        self._create_module("fork_test_module", """
+        print("Hello!")
+        """)
+
+        status, output = self._start_module(
+            "fork_test_module",
+            environment=self._get_environment(LD_PRELOAD="libfake.so")
+        )
+
+        self.assertEqual(status, None)
+        self.assertEqual(output, "")
+
+    def start_module_unavailable_test(self):
+        """Start a module without the fork server."""
+        status, output = self._start_module("fork_test_module")
+
+        self.assertEqual(status, None)
+        self.assertEqual(output, "")
+
+    @patch.dict(os.environ, {"LD_PRELOAD": "libgomp.so.1", "PYTHONPATH": "/a"}, clear=True)
+    def is_compatible_test(self):
+        """Test the compatibility of the environment."""
+        server = ForkServer(self._socket_path, preloaded_modules=[])
+
+        self.assertTrue(server._is_compatible({"LD_PRELOAD": "libgomp.so.1"}))
+        self.assertTrue(server._is_compatible({"LD_PRELOAD": "libgomp.so.1", "PYTHONPATH": "/b"}))
+        self.assertTrue(server._is_compatible({"LD_PRELOAD": "libgomp.so.1", "LANG": "C"}))
+        self.assertFalse(server._is_compatible({}))
+        self.assertFalse(server._is_compatible({"LD_PRELOAD": "libfake.so"}))
+        self.assertFalse(server._is_compatible({"LD_PRELOAD": "libgomp.so.1", "PYTHONHOME": "/"}))
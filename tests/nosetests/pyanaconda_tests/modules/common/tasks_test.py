@@ -16,10 +16,12 @@
 # Red Hat, Inc.
 #
 import unittest
-from time import sleep
-from unittest.mock import Mock, call
+from threading import Timer
+from time import sleep, monotonic
+from unittest.mock import Mock, PropertyMock, call, patch
 
 from dasbus.server.interface import dbus_class
+from dasbus.signal import Signal
 from dasbus.typing import *  # pylint: disable=wildcard-import
 from pyanaconda.modules.common.errors.task import NoResultError
 from pyanaconda.modules.common.task import Task, TaskInterface, sync_run_task, \
@@ -544,3 +546,68 @@ class TaskInterfaceTestCase(unittest.TestCase):
         # The result is publishable, but there is no result.
         with self.assertRaises(NoResultError):
             self.task_interface.GetResult()
+
+
+class SyncRunTaskTestCase(unittest.TestCase):
+    """Test the synchronous run of remote tasks."""
+
+    def setUp(self):
+        self.task_proxy = Mock()
+        self.task_proxy.Name = "Task"
+        self.task_proxy.Stopped = Signal()
+        self.task_proxy.ProgressChanged = Signal()
+
+    def _emit_stopped(self):
+        self.task_proxy.ProgressChanged.emit(1, "Step")
+        self.task_proxy.Stopped.emit()
+
+    def stopped_signal_test(self):
+        """Wait for the Stopped signal."""
+        self.task_proxy.Start.side_effect = self._emit_stopped
+        callback = Mock()
+
+        sync_run_task(self.task_proxy, callback=callback)
+
+        self.task_proxy.Finish.assert_called_once_with()
+        callback.assert_called_once_with(self.task_proxy)
+
+        # The signals are disconnected.
+        self.assertEqual(self.task_proxy.Stopped._callbacks, [])
+        self.assertEqual(self.task_proxy.ProgressChanged._callbacks, [])
+
+    def stopped_signal_thread_test(self):
+        """Wait for the Stopped signal emitted by another thread."""
+        is_running = PropertyMock(return_value=True)
+        type(self.task_proxy).IsRunning = is_running
+
+        timer = Timer(0.05, self.task_proxy.Stopped.emit)
+        self.task_proxy.Start.side_effect = timer.start
+
+        start_time = monotonic()
+        sync_run_task(self.task_proxy)
+
+        self.assertLess(monotonic() - start_time, 1)
+        self.task_proxy.Finish.assert_called_once_with()
+        is_running.assert_not_called()
+
+    @patch("pyanaconda.modules.common.task.TASK_STATE_CHECK_INTERVAL", 0.01)
+    def check_state_test(self):
+        """Check the state if the signals are not delivered."""
+        type(self.task_proxy).IsRunning = property(
+            lambda proxy: proxy.Start.call_count == 0 or proxy.Cancel.call_count < 2
+        )
+        self.task_proxy.Start.side_effect = self.task_proxy.Cancel
+        callback = Mock(side_effect=lambda proxy: proxy.Cancel())
+
+        sync_run_task(self.task_proxy, callback=callback)
+
+        self.task_proxy.Finish.assert_called_once_with()
+        self.assertEqual(callback.call_count, 1)
+
+    def timeout_test(self):
+        """Cancel the task after the timeout."""
+        with self.assertRaises(TimeoutError):
+            sync_run_task(self.task_proxy, timeout=0.01)
+
+        self.task_proxy.Cancel.assert_called_once_with()
+        self.task_proxy.Finish.assert_not_called()
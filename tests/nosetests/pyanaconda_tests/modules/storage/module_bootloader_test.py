@@ -502,13 +502,13 @@ class BootloaderTasksTestCase(unittest.TestCase):
                 mock.call(
                     "depmod", [
                         "-a", "4.17.7-200.fc28.x86_64"
-                    ], root=root
+                    ], root=root, stdout=mock.ANY, log_output=False
                 ),
                 mock.call(
                     "dracut", [
                         "-f", "/boot/initramfs-4.17.7-200.fc28.x86_64.img",
                         "4.17.7-200.fc28.x86_64"
-                    ], root=root)
+                    ], root=root, stdout=mock.ANY, log_output=False)
             ])
 
         exec_mock.reset_mock()
@@ -551,9 +551,64 @@ class BootloaderTasksTestCase(unittest.TestCase):
                     "-f", "/boot/initramfs-4.17.7-200.fc28.x86_64.img",
                     "4.17.7-200.fc28.x86_64"
                 ],
-                root=root
+                root=root,
+                stdout=mock.ANY,
+                log_output=False
+            )
+
+    @patch('pyanaconda.modules.storage.bootloader.utils.execWithRedirect')
+    @patch('pyanaconda.modules.storage.bootloader.utils.conf')
+    def recreate_initrds_in_parallel_test(self, conf_mock, exec_mock):
+        """Test the parallel recreation of initrds."""
+        versions = ["5.8.15-301.fc33.x86_64", "5.8.15-301.fc33.x86_64+debug"]
+        conf_mock.target.is_image = False
+
+        def run(command, argv, stdout, **kwargs):
+            stdout.write("{} {}\n".format(command, argv[-1]))
+            return 0
+
+        exec_mock.side_effect = run
+
+        with tempfile.TemporaryDirectory() as root:
+            task = RecreateInitrdsTask(
+                sysroot=root,
+                payload_type=PAYLOAD_TYPE_LIVE_IMAGE,
+                kernel_versions=versions
+            )
+
+            with self.assertLogs("program", level="INFO") as cm:
+                task.run()
+
+        self.assertEqual(exec_mock.call_count, 4)
+
+        for version in versions:
+            exec_mock.assert_any_call(
+                "dracut", ["-f", "/boot/initramfs-%s.img" % version, version],
+                root=root, stdout=mock.ANY, log_output=False
+            )
+
+            # The output of every kernel is logged at once.
+            index = cm.output.index(
+                "INFO:program:Output of the commands for {}:".format(version)
+            )
+            self.assertEqual(cm.output[index + 1:index + 3], [
+                "INFO:program:depmod {}".format(version),
+                "INFO:program:dracut {}".format(version),
+            ])
+
+        # The errors are propagated.
+        exec_mock.side_effect = OSError("Fake error!")
+
+        with tempfile.TemporaryDirectory() as root:
+            task = RecreateInitrdsTask(
+                sysroot=root,
+                payload_type=PAYLOAD_TYPE_LIVE_IMAGE,
+                kernel_versions=versions
             )
 
+            with self.assertRaises(OSError):
+                task.run()
+
     @patch('pyanaconda.modules.storage.bootloader.installation.conf')
     @patch('pyanaconda.modules.storage.bootloader.installation.InstallBootloaderTask')
     @patch('pyanaconda.modules.storage.bootloader.installation.ConfigureBootloaderTask')
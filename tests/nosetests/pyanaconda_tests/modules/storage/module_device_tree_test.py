@@ -17,28 +17,36 @@
 #
 # Red Hat Author(s): Vendula Poncova <vponcova@redhat.com>
 #
+import os
+import shutil
 import tempfile
+import threading
 import unittest
 from unittest.mock import patch, Mock, PropertyMock
 
 from tests.nosetests.pyanaconda_tests import patch_dbus_publish_object, check_task_creation
 
 from blivet.devices import StorageDevice, DiskDevice, DASDDevice, ZFCPDiskDevice, PartitionDevice, \
-    LUKSDevice, iScsiDiskDevice, NVDIMMNamespaceDevice, FcoeDiskDevice, OpticalDevice
+    LUKSDevice, iScsiDiskDevice, NVDIMMNamespaceDevice, FcoeDiskDevice, OpticalDevice, \
+    LVMVolumeGroupDevice, LVMLogicalVolumeDevice
 from blivet.errors import StorageError, FSError
 from blivet.formats import get_format
 from blivet.formats.fs import FS, Iso9660FS
 from blivet.formats.luks import LUKS
 from blivet.size import Size
+from blivet.threads import SynchronizedMeta, blivet_lock
 
 from dasbus.typing import *  # pylint: disable=wildcard-import
 from pyanaconda.modules.common.errors.storage import UnknownDeviceError, MountFilesystemError
+from pyanaconda.modules.common.structures.storage import DeviceTreeData
 from pyanaconda.modules.storage.devicetree import DeviceTreeModule, create_storage
 from pyanaconda.modules.storage.devicetree.devicetree_interface import DeviceTreeInterface
 from pyanaconda.modules.storage.devicetree.populate import FindDevicesTask
 from pyanaconda.modules.storage.devicetree.rescue import FindExistingSystemsTask, \
     MountExistingSystemTask
-from pyanaconda.modules.storage.devicetree.root import Root
+from pyanaconda.modules.storage.devicetree.root import Root, _find_existing_installations, \
+    _read_system_files, _get_image_architecture, _get_release, find_existing_installations, \
+    DeviceProbe, InstallationData
 
 
 class DeviceTreeInterfaceTestCase(unittest.TestCase):
@@ -159,6 +167,93 @@ class DeviceTreeInterfaceTestCase(unittest.TestCase):
         with self.assertRaises(UnknownDeviceError):
             self.interface.GetDeviceData("dev1")
 
+    def get_device_tree_data_test(self):
+        """Test GetDeviceTreeData."""
+        dev1 = DiskDevice(
+            "dev1",
+            fmt=get_format("ext4", label="LABEL", mountpoint="/home"),
+            size=Size("10 GiB")
+        )
+        self._add_device(dev1)
+
+        dev2 = StorageDevice(
+            "dev2",
+            fmt=get_format("luks"),
+            size=Size("5 GiB")
+        )
+        self._add_device(dev2)
+
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData([], 0))
+        self.assertEqual(data.generation, 1)
+        self.assertEqual(data.removed_devices, [])
+        self.assertEqual([d.device.name for d in data.devices], ["dev1", "dev2"])
+
+        info = data.devices[0]
+        self.assertEqual(info.device.type, "disk")
+        self.assertEqual(info.device.size, Size("10 GiB").get_bytes())
+        self.assertEqual(info.format.type, "ext4")
+        self.assertEqual(info.format.attrs, {"label": "LABEL", "mount-point": "/home"})
+        self.assertEqual(info.free_space, 0)
+
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData(["dev2"], 0))
+        self.assertEqual([d.device.name for d in data.devices], ["dev2"])
+        self.assertEqual(data.devices[0].format.type, "luks")
+
+        with self.assertRaises(UnknownDeviceError):
+            self.interface.GetDeviceTreeData(["devX"], 0)
+
+    def get_device_tree_generation_test(self):
+        """Test GetDeviceTreeGeneration."""
+        self.assertEqual(self.interface.GetDeviceTreeGeneration(), 0)
+
+        dev1 = StorageDevice("dev1", fmt=get_format("ext4"), size=Size("10 GiB"))
+        self._add_device(dev1)
+        dev2 = StorageDevice("dev2", fmt=get_format("ext4"), size=Size("10 GiB"))
+        self._add_device(dev2)
+
+        self.assertEqual(self.interface.GetDeviceTreeGeneration(), 1)
+        self.assertEqual(self.interface.GetDeviceTreeGeneration(), 1)
+
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData([], 1))
+        self.assertEqual(data.generation, 1)
+        self.assertEqual(data.devices, [])
+
+        # Change a device.
+        dev1.format = get_format("xfs")
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData([], 1))
+        self.assertEqual(data.generation, 2)
+        self.assertEqual([d.device.name for d in data.devices], ["dev1"])
+        self.assertEqual(data.removed_devices, [])
+
+        # Remove a device.
+        self.storage.devicetree._remove_device(dev2)
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData([], 2))
+        self.assertEqual(data.generation, 3)
+        self.assertEqual(data.devices, [])
+        self.assertEqual(data.removed_devices, ["dev2"])
+
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData([], 0))
+        self.assertEqual([d.device.name for d in data.devices], ["dev1"])
+        self.assertEqual(data.removed_devices, ["dev2"])
+
+        # Change an attribute of a device.
+        dev1._serial = "SERIAL"
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData([], 3))
+        self.assertEqual(data.generation, 4)
+        self.assertEqual([d.device.name for d in data.devices], ["dev1"])
+        self.assertEqual(data.devices[0].device.attrs["serial"], "SERIAL")
+
+        # Change a requested device.
+        dev1.format = get_format("ext4")
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData(["dev1"], 4))
+        self.assertEqual(data.generation, 5)
+        self.assertEqual([d.device.name for d in data.devices], ["dev1"])
+        self.assertEqual(data.removed_devices, [])
+
+        data = DeviceTreeData.from_structure(self.interface.GetDeviceTreeData(["dev1"], 5))
+        self.assertEqual(data.generation, 5)
+        self.assertEqual(data.devices, [])
+
     def get_dasd_device_data_test(self):
         """Test GetDeviceData for DASD."""
         self._add_device(DASDDevice(
@@ -842,3 +937,383 @@ class DeviceTreeTasksTestCase(unittest.TestCase):
         task.run()
 
         storage.devicetree.populate.assert_called_once_with()
+
+
+class RescanDevicesTestCase(unittest.TestCase):
+    """Test the rescan of the changed devices."""
+
+    def setUp(self):
+        self.storage = create_storage()
+        self.storage._bootloader = Mock()
+        self.storage.dump_state = Mock()
+        self.storage.devicetree.teardown_all = Mock()
+        self.storage.devicetree.handle_device = Mock(side_effect=self._handle_device)
+
+        self.udev_devices = []
+        patcher = patch("pyanaconda.modules.storage.devicetree.model.udev")
+        self.udev = patcher.start()
+        self.udev.get_devices.side_effect = lambda: self.udev_devices
+        self.udev.device_get_name.side_effect = lambda info: info["name"]
+        self.addCleanup(patcher.stop)
+
+        # Only the reading of the file systems is simulated. The rest
+        # of the detection of existing installations runs for real.
+        patcher = patch("pyanaconda.modules.storage.devicetree.root._read_existing_installation")
+        self.read_installation = patcher.start()
+        self.read_installation.side_effect = self._read_installation
+        self.addCleanup(patcher.stop)
+
+        for name in ("setup", "teardown"):
+            patcher = patch.object(DiskDevice, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _add_device(self, device):
+        """Add a device to the device tree."""
+        self.storage.devicetree._add_device(device)
+        return device
+
+    def _add_disk(self, name, fmt):
+        """Add a disk to the device tree."""
+        return self._add_device(DiskDevice(
+            name,
+            fmt=get_format(fmt),
+            size=Size("10 GiB"),
+            exists=True
+        ))
+
+    def _handle_device(self, info):
+        """Add a scanned device to the device tree."""
+        self._add_device(DiskDevice(
+            info["name"],
+            fmt=get_format("ext4", exists=True),
+            size=Size("10 GiB"),
+            exists=True
+        ))
+
+    def _read_installation(self, probe):
+        """Read an installation from the device dev4."""
+        if probe.name != "dev4":
+            return False, None
+
+        return True, InstallationData(
+            files_root=tempfile.mkdtemp(),
+            arch="x86_64",
+            product="Fedora",
+            version="33",
+            fstab=[("/dev/dev4", "/", "ext4", "defaults")]
+        )
+
+    def _rescan_devices(self, device_names):
+        """Rescan the devices with the blivet lock held."""
+        result = []
+
+        def rescan():
+            with blivet_lock:
+                result.append(self.storage.rescan_devices(device_names))
+
+        thread = threading.Thread(target=rescan, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+
+        self.assertFalse(thread.is_alive(), "The rescan is blocked.")
+        return result[0]
+
+    def _set_udev_devices(self, *names):
+        """Set the devices known to udev."""
+        self.udev_devices = [{"name": name} for name in names]
+
+    def _get_names(self):
+        """Get names of the devices in the tree."""
+        return sorted(d.name for d in self.storage.devices)
+
+    def rescan_devices_test(self):
+        """Rescan the changed devices."""
+        dev1 = self._add_disk("dev1", "lvmpv")
+        dev2 = self._add_disk("dev2", "lvmpv")
+        dev3 = self._add_disk("dev3", "ext4")
+
+        vg = self._add_device(LVMVolumeGroupDevice(
+            "testvg",
+            parents=[dev1, dev2]
+        ))
+        self._add_device(LVMLogicalVolumeDevice(
+            "testlv",
+            size=Size("512 MiB"),
+            parents=[vg],
+            fmt=get_format("xfs"),
+            exists=False
+        ))
+
+        root = Root(mounts={"/": dev3})
+        self.storage.roots = [root]
+
+        # The volume group has to be scanned again with all its disks.
+        self._set_udev_devices("dev1", "dev2", "dev3", "dev4")
+        self.assertTrue(self._rescan_devices(["dev1"]))
+
+        handled = [c[0][0]["name"] for c in self.storage.devicetree.handle_device.call_args_list]
+        self.assertEqual(sorted(handled), ["dev1", "dev2", "dev4"])
+        self.assertEqual(self._get_names(), ["dev1", "dev2", "dev3", "dev4"])
+
+        self.assertIs(self.storage.devicetree.get_device_by_name("dev3"), dev3)
+        self.assertIsNot(self.storage.devicetree.get_device_by_name("dev1"), dev1)
+
+        # Only the new devices are probed for existing installations.
+        probed = [c[0][0].name for c in self.read_installation.call_args_list]
+        self.assertEqual(sorted(probed), ["dev1", "dev2", "dev4"])
+
+        dev4 = self.storage.devicetree.get_device_by_name("dev4")
+        self.assertEqual(len(self.storage.roots), 2)
+        self.assertIs(self.storage.roots[0], root)
+        self.assertEqual(self.storage.roots[1].mounts, {"/": dev4})
+        self.assertEqual(self.storage.roots[1].name, "Fedora Linux 33 for x86_64")
+
+    def rescan_removed_disks_test(self):
+        """Rescan the removed disks."""
+        self._add_disk("dev1", "ext4")
+        dev2 = self._add_disk("dev2", "ext4")
+
+        self.storage.roots = [Root(mounts={"/": dev2})]
+
+        self._set_udev_devices("dev1")
+        self.assertTrue(self._rescan_devices([]))
+
+        self.storage.devicetree.handle_device.assert_not_called()
+        self.read_installation.assert_not_called()
+        self.assertEqual(self._get_names(), ["dev1"])
+        self.assertEqual(self.storage.roots, [])
+
+    def rescan_unsupported_test(self):
+        """Rescan the devices when the full reset is required."""
+        self._add_disk("dev1", "ext4")
+        self._set_udev_devices("dev1")
+
+        with patch.object(self.storage.devicetree.actions, "find", return_value=[Mock()]):
+            self.assertFalse(self.storage.rescan_devices(["dev1"]))
+
+        with patch("pyanaconda.modules.storage.devicetree.model.conf") as conf:
+            conf.target.is_image = True
+            self.assertFalse(self.storage.rescan_devices(["dev1"]))
+
+        # The changed disk is hidden.
+        self.storage.devicetree.ignored_disks = ["dev1"]
+        self.storage.devicetree.hide(self.storage.devicetree.get_device_by_name("dev1"))
+        self.assertFalse(self.storage.rescan_devices(["dev1"]))
+
+        # The hidden disk is not ignored anymore.
+        self.storage.devicetree.ignored_disks = []
+        self.assertFalse(self.storage.rescan_devices([]))
+
+        self.storage.devicetree.handle_device.assert_not_called()
+
+
+class ExistingSystemsTestCase(unittest.TestCase):
+    """Test the detection of existing systems."""
+
+    def setUp(self):
+        self.image = tempfile.mkdtemp()
+        self.files = tempfile.mkdtemp()
+        self.features = "has_journal ext_attr extent"
+
+    def tearDown(self):
+        shutil.rmtree(self.image)
+        shutil.rmtree(self.files)
+
+    def _create_file(self, path, content=""):
+        """Create a file in the fake file system image."""
+        path = self.image + path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _create_link(self, path, target):
+        """Create a link in the fake file system image."""
+        path = self.image + path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.symlink(target, path)
+
+    def _run_debugfs(self, command, argv, log_output=True):
+        """Simulate the features and rdump commands of debugfs."""
+        if argv[1] == "-R":
+            return "Filesystem features:      {}\n".format(self.features)
+
+        with open(argv[2]) as f:
+            for line in f:
+                _rdump, path, local_dir = line.replace('"', "").split()
+                src = self.image + path
+                dest = os.path.join(local_dir, os.path.basename(path))
+
+                if os.path.islink(src):
+                    os.symlink(os.readlink(src), dest)
+                elif os.path.isfile(src):
+                    shutil.copyfile(src, dest)
+
+        return ""
+
+    def _get_probe(self, fstype):
+        """Get plain data of a device."""
+        return DeviceProbe(
+            name="sda1",
+            path="/dev/sda1",
+            fstype=fstype,
+            mount_device="/dev/sda1",
+            mount_type=fstype,
+            options="defaults"
+        )
+
+    @patch("pyanaconda.modules.storage.devicetree.root.util.execWithCapture")
+    @patch("pyanaconda.modules.storage.devicetree.root.shutil.which")
+    def read_system_files_test(self, which, exec_mock):
+        """Test the reading of files from a file system image."""
+        which.return_value = "/usr/bin/true"
+        exec_mock.side_effect = self._run_debugfs
+
+        self._create_file("/etc/fstab", "/dev/sda1 / ext4 defaults 1 1\n")
+        self._create_file("/usr/lib/os-release", 'NAME="Fedora"\nVERSION_ID=33\n')
+        self._create_link("/etc/os-release", "../usr/lib/os-release")
+        self._create_file("/usr/bin/arch")
+        shutil.copyfile("/usr/bin/true", self.image + "/usr/bin/arch")
+
+        probe = self._get_probe("ext4")
+        self.assertTrue(_read_system_files(probe, self.files))
+        self.assertFalse(os.path.islink(self.files + "/etc/os-release"))
+        self.assertEqual(_get_release(self.files), ("Fedora", "33"))
+        self.assertEqual(_get_image_architecture(self.files), os.uname().machine)
+
+    @patch("pyanaconda.modules.storage.devicetree.root.util.execWithCapture")
+    @patch("pyanaconda.modules.storage.devicetree.root.shutil.which")
+    def read_system_files_failed_test(self, which, exec_mock):
+        """Test the failed reading of files from a file system image."""
+        which.return_value = "/usr/bin/true"
+
+        probe = self._get_probe("xfs")
+        self.assertFalse(_read_system_files(probe, self.files))
+        exec_mock.assert_not_called()
+
+        probe = self._get_probe("ext4")
+        exec_mock.return_value = "debugfs: Bad magic number in super-block " \
+                                 "while trying to open /dev/sda1"
+        self.assertFalse(_read_system_files(probe, self.files))
+
+        # The journal needs a recovery.
+        exec_mock.side_effect = self._run_debugfs
+        self.features = "has_journal ext_attr needs_recovery extent"
+        self._create_file("/etc/os-release", 'NAME="Fedora"\nVERSION_ID=33\n')
+        self.assertFalse(_read_system_files(probe, self.files))
+        self.assertFalse(os.path.exists(self.files + "/etc/os-release"))
+        self.features = "has_journal ext_attr extent"
+
+        # The architecture of the installation is unknown.
+        exec_mock.side_effect = self._run_debugfs
+        self._create_file("/etc/fstab", "/dev/sda1 / ext4 defaults 1 1\n")
+        self._create_file("/usr/bin/arch", "#!/bin/sh\n")
+        self.assertFalse(_read_system_files(probe, self.files))
+
+    @patch("pyanaconda.modules.storage.devicetree.root._get_existing_installation")
+    @patch("pyanaconda.modules.storage.devicetree.root._read_existing_installation")
+    def find_existing_installations_test(self, read_mock, get_mock):
+        """Test the parallel detection of existing installations."""
+        devices = [Mock(), Mock(), Mock(), Mock()]
+        devices[3].direct = False
+
+        for i, device in enumerate(devices):
+            device.name = "sda{}".format(i)
+
+        files_root = tempfile.mkdtemp()
+        data = InstallationData(files_root, "x86_64", "Fedora", "33", [])
+        read_mock.side_effect = lambda probe: {
+            "sda0": (True, data),
+            "sda1": (False, None),
+            "sda2": (True, None),
+        }[probe.name]
+
+        root = Root(name="Linux")
+        get_mock.return_value = root
+
+        devicetree = Mock(devices=devices)
+        self.assertEqual(_find_existing_installations(devicetree), [root])
+        get_mock.assert_called_once_with(devicetree, data)
+
+        for device in devices[:3]:
+            device.setup.assert_called_once_with()
+
+        devices[0].teardown.assert_not_called()
+        devices[1].teardown.assert_called_once_with()
+        devices[2].teardown.assert_not_called()
+        devices[3].setup.assert_not_called()
+
+        # The files of the installation are removed.
+        self.assertFalse(os.path.exists(files_root))
+
+    @patch("pyanaconda.modules.storage.devicetree.root.util.execWithCapture")
+    @patch("pyanaconda.modules.storage.devicetree.root.shutil.which")
+    def find_existing_installations_locked_test(self, which, exec_mock):
+        """Test the detection of existing installations under the blivet lock."""
+        which.return_value = "/usr/bin/true"
+        exec_mock.side_effect = self._run_debugfs
+
+        self._create_file("/etc/fstab", "/dev/sda1 / ext4 defaults 1 1\n")
+        self._create_file("/etc/os-release", 'NAME="Fedora"\nVERSION_ID=33\n')
+        self._create_file("/usr/bin/arch")
+        shutil.copyfile("/usr/bin/true", self.image + "/usr/bin/arch")
+
+        # Simulate the synchronized objects of blivet.
+        class Format(object, metaclass=SynchronizedMeta):
+            type = "ext4"
+            mount_type = "ext4"
+            device = "/dev/sda1"
+            options = "defaults"
+            linux_native = True
+            mountable = True
+            exists = True
+
+        class Device(object, metaclass=SynchronizedMeta):
+            name = "sda1"
+            direct = True
+            controllable = True
+            format = Format()
+
+            @property
+            def path(self):
+                return "/dev/sda1"
+
+            def setup(self):
+                pass
+
+            def teardown(self):
+                pass
+
+        device = Device()
+
+        class DeviceTree(object, metaclass=SynchronizedMeta):
+
+            @property
+            def devices(self):
+                return [device]
+
+            def resolve_device(self, devspec, **kwargs):
+                return device if devspec == "/dev/sda1" else None
+
+            def get_device_by_path(self, path):
+                return None
+
+            def teardown_all(self):
+                pass
+
+        roots = []
+
+        def find_roots():
+            # The storage model is reset with the lock held.
+            with blivet_lock:
+                roots.extend(find_existing_installations(DeviceTree()))
+
+        thread = threading.Thread(target=find_roots, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+
+        self.assertFalse(thread.is_alive(), "The detection is blocked.")
+        self.assertEqual(len(roots), 1)
+        self.assertEqual(roots[0].mounts, {"/": device})
+        self.assertEqual(roots[0].name, "Fedora Linux 33 for {}".format(os.uname().machine))
@@ -147,6 +147,16 @@ class StorageInterfaceTestCase(unittest.TestCase):
         storage_changed_callback.assert_called_once()
         partitioning_reset_callback.assert_not_called()
 
+    @patch_dbus_publish_object
+    def scan_changed_devices_with_task_test(self, publisher):
+        """Test ScanChangedDevicesWithTask."""
+        task_path = self.storage_interface.ScanChangedDevicesWithTask(["dev1", "dev2"])
+
+        obj = check_task_creation(self, task_path, publisher, ScanDevicesTask)
+
+        self.assertIsNotNone(obj.implementation._storage)
+        self.assertEqual(obj.implementation._device_names, ["dev1", "dev2"])
+
     @patch_dbus_publish_object
     def create_partitioning_test(self, published):
         """Test CreatePartitioning."""
@@ -217,13 +227,20 @@ class StorageInterfaceTestCase(unittest.TestCase):
         self.assertEqual(partitioning.storage, storage_2)
 
         self.storage_interface.ApplyPartitioning(object_path)
-        self.assertEqual(self.storage_module.storage, storage_3)
+        self.assertEqual(self.storage_module.storage, storage_2)
+        self.assertIsNone(partitioning._storage_playground)
+        storage_2.copy.assert_not_called()
+
+        # The applied storage is copied on the next access.
+        self.assertEqual(partitioning.storage, storage_3)
+        self.assertEqual(self.storage_module.storage, storage_2)
 
         with self.assertRaises(DBusContainerError):
             self.storage_interface.ApplyPartitioning(ObjPath("invalid"))
 
         report.add_warning("The partitioning might not be valid.")
         self.storage_interface.ApplyPartitioning(object_path)
+        self.assertEqual(self.storage_module.storage, storage_3)
 
         report.add_error("The partitioning is not valid.")
         with self.assertRaises(InvalidStorageError):
@@ -269,7 +286,8 @@ class StorageInterfaceTestCase(unittest.TestCase):
 
         self.storage_interface.ApplyPartitioning(partitioning)
         self.assertEqual(self.storage_interface.AppliedPartitioning, partitioning)
-        self.assertEqual(self.storage_module.storage, storage_3)
+        self.assertEqual(self.storage_module.storage, storage_2)
+        self.assertEqual(partitioning_module.storage, storage_3)
 
         storage_4 = Mock()
         storage_1.copy.return_value = storage_4
@@ -1475,6 +1493,25 @@ class StorageTasksTestCase(unittest.TestCase):
         task = ScanDevicesTask(storage)
         task.run()
         storage.reset.assert_called_once()
+        storage.rescan_devices.assert_not_called()
+
+    def rescan_test(self):
+        """Test the rescan of the changed devices."""
+        storage = Mock()
+        storage.rescan_devices.return_value = True
+
+        task = ScanDevicesTask(storage, ["dev1"])
+        task.run()
+        storage.rescan_devices.assert_called_once_with(["dev1"])
+        storage.reset.assert_not_called()
+
+        storage.reset_mock()
+        storage.rescan_devices.return_value = False
+
+        task = ScanDevicesTask(storage, ["dev1"])
+        task.run()
+        storage.rescan_devices.assert_called_once_with(["dev1"])
+        storage.reset.assert_called_once_with()
 
     @patch("pyanaconda.modules.storage.installation.conf")
     def activate_filesystems_test(self, patched_conf):
@@ -1509,7 +1546,8 @@ class StorageTasksTestCase(unittest.TestCase):
         core_run_program.assert_any_call(
                 ['mount', '--rbind', '/mnt/sysimage', '/mnt/sysroot'],
                 stdin=None, stdout=None, root='/', env_prune=None,
-                log_output=True, binary_output=False)
+                log_output=True, binary_output=False, capture_output=False,
+                line_callback=None)
 
     @patch_dbus_get_proxy
     @patch("pyanaconda.modules.storage.installation.conf")
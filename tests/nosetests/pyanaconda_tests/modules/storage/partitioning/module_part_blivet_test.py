@@ -21,7 +21,7 @@ import os
 import sys
 import pickle
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 
 from pyanaconda.modules.storage.devicetree import create_storage
 from tests.nosetests.pyanaconda_tests import patch_dbus_publish_object, check_task_creation
@@ -109,6 +109,19 @@ class BlivetPartitioningInterfaceTestCase(unittest.TestCase):
         self.assertIsInstance(answer, ProxyID)
         self.assertEqual(answer.id, 0)
 
+    def take_storage_playground_test(self):
+        """Test take_storage_playground."""
+        storage = Mock()
+        storage.copy.return_value.disks = []
+        self.module.on_storage_changed(storage)
+
+        playground = self.module.storage
+        self.assertEqual(playground, storage.copy.return_value)
+
+        # The module keeps its playground.
+        self.assertEqual(self.module.take_storage_playground(), playground.copy.return_value)
+        self.assertEqual(self.module.storage, playground)
+
     @patch_dbus_publish_object
     def configure_with_task_test(self, publisher):
         """Test ConfigureWithTask."""
@@ -23,19 +23,29 @@ import tempfile
 import os
 import hashlib
 import shutil
+import threading
+import time
 import gi
+import dnf.transaction
 
 import pyanaconda.core.payload as util
 
 from tempfile import TemporaryDirectory
-from unittest.mock import patch, Mock, call
+from unittest.mock import patch, Mock, MagicMock, call
 
 from blivet.size import Size
 
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.payload.dnf import utils
 from pyanaconda.payload.flatpak import FlatpakPayload
-from pyanaconda.payload.dnf.repomd import RepoMDMetaHash
+from pyanaconda.kickstart import RepoData
+from pyanaconda.payload.manager import PayloadManager, PayloadState
+from pyanaconda.payload.dnf.comps_index import CompsIndex
+from pyanaconda.payload.dnf.payload import DNFPayload
+from pyanaconda.payload.dnf.repomd import RepoMDMetaHash, store_repoMD_hashes, \
+    verify_repoMD_hashes
+from pyanaconda.payload.dnf.transaction_progress import TransactionProgress, \
+    TransactionProgressState, TransactionProgressSnapshot, receive_transaction_events
 
 gi.require_version("Flatpak", "1.0")
 from gi.repository.Flatpak import RefKind
@@ -149,6 +159,450 @@ or it should be. Nah it's just a test!
         os.remove(self._md_file)
         self.assertFalse(r.verify_repoMD())
 
+    def multiple_urls_test(self):
+        """Test the repository with multiple urls."""
+        self._dummyRepo.baseurl = [
+            "file:///nonexistent/repository",
+            "file://" + self._temp_dir
+        ]
+
+        r = RepoMDMetaHash(self._dummyRepo, None)
+        r.store_repoMD_hash()
+        self.assertNotEqual(r.repoMD_hash, r._calculate_hash(""))
+        self.assertTrue(r.verify_repoMD())
+
+    def _get_response(self, status_code, text="", headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.ok = status_code < 400
+        response.text = text
+        response.headers = headers or {}
+        return response
+
+    def _mock_session(self):
+        """Use the returned session in all workers."""
+        session = MagicMock()
+        session.__enter__.return_value = session
+
+        patcher = patch("pyanaconda.payload.dnf.repomd.util.requests_session")
+        patcher.start().return_value = session
+        self.addCleanup(patcher.stop)
+
+        return session
+
+    def conditional_request_test(self):
+        """Test the conditional requests."""
+        self._dummyRepo.baseurl = ["http://server/repo"]
+        session = self._mock_session()
+        session.get.return_value = self._get_response(200, "repomd", {
+            "ETag": "123",
+            "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"
+        })
+
+        r = RepoMDMetaHash(self._dummyRepo, None)
+        r.store_repoMD_hash()
+
+        # The repomd.xml file hasn't changed.
+        session.get.return_value = self._get_response(304)
+        self.assertTrue(r.verify_repoMD())
+
+        headers = session.get.call_args[1]["headers"]
+        self.assertEqual(headers["If-None-Match"], "123")
+        self.assertEqual(headers["If-Modified-Since"], "Wed, 21 Oct 2015 07:28:00 GMT")
+
+        # The repomd.xml file has changed.
+        session.get.return_value = self._get_response(200, "new repomd", {"ETag": "456"})
+        self.assertFalse(r.verify_repoMD())
+
+        # The server doesn't work.
+        session.get.return_value = self._get_response(500)
+        self.assertFalse(r.verify_repoMD())
+
+    def ordered_urls_test(self):
+        """Test that the first working url in the order of the urls is used."""
+        self._dummyRepo.baseurl = ["http://slow/repo", "http://fast/repo"]
+        session = self._mock_session()
+
+        def get(url, **kwargs):
+            # The slow mirror answers later with a different content.
+            if url.startswith("http://slow"):
+                time.sleep(0.2)
+                return self._get_response(200, "slow repomd", {"ETag": "slow"})
+
+            return self._get_response(200, "fast repomd", {"ETag": "fast"})
+
+        session.get.side_effect = get
+
+        r = RepoMDMetaHash(self._dummyRepo, None)
+        r.store_repoMD_hash()
+        self.assertEqual(r.repoMD_hash, r._calculate_hash("slow repomd"))
+        self.assertEqual(list(r._validators.keys()), ["http://slow/repo"])
+        self.assertTrue(r.verify_repoMD())
+
+        # The slow mirror doesn't work, use the next one.
+        session.get.side_effect = lambda url, **kwargs: \
+            self._get_response(500) if url.startswith("http://slow") else get(url)
+
+        r.store_repoMD_hash()
+        self.assertEqual(r.repoMD_hash, r._calculate_hash("fast repomd"))
+        self.assertEqual(list(r._validators.keys()), ["http://fast/repo"])
+
+    def dead_url_test(self):
+        """Test that a dead url doesn't delay the first working url."""
+        self._dummyRepo.baseurl = ["http://fast/repo", "http://dead/repo"]
+        session = self._mock_session()
+        dead = threading.Event()
+
+        def get(url, **kwargs):
+            if url.startswith("http://dead"):
+                dead.wait(timeout=10)
+                return self._get_response(500)
+
+            return self._get_response(200, "fast repomd")
+
+        session.get.side_effect = get
+        self.addCleanup(dead.set)
+
+        start_time = time.monotonic()
+        r = RepoMDMetaHash(self._dummyRepo, None)
+        r.store_repoMD_hash()
+
+        self.assertLess(time.monotonic() - start_time, 5)
+        self.assertEqual(r.repoMD_hash, r._calculate_hash("fast repomd"))
+
+    def verify_repositories_test(self):
+        """Test the verification of multiple repositories."""
+        repositories = [RepoMDMetaHash(self._dummyRepo, None) for _ in range(3)]
+        self.assertTrue(verify_repoMD_hashes([]))
+
+        store_repoMD_hashes(repositories)
+        self.assertTrue(verify_repoMD_hashes(repositories))
+
+        with open(self._md_file, 'a') as f:
+            f.write("This should not be here!")
+
+        self.assertFalse(verify_repoMD_hashes(repositories))
+
+    def verify_unreachable_repository_test(self):
+        """Test that a slow repository doesn't delay a failed verification."""
+        session = self._mock_session()
+        slow = threading.Event()
+
+        def get(url, **kwargs):
+            if url.startswith("http://slow"):
+                slow.wait(timeout=10)
+                return self._get_response(200, "repomd")
+
+            return self._get_response(500)
+
+        session.get.side_effect = get
+        self.addCleanup(slow.set)
+
+        repositories = []
+
+        for url in ("http://slow/repo", "http://dead/repo"):
+            repo = DummyRepo()
+            repo.baseurl = [url]
+            repositories.append(RepoMDMetaHash(repo, None))
+
+        start_time = time.monotonic()
+        self.assertFalse(verify_repoMD_hashes(repositories))
+        self.assertLess(time.monotonic() - start_time, 5)
+
+
+class CompsIndexTest(unittest.TestCase):
+
+    def _get_option(self, name, default=False):
+        option = Mock()
+        option.name = name
+        option.default = default
+        return option
+
+    def _get_comps(self):
+        env_1 = Mock(id="env-1", option_ids=[
+            self._get_option("g1", default=True),
+            self._get_option("g2"),
+            self._get_option("missing"),
+        ])
+        env_2 = Mock(id="env-2", option_ids=[
+            self._get_option("g3"),
+            self._get_option("g3", default=True),
+        ])
+        groups = [
+            Mock(id="g1", visible=True),
+            Mock(id="g2", visible=False),
+            Mock(id="g3", visible=True),
+            Mock(id="g4", visible=True),
+            Mock(id="g5", visible=False),
+        ]
+
+        comps = Mock()
+        comps.environments = [env_1, env_2]
+        comps.groups_iter.return_value = iter(groups)
+        return comps
+
+    def empty_index_test(self):
+        """Test an empty comps index."""
+        index = CompsIndex()
+        self.assertEqual(index.environments, [])
+        self.assertEqual(index.groups, [])
+        self.assertEqual(index.environment_addons, {})
+        self.assertIsNone(index.get_environment("env-1"))
+        self.assertIsNone(index.get_group("g1"))
+        self.assertIsNone(index.get_environment_options("env-1"))
+
+    def index_test(self):
+        """Test the comps index."""
+        comps = self._get_comps()
+        index = CompsIndex(comps)
+
+        self.assertEqual(index.environments, ["env-1", "env-2"])
+        self.assertEqual(index.groups, ["g1", "g2", "g3", "g4", "g5"])
+        self.assertIs(index.get_environment("env-2"), comps.environments[1])
+        self.assertEqual(index.get_group("g4").id, "g4")
+        self.assertIsNone(index.get_group("missing"))
+
+        self.assertEqual(index.get_environment_options("env-1"), {
+            "g1": True, "g2": False, "missing": False
+        })
+        self.assertEqual(index.get_environment_options("env-2"), {
+            "g3": True
+        })
+
+        self.assertEqual(index.environment_addons, {
+            "env-1": (["g1", "g2"], ["g3", "g4"]),
+            "env-2": (["g3"], ["g1", "g4"]),
+        })
+
+
+    @patch("pyanaconda.payload.dnf.payload.tear_down_sources")
+    def unsetup_test(self, tear_down_sources):
+        """Test that the comps index is cleared with the DNF base."""
+        payload = DNFPayload.__new__(DNFPayload)
+        payload._payload_proxy = Mock()
+        payload._dnf_manager = Mock()
+        payload.get_packages_data = Mock()
+        payload._get_proxy_url = Mock()
+        payload._comps_index = CompsIndex(self._get_comps())
+        payload._environment_addons = payload._comps_index.environment_addons
+
+        payload.unsetup()
+        payload._dnf_manager.reset_base.assert_called_once_with()
+        self.assertEqual(payload._comps_index.environments, [])
+        self.assertEqual(payload._comps_index.groups, [])
+        self.assertEqual(payload._environment_addons, {})
+
+
+class DNFPayloadPackageCacheTest(unittest.TestCase):
+
+    def _get_payload(self):
+        payload = DNFPayload.__new__(DNFPayload)
+        payload._download_location = "/download"
+        return payload
+
+    def _get_package(self, name, checksum):
+        package = Mock()
+        package.localPkg.return_value = os.path.join("/download", name + ".rpm")
+        package.returnIdSum.return_value = checksum
+        return package
+
+    def _get_packages(self):
+        return [
+            self._get_package("a", ("sha256", "abcd")),
+            self._get_package("b", (None, None)),
+        ]
+
+    def restore_cached_packages_test(self):
+        """Test the restoration of the cached packages."""
+        package_cache = Mock()
+        payload = self._get_payload()
+        payload._restore_cached_packages(package_cache, self._get_packages())
+
+        package_cache.restore.assert_called_once_with("sha256", "abcd", "/download/a.rpm")
+
+    def store_cached_packages_test(self):
+        """Test the storing of the downloaded packages."""
+        package_cache = Mock()
+        payload = self._get_payload()
+        payload._store_cached_packages(package_cache, self._get_packages())
+
+        package_cache.store.assert_called_once_with("/download/a.rpm", "sha256", "abcd")
+        package_cache.evict.assert_called_once_with()
+
+
+class PayloadManagerTest(unittest.TestCase):
+
+    def _get_payload(self, payload_type, source_type, default=False):
+        payload = Mock()
+        payload.type = payload_type
+        payload.source_type = source_type
+        payload.is_source_default.return_value = default
+        payload.data.repo.dataList.return_value = []
+        return payload
+
+    def _get_repo(self, baseurl=None, partition=None, enabled=True):
+        repo = RepoData(name="addon", baseurl=baseurl)
+        repo.partition = partition
+        repo.enabled = enabled
+        return repo
+
+    def needs_storage_test(self):
+        """Test the storage requirements of payload sources."""
+        manager = PayloadManager()
+
+        payload = self._get_payload("LIVE_OS", "LIVE_OS_IMAGE")
+        self.assertTrue(manager._needs_storage(payload, checkmount=False))
+
+        for source_type in ("HDD", "NFS", "CDROM", "REPO_FILES", "HMC"):
+            payload = self._get_payload("DNF", source_type)
+            self.assertTrue(manager._needs_storage(payload, checkmount=False))
+
+        for source_type in ("URL", "CDN", "CLOSEST_MIRROR"):
+            payload = self._get_payload("DNF", source_type)
+            self.assertFalse(manager._needs_storage(payload, checkmount=True))
+
+        # The default source can be replaced with the installation media.
+        payload = self._get_payload("DNF", "CLOSEST_MIRROR", default=True)
+        self.assertTrue(manager._needs_storage(payload, checkmount=True))
+        self.assertFalse(manager._needs_storage(payload, checkmount=False))
+
+    def needs_storage_addon_repos_test(self):
+        """Test the storage requirements of additional repositories."""
+        manager = PayloadManager()
+        payload = self._get_payload("DNF", "URL")
+        repos = payload.data.repo.dataList.return_value
+
+        repos.append(self._get_repo(baseurl="http://server/repo"))
+        self.assertFalse(manager._needs_storage(payload, checkmount=False))
+
+        repos.append(self._get_repo(baseurl="nfs://server:/repo", enabled=False))
+        self.assertFalse(manager._needs_storage(payload, checkmount=False))
+
+        repos[:] = [self._get_repo(baseurl="hd:sdb1:/repo", partition="sdb1")]
+        self.assertTrue(manager._needs_storage(payload, checkmount=False))
+
+        repos[:] = [self._get_repo(baseurl="nfs://server:/repo")]
+        self.assertTrue(manager._needs_storage(payload, checkmount=False))
+
+        repos[:] = [self._get_repo(baseurl="file:///run/install/repo")]
+        self.assertTrue(manager._needs_storage(payload, checkmount=False))
+
+    @patch("pyanaconda.payload.manager.threadMgr")
+    def skip_storage_test(self, thread_manager):
+        """Test that network sources don't wait for storage."""
+        manager = PayloadManager()
+        states = []
+
+        for state in PayloadState:
+            manager.add_listener(state, lambda s=state: states.append(s))
+
+        payload = self._get_payload("DNF", "URL")
+        payload.verify_available_repositories.return_value = True
+        manager._run_thread(payload, fallback=False, checkmount=True, onlyOnChange=True)
+
+        waited = [c[0][0] for c in thread_manager.wait.call_args_list]
+        self.assertEqual(waited, ["AnaWaitForConnectingNMThread", "AnaSubscriptionThread"])
+        self.assertNotIn(PayloadState.WAITING_STORAGE, states)
+        self.assertEqual(states[-1], PayloadState.FINISHED)
+
+
+class TransactionProgressTest(unittest.TestCase):
+
+    def _get_package(self, name):
+        package = Mock()
+        package.name = name
+        package.arch = "x86_64"
+        package.evr = "1.0-1"
+        package.buildtime = 100
+        package.returnIdSum.return_value = ("sha256", "abcd")
+        return package
+
+    def batch_events_test(self):
+        """Test the batched events of the transaction."""
+        queue = Mock()
+        progress = TransactionProgress(queue)
+
+        progress.progress(self._get_package("a"), dnf.transaction.PKG_INSTALL, 0, 1, 1, 2)
+        progress.progress(self._get_package("a"), dnf.transaction.PKG_INSTALL, 0, 1, 1, 2)
+        progress.progress(self._get_package("b"), dnf.transaction.PKG_INSTALL, 0, 1, 2, 2)
+        queue.put.assert_not_called()
+
+        progress.flush()
+        queue.put.assert_called_once_with(('batch', [
+            ('install', ("a", "x86_64", 1, 2)),
+            ('log', "Installed: a-1.0-1.x86_64 100 abcd"),
+            ('install', ("b", "x86_64", 2, 2)),
+            ('log', "Installed: b-1.0-1.x86_64 100 abcd"),
+        ]))
+
+        queue.reset_mock()
+        progress.flush()
+        queue.put.assert_not_called()
+
+        progress.progress(None, dnf.transaction.TRANS_POST, 0, 0, 0, 0)
+        queue.put.assert_called_once_with(('batch', [
+            ('post', None),
+            ('log', "Post installation setup phase started."),
+        ]))
+
+        queue.reset_mock()
+        progress.error("Fake error!")
+        queue.put.assert_called_once_with(('batch', [
+            ('error', "Fake error!")
+        ]))
+
+    def flush_periodically_test(self):
+        """Test the periodical flush of the events."""
+        queue = Mock()
+        progress = TransactionProgress(queue, interval=0.01)
+        progress.start()
+        progress.progress(self._get_package("a"), dnf.transaction.PKG_VERIFY, 0, 1, 1, 2)
+
+        for _ in range(100):
+            if queue.put.called:
+                break
+            time.sleep(0.01)
+
+        progress.stop()
+        queue.put.assert_called_once_with(('batch', [
+            ('verify', ("a", "x86_64", 1, 2)),
+            ('log', "Verifying: a-1.0-1.x86_64 100 abcd"),
+        ]))
+
+    def receive_events_test(self):
+        """Test the receiving of the events."""
+        queue = Mock()
+        queue.get.side_effect = [
+            ('batch', [('install', ("a", "x86_64", 1, 1)), ('log', "Installed")]),
+            ('quit', "DNF quit"),
+        ]
+
+        events = receive_transaction_events(queue)
+        self.assertEqual(next(events), [('install', ("a", "x86_64", 1, 1)), ('log', "Installed")])
+        self.assertEqual(next(events), [('quit', "DNF quit")])
+
+    def state_test(self):
+        """Test the state of the transaction."""
+        state = TransactionProgressState()
+        self.assertEqual(state.snapshot(), TransactionProgressSnapshot(
+            phase=None, package=None, installed=0, configured=0, verified=0, total=0
+        ))
+
+        state.update('install', ("a", "x86_64", 1, 2))
+        state.update('log', "Installed: a")
+        state.update('install', ("b", "x86_64", 2, 2))
+        self.assertEqual(state.snapshot(), TransactionProgressSnapshot(
+            phase='install', package="b.x86_64", installed=2, configured=0, verified=0, total=2
+        ))
+
+        state.update('post', None)
+        state.update('configure', ("a", "x86_64"))
+        state.update('verify', ("a", "x86_64", 1, 2))
+        state.update('done', None)
+        self.assertEqual(state.snapshot(), TransactionProgressSnapshot(
+            phase='done', package="a.x86_64", installed=2, configured=1, verified=1, total=2
+        ))
+
 
 class FlatpakTest(unittest.TestCase):
 